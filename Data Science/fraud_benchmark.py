@@ -0,0 +1,253 @@
+"""
+Benchmark the fraud detection models: quality metrics and serving cost.
+
+Follows the same preprocessing and splits as fraud_detection.ipynb, then for the
+top-10 / top-15 feature sets trains XGBoost and Random Forest and reports
+AUPRC, precision, recall and F2 next to single-row and batched inference
+latency and memory. Memory is measured for each model in a fresh interpreter
+(Linux, from VmHWM in /proc/self/status), since the peak RSS of this process
+only ever grows and cannot tell the models apart. Results are written as JSON
+so model choice can account for serving cost.
+
+Usage:
+    python fraud_benchmark.py --data creditcard.csv --output benchmark_results.json
+    python fraud_benchmark.py --data creditcard.csv --artifact xgb_fraud_model.joblib
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import average_precision_score, fbeta_score, precision_score, recall_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+warnings.filterwarnings('ignore')
+
+FEATURE_SET_SIZES = [10, 15]
+
+# Same hyper-parameters as the notebook for each feature set
+MODELS = {
+    "XGBoost": {
+        10: lambda: XGBClassifier(n_estimators=160, learning_rate=0.12, random_state=42),
+        15: lambda: XGBClassifier(n_estimators=300, learning_rate=0.1, random_state=42),
+        20: lambda: XGBClassifier(n_estimators=400, learning_rate=0.1, random_state=42),
+    },
+    "RandomForest": {
+        10: lambda: RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1),
+        15: lambda: RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1),
+        20: lambda: RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1),
+    },
+}
+
+
+def load_dataset(path):
+    """Load creditcard.csv and apply the notebook preprocessing"""
+    df = pd.read_csv(path)
+    df = df.drop_duplicates().reset_index(drop=True)
+    df['Amount_log'] = np.log(df['Amount'] + 1)
+    df = df.drop(columns=['Amount'], errors="ignore")
+
+    X = df.drop(['Class'], axis=1)
+    y = df['Class']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=123, stratify=y)
+    X_valid, X_test, y_valid, y_test = train_test_split(X_test, y_test, test_size=0.5, random_state=42, stratify=y_test)
+
+    scaler = StandardScaler()
+    cols_to_scale = ['Time', 'Amount_log']
+    X_train[cols_to_scale] = scaler.fit_transform(X_train[cols_to_scale])
+    X_valid[cols_to_scale] = scaler.transform(X_valid[cols_to_scale])
+    X_test[cols_to_scale] = scaler.transform(X_test[cols_to_scale])
+    return X_train, X_valid, X_test, y_train, y_valid, y_test
+
+
+def rank_features(X_train, y_train, X_valid, y_valid):
+    """Feature importance ranking, same model as the notebook"""
+    scale_pos_weight = len(y_train[y_train == 0]) / len(y_train[y_train == 1])
+    model = XGBClassifier(
+        scale_pos_weight=scale_pos_weight,
+        n_estimators=300,
+        max_depth=6,
+        learning_rate=0.1,
+        subsample=0.8,
+        colsample_bytree=0.8,
+        eval_metric='aucpr',
+        random_state=42,
+        early_stopping_rounds=30,
+    )
+    model.fit(X_train, y_train, eval_set=[(X_valid, y_valid)], verbose=False)
+    importance = pd.Series(model.feature_importances_, index=X_train.columns)
+    return importance.sort_values(ascending=False).index.tolist()
+
+
+def quality_metrics(model, X, y):
+    y_pred = model.predict(X)
+    y_proba = model.predict_proba(X)[:, 1]
+    return {
+        "auprc": float(average_precision_score(y, y_proba)),
+        "precision": float(precision_score(y, y_pred, pos_label=1, zero_division=0)),
+        "recall": float(recall_score(y, y_pred, pos_label=1)),
+        "f2": float(fbeta_score(y, y_pred, beta=2, pos_label=1, zero_division=0)),
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Peak RSS (MB) of a fresh interpreter after numpy, after loading the model
+# and a one-row predict, and after a batched predict
+MEMORY_SNIPPET = """
+import pickle, sys
+import numpy as np
+def peak():
+    return int([l.split()[1] for l in open('/proc/self/status') if l.startswith('VmHWM')][0]) / 1024
+X = np.load(sys.argv[2])
+baseline = peak()
+with open(sys.argv[1], 'rb') as f:
+    model = pickle.load(f)
+model.predict_proba(X[:1])
+loaded = peak()
+model.predict_proba(X)
+print(baseline, loaded, peak())
+"""
+
+
+def memory_metrics(model_bytes, batch):
+    """Memory of one model measured in its own process, None where /proc is not available"""
+    if not os.path.exists('/proc/self/status'):
+        return {"model_rss_mb": None, "batch_predict_rss_mb": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, batch_path = os.path.join(tmp, 'model.pkl'), os.path.join(tmp, 'batch.npy')
+        with open(model_path, 'wb') as f:
+            f.write(model_bytes)
+        np.save(batch_path, batch)
+        out = subprocess.run(
+            [sys.executable, '-c', MEMORY_SNIPPET, model_path, batch_path],
+            capture_output=True, text=True, check=True,
+        )
+    baseline, loaded, peak = (float(v) for v in out.stdout.split())
+    return {
+        # Includes the libraries the model needs (xgboost, sklearn)
+        "model_rss_mb": loaded - baseline,
+        "batch_predict_rss_mb": peak - loaded,
+    }
+
+
+def latency_metrics(model, X, single_rows=500, batch_size=1000, repeats=5):
+    """Single-row and batched predict_proba latency, plus memory"""
+    X = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+
+    # Warm-up so lazy initialisation is not measured
+    model.predict_proba(X[:1])
+
+    single = []
+    for row in X[:single_rows]:
+        row = row.reshape(1, -1)
+        start = time.perf_counter()
+        model.predict_proba(row)
+        single.append((time.perf_counter() - start) * 1000)
+
+    batch = X[:batch_size]
+    batched = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batched.append((time.perf_counter() - start) * 1000)
+    batch_ms = statistics.median(batched)
+    model_bytes = pickle.dumps(model)
+
+    return {
+        "single_row_ms_p50": statistics.median(single),
+        "single_row_ms_p95": percentile(single, 95),
+        "single_row_ms_p99": percentile(single, 99),
+        "batch_size": len(batch),
+        "batch_ms_p50": batch_ms,
+        "batch_rows_per_sec": len(batch) / (batch_ms / 1000) if batch_ms else None,
+        "model_bytes": len(model_bytes),
+        **memory_metrics(model_bytes, batch),
+    }
+
+
+def benchmark_model(name, n_features, model, features, X_test, y_test, args, train_seconds=None):
+    X = X_test[features]
+    result = {
+        "model": name,
+        "n_features": n_features,
+        "features": features,
+        "train_seconds": train_seconds,
+    }
+    result.update(quality_metrics(model, X, y_test))
+    result.update(latency_metrics(model, X, args.single_rows, args.batch_size, args.repeats))
+    print(
+        f"{name:<14} top-{n_features:<3} AUPRC={result['auprc']:.4f} "
+        f"P={result['precision']:.4f} R={result['recall']:.4f} F2={result['f2']:.4f} "
+        f"single p50={result['single_row_ms_p50']:.3f}ms batch={result['batch_rows_per_sec'] or 0:,.0f} rows/s",
+        file=sys.stderr,
+    )
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='creditcard.csv', help="Path to creditcard.csv")
+    parser.add_argument('--output', default='-', help="JSON output file ('-' for stdout)")
+    parser.add_argument('--features', type=int, nargs='+', default=FEATURE_SET_SIZES,
+                        choices=sorted(MODELS["XGBoost"]), help="Top-N feature sets to benchmark")
+    parser.add_argument('--models', nargs='+', default=list(MODELS), choices=list(MODELS))
+    parser.add_argument('--artifact', help="Also benchmark a saved model, e.g. xgb_fraud_model.joblib")
+    parser.add_argument('--single-rows', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    X_train, X_valid, X_test, y_train, y_valid, y_test = load_dataset(args.data)
+    ranking = rank_features(X_train, y_train, X_valid, y_valid)
+
+    results = []
+    for n_features in args.features:
+        features = ranking[:n_features]
+        for name in args.models:
+            model = MODELS[name][n_features]()
+            start = time.perf_counter()
+            model.fit(X_train[features], y_train)
+            train_seconds = time.perf_counter() - start
+            results.append(benchmark_model(name, n_features, model, features, X_test, y_test, args, train_seconds))
+
+    if args.artifact:
+        import joblib
+        model = joblib.load(args.artifact)
+        features = list(model.get_booster().feature_names)
+        results.append(benchmark_model(f"artifact:{args.artifact}", len(features), model, features, X_test, y_test, args))
+
+    report = {
+        "dataset": args.data,
+        "test_rows": int(len(y_test)),
+        "test_frauds": int(y_test.sum()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
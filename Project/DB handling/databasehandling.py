@@ -1,15 +1,70 @@
 import json
 import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+EMPTY_COUNTERS = {"transaction_id": 0, "wallet_id": 0, "family_wallet_id": 0}
+
+# Fields with an in-memory hash index; a condition given as a dict on one of
+# them ({"phone_number": "010..."}) is answered without scanning the table
+INDEXES = {
+    "users": ("phone_number", "national_id", "walletid"),
+    "wallets": ("wallet_id",),
+    "family_wallets": ("family_id", "parent_phone"),
+    "organizations": ("name",),
+    "transactions": ("transaction_id", "from_wid", "to_wid"),
+}
+
+
+class FileLock:
+    """Lock shared by every process using the same data file"""
+    def __init__(self, path):
+        self.path = path
+
+    def acquire(self, exclusive):
+        self._file = open(self.path, "a+b")
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def release(self):
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
 
 
 class DatabaseHandler:
     """
         Handling data usage in the system (read, update, delete)
+
+        The JSON file is a snapshot, every change after it is appended as one
+        line to "<file>.log", so an operation no longer rewrites the whole
+        file. The data is kept in memory with hash indexes (see INDEXES) and
+        the log is folded back into the snapshot once it gets long.
+        Other processes' changes are picked up from the log before each
+        operation, under a file lock.
     """
-    def __init__(self, file_path="cashbee_db.json"):
+    def __init__(self, file_path="cashbee_db.json", compact_every=1000, fsync=False):
         self.file_path = file_path
-        if not os.path.exists(self.file_path):
-            self._initialize_db()
+        self.log_path = file_path + ".log"
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._lock = FileLock(file_path + ".lock")
+        self._generation = None
+        with self._locked(exclusive=True):
+            if not os.path.exists(self.file_path):
+                self._initialize_db()
 
     def _initialize_db(self):
         empty_structure = {
@@ -18,82 +73,248 @@ class DatabaseHandler:
             "family_wallets": [],
             "organizations": [],
             "transactions": [],
-            "counters": {
-                "transaction_id": 0,
-                "wallet_id": 0,
-                "family_wallet_id": 0
-            }
+            "counters": dict(EMPTY_COUNTERS),
+            "generation": 0,
         }
-        self._write_data(empty_structure)
+        self._write_snapshot(empty_structure)
+        self._write_log_header(0)
 
-    def _read_data(self):
-        """Reading data from json file"""
-        with open(self.file_path, "r") as f:
-            return json.load(f)
+    # Files
 
-    def _write_data(self, data):
-        """Writing data in json file"""
-        with open(self.file_path, "w") as f:
+    def _write_snapshot(self, data):
+        """Replace the snapshot atomically, a crash leaves the old one"""
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w") as f:
             json.dump(data, f, indent=4, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    def _write_log_header(self, generation):
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"generation": generation}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+        self._log_offset = os.path.getsize(self.log_path)
+        self._log_entries = 0
+
+    def _log_generation(self):
+        try:
+            with open(self.log_path, "rb") as f:
+                return json.loads(f.readline()).get("generation")
+        except (OSError, ValueError):
+            return None
+
+    # Loading
+
+    def _load(self):
+        """Read the snapshot and replay the log written after it"""
+        with open(self.file_path, "r") as f:
+            data = json.load(f)
+        self._generation = data.pop("generation", 0)
+        self._counters = {**EMPTY_COUNTERS, **data.pop("counters", {})}
+        self._tables = {}
+        self._indexes = {}
+        self._next_rid = {}
+        for table, records in data.items():
+            self._ensure_table(table)
+            for record in records:
+                self._put(table, self._next_rid[table], record)
+
+        self._log_offset = 0
+        self._log_entries = 0
+        if self._log_generation() == self._generation:
+            self._replay()
+        else:
+            # The log belongs to an older snapshot (crash during compaction)
+            self._write_log_header(self._generation)
+
+    def _replay(self):
+        """Apply the log lines past the last offset read"""
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            if self._log_offset == 0:
+                f.readline()  # header
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line from an interrupted write
+                self._apply(json.loads(line))
+                self._log_entries += 1
+                self._log_offset = f.tell()
+            else:
+                self._log_offset = f.tell()
+
+    def _sync(self):
+        """Catch up with changes made by other processes"""
+        if self._generation is None or self._log_generation() != self._generation:
+            self._load()
+        elif os.path.getsize(self.log_path) > self._log_offset:
+            self._replay()
+
+    @contextmanager
+    def _locked(self, exclusive):
+        self._lock.acquire(exclusive)
+        try:
+            if os.path.exists(self.file_path):
+                self._sync()
+            yield
+        finally:
+            self._lock.release()
+
+    # In-memory tables and indexes
+
+    def _ensure_table(self, table):
+        if table not in self._tables:
+            self._tables[table] = {}
+            self._indexes[table] = {field: {} for field in INDEXES.get(table, ())}
+            self._next_rid[table] = 1
+
+    def _index(self, table, rid, record, add):
+        if not isinstance(record, dict):
+            return
+        for field, index in self._indexes[table].items():
+            value = record.get(field)
+            if value is None:
+                continue
+            rids = index.setdefault(str(value), set())
+            if add:
+                rids.add(rid)
+            else:
+                rids.discard(rid)
+                if not rids:
+                    del index[str(value)]
+
+    def _put(self, table, rid, record):
+        old = self._tables[table].get(rid)
+        if old is not None:
+            self._index(table, rid, old, add=False)
+        self._tables[table][rid] = record
+        self._index(table, rid, record, add=True)
+        self._next_rid[table] = max(self._next_rid[table], rid + 1)
+
+    def _delete(self, table, rid):
+        record = self._tables[table].pop(rid, None)
+        if record is not None:
+            self._index(table, rid, record, add=False)
+
+    def _apply(self, entry):
+        op = entry["op"]
+        if op == "counter":
+            self._counters[entry["name"]] = entry["value"]
+            return
+        self._ensure_table(entry["table"])
+        if op == "put":
+            self._put(entry["table"], entry["rid"], entry["record"])
+        elif op == "delete":
+            self._delete(entry["table"], entry["rid"])
+
+    def _append(self, entries):
+        """Write entries to the log, then apply them in memory"""
+        lines = [json.dumps(entry, default=str) for entry in entries]
+        if os.path.getsize(self.log_path) > self._log_offset:
+            # Drop a partial line left by a crashed writer
+            with open(self.log_path, "r+b") as f:
+                f.truncate(self._log_offset)
+        with open(self.log_path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        for line in lines:
+            # Applied as read back, so values look the same as after a reload
+            self._apply(json.loads(line))
+        self._log_entries += len(lines)
+        self._log_offset = os.path.getsize(self.log_path)
+        if self._log_entries >= self.compact_every:
+            self._compact()
+
+    def _matches(self, table, condition):
+        """(rid, record) pairs matching a callable or a {field: value} dict"""
+        self._ensure_table(table)
+        records = self._tables[table]
+        if callable(condition):
+            return [(rid, item) for rid, item in records.items() if condition(item)]
+
+        rids = None
+        for field, value in condition.items():
+            index = self._indexes[table].get(field)
+            if index is not None:
+                found = index.get(str(value), set())
+                rids = found if rids is None else rids & found
+        candidates = sorted(rids) if rids is not None else records
+        return [
+            (rid, records[rid]) for rid in candidates
+            if isinstance(records[rid], dict)
+            and all(records[rid].get(field) == value for field, value in condition.items())
+        ]
+
+    def _compact(self):
+        """Fold the log into a new snapshot and start an empty log"""
+        data = {table: list(records.values()) for table, records in self._tables.items()}
+        data["counters"] = self._counters
+        data["generation"] = self._generation + 1
+        self._write_snapshot(data)
+        self._generation += 1
+        self._write_log_header(self._generation)
+
+    # API
 
     def add_record(self, table, record, mapper):
         """To add a record in the data"""
-        data = self._read_data()
-        data[table].append(mapper.to_dict(record))
-        self._write_data(data)
+        with self._locked(exclusive=True):
+            self._ensure_table(table)
+            self._append([{"op": "put", "table": table, "rid": self._next_rid[table],
+                           "record": mapper.to_dict(record)}])
 
     def find_one(self, table, condition, mapper):
         """ To get specific record in the data"""
-        data = self._read_data()
-        for item in data[table]:
-            if condition(item):
+        with self._locked(exclusive=False):
+            for _, item in self._matches(table, condition):
                 return mapper.from_dict(item)
         return None
 
     def find_many(self, table, condition, mapper):
         """To get many records at the moment"""
-        data = self._read_data()
-        results = []
-        for item in data[table]:
-            if condition(item):
-                results.append(mapper.from_dict(item))
-        return results
+        with self._locked(exclusive=False):
+            return [mapper.from_dict(item) for _, item in self._matches(table, condition)]
 
     def update_record(self, table, condition, update_func):
         """To update a record """
-        data = self._read_data()
-        updated = False
-        for item in data[table]:
-            if condition(item):
+        with self._locked(exclusive=True):
+            entries = []
+            for rid, item in self._matches(table, condition):
+                item = json.loads(json.dumps(item, default=str))  # indexes still hold the old values
                 update_func(item)
-                updated = True
-        if updated:
-            self._write_data(data)
-        return updated
+                entries.append({"op": "put", "table": table, "rid": rid, "record": item})
+            if entries:
+                self._append(entries)
+            return bool(entries)
 
     def delete_record(self, table, condition):
         """To delete a record"""
-        data = self._read_data()
-        initial_length = len(data[table])
-        data[table] = [item for item in data[table] if not condition(item)]
-        if len(data[table]) != initial_length:
-            self._write_data(data)
-            return True
-        return False
-    
+        with self._locked(exclusive=True):
+            entries = [{"op": "delete", "table": table, "rid": rid} for rid, _ in self._matches(table, condition)]
+            if entries:
+                self._append(entries)
+            return bool(entries)
+
     def get_next_id(self, counter_name):
         """ To get the next id from the data"""
-        data = self._read_data()
-        if "counters" not in data:
-            data["counters"] = {"transaction_id": 0, "wallet_id": 0, "family_wallet_id": 0}        
-        data["counters"][counter_name] += 1
-        next_id = data["counters"][counter_name]
-        self._write_data(data)
-        return next_id
-
-class DatabaseHandlerSingleton: 
+        with self._locked(exclusive=True):
+            next_id = self._counters.get(counter_name, 0) + 1
+            self._append([{"op": "counter", "name": counter_name, "value": next_id}])
+            return next_id
+
+    def compact(self):
+        """Rewrite the snapshot now instead of waiting for compact_every changes"""
+        with self._locked(exclusive=True):
+            self._compact()
+
+class DatabaseHandlerSingleton:
     """Make a singleton to use it when working with data"""
-    _instance = None    
+    _instance = None
     def __new__(cls):
         if cls._instance is None:
             cls._instance = DatabaseHandler()
@@ -166,27 +166,38 @@ class TransactionOperation:
         self.transaction_subject = TransactionSubject()
         
     def execute_transaction(self, payment_type, amount):
-        # Get users' wallet
-        user1_wallet:Wallet  = QueryHandling.retrieve_data('Wallet',WalletMapper,'','wallet_id = %s',(self.user1wid,))
-        user2_wallet:Wallet  = QueryHandling.retrieve_data('Wallet',WalletMapper,'','wallet_id = %s',(self.user2wid,))      
-     
-        payment:Payment = PaymentFactory.create_payment(payment_type,user1_wallet, amount, user2_wallet)
-        msg,transaction = payment.execute()
-       
+        # One transaction: lock both wallets, update them and record the transfer,
+        # then commit once
+        with QueryHandling.transaction():
+            # Get users' wallet, locked in id order so opposite transfers can't deadlock
+            wallets = {
+                wallet.wallet: wallet
+                for wallet in QueryHandling.retrieve_all(
+                    'Wallet', WalletMapper, '', 'wallet_id = ANY(%s) ORDER BY wallet_id',
+                    ([self.user1wid, self.user2wid],), for_update=True,
+                )
+            }
+            user1_wallet:Wallet = wallets.get(self.user1wid)
+            user2_wallet:Wallet = wallets.get(self.user2wid)
+
+            payment:Payment = PaymentFactory.create_payment(payment_type,user1_wallet, amount, user2_wallet)
+            msg,transaction = payment.execute()
+
+            if msg.startswith("✅"):
+                # Update wallets in database, both in one round-trip
+                QueryHandling.update_many('Wallet', ['balance'], 'wallet_id = %s', [
+                    (user1_wallet.balance, user1_wallet.wallet),
+                    (user2_wallet.balance, user2_wallet.wallet),
+                ])
+
+                # Insert a transaction
+                cols = ['from_wallet','to_wallet','amount','type_','date_']
+                transaction.transaction_id = QueryHandling.add_data(
+                    "Transactions", cols, transaction, TransactionMapper, "transaction_id"
+                )
+
+        # Notify observers once committed
         if msg.startswith("✅"):
-            # Update wallets in database
-            col = ["balance"]
-            data = (user1_wallet.balance,user1_wallet.wallet)
-            QueryHandling.update_data('Wallet',col,'wallet_id = %s',data)  
-
-            data = (user2_wallet.balance,user2_wallet.wallet)
-            QueryHandling.update_data('Wallet',col,'wallet_id = %s',data)
-
-            # Insert a transaction
-            cols = ['from_wallet','to_wallet','amount','type_','date_']
-            transaction.transaction_id = QueryHandling.add_data("Transactions",cols,transaction,TransactionMapper)                    
-        
-            # Notify observers
             self.transaction_subject.notify(transaction)
         return msg
 
@@ -1,92 +1,250 @@
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from mappers import *     
-class PostgresSQl: 
-    """Make a singleton to use it when working with data"""
-    _instance = None    
-    def __new__(cls):           
+from psycopg2 import extensions, pool
+from psycopg2.extras import RealDictCursor, execute_batch, execute_values
+from mappers import *
+
+DB_SETTINGS = {
+    "host": "localhost",
+    "database": "cashbee",
+    "user": "postgres",
+    "password": "So@1234",
+}
+MIN_CONNECTIONS = 1
+MAX_CONNECTIONS = 10
+# Statements prepared per connection, others run unprepared
+MAX_PREPARED = 200
+
+PLACEHOLDER = re.compile(r"%s|%%")
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class PreparedConnection(extensions.connection):
+    """Connection remembering the statements it has prepared: query text -> statement name"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = {}
+
+
+def positional(query):
+    """'... = %s AND ... = %s' -> '... = $1 AND ... = $2', as PREPARE expects"""
+    counter = iter(range(1, query.count("%s") + 1))
+    return PLACEHOLDER.sub(lambda m: f"${next(counter)}" if m.group() == "%s" else "%", query)
+
+
+class PostgresSQl:
+    """Make a singleton to use it when working with data
+
+        Connections come from a pool. Each statement runs in its own
+        transaction unless it is inside ``with db.transaction():``, which
+        keeps one connection for the whole block and commits once at the end.
+    """
+    _instance = None
+    def __new__(cls):
         if cls._instance is None:
             cls._instance = super(PostgresSQl, cls).__new__(cls)
-            cls._instance.conn = psycopg2.connect(
-            host="localhost",
-            database="cashbee",
-            user="postgres",
-            password="So@1234",
-            # To return data from the db a dictionary so that it's better to 
-            # get the data
-            cursor_factory=RealDictCursor 
-        )
-        cls._instance.cursor = cls._instance.conn.cursor()
+            cls._instance.pool = pool.ThreadedConnectionPool(
+                MIN_CONNECTIONS,
+                MAX_CONNECTIONS,
+                connection_factory=PreparedConnection,
+                # To return data from the db a dictionary so that it's better to
+                # get the data
+                cursor_factory=RealDictCursor,
+                **DB_SETTINGS,
+            )
+            cls._instance._local = threading.local()
         return cls._instance
-    
-    def execute(self, query,mapper = None, values=None):
-        if values:
-            self.cursor.execute(query, values)
+
+    @contextmanager
+    def transaction(self):
+        """Run several statements in one transaction: commit at the end, rollback on error"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            # Nested: part of the outer transaction
+            yield conn
+            return
+        conn = self.pool.getconn()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            self._rollback(conn)
+            raise
+        finally:
+            self._local.conn = None
+            self.pool.putconn(conn, close=bool(conn.closed))
+
+    @staticmethod
+    def _rollback(conn):
+        if conn.closed:
+            return
+        try:
+            conn.rollback()
+            # Start the prepared statements over rather than guess which survived
+            with conn.cursor() as cursor:
+                cursor.execute("DEALLOCATE ALL")
+            conn.commit()
+        except psycopg2.Error:
+            conn.close()
+        conn.prepared.clear()
+
+    @staticmethod
+    def _prepare(conn, cursor, query):
+        """Name of the prepared statement for query, None past MAX_PREPARED"""
+        name = conn.prepared.get(query)
+        if name is None and len(conn.prepared) < MAX_PREPARED:
+            name = f"cashbee_{len(conn.prepared) + 1}"
+            cursor.execute(f"PREPARE {name} AS {positional(query)}")
+            conn.prepared[query] = name
+        return name
+
+    def _run(self, conn, cursor, query, values):
+        name = self._prepare(conn, cursor, query)
+        if name is None:
+            cursor.execute(query, values)
+        elif values:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(values))})", values)
         else:
-            self.cursor.execute(query)
-        if not query.strip().upper().startswith("SELECT"):
-            self.conn.commit()
-            if not "RETURNING"in query.upper():        
-                return None  
-            else:
-                 row = self.cursor.fetchone()  
-            if row:
-                return mapper.from_dict(dict(row)) if mapper else list(row.values())[0]
-        try:          
-            rows = self.cursor.fetchall()
-            if mapper:         
-                if rows:
-                    return [mapper.from_dict(dict(row)) for row in rows]
+            cursor.execute(f"EXECUTE {name}")
+
+    def execute(self, query,mapper = None, values=None):
+        with self.transaction() as conn, conn.cursor() as cursor:
+            self._run(conn, cursor, query, values)
+            if not query.strip().upper().startswith("SELECT"):
+                if "RETURNING" not in query.upper():
+                    return None
+                row = cursor.fetchone()
+                if row:
+                    return mapper.from_dict(dict(row)) if mapper else list(row.values())[0]
                 return None
-        except psycopg2.ProgrammingError:
-            return None
+            rows = cursor.fetchall()
+            if mapper:
+                return [mapper.from_dict(dict(row)) for row in rows] if rows else None
+            return rows
+
+    def execute_batch(self, query, rows, page_size=100):
+        """Run one prepared statement for many rows, page_size rows per round-trip"""
+        rows = list(rows)
+        if not rows:
+            return
+        with self.transaction() as conn, conn.cursor() as cursor:
+            name = self._prepare(conn, cursor, query)
+            if name is not None:
+                query = f"EXECUTE {name} ({', '.join(['%s'] * len(rows[0]))})"
+            execute_batch(cursor, query, rows, page_size=page_size)
+
+    def execute_values(self, query, rows, mapper=None, page_size=100):
+        """INSERT ... VALUES %s for many rows, results of RETURNING in order"""
+        rows = list(rows)
+        if not rows:
+            return []
+        with self.transaction() as conn, conn.cursor() as cursor:
+            fetch = "RETURNING" in query.upper()
+            result = execute_values(cursor, query, rows, page_size=page_size, fetch=fetch)
+            if not fetch:
+                return []
+            if mapper:
+                return [mapper.from_dict(dict(row)) for row in result]
+            return [list(row.values())[0] for row in result]
 
     def close(self):
-        self.cursor.close()
-        self.conn.close()
+        self.pool.closeall()
         PostgresSQl._instance = None
+
+def _identifiers(names):
+    """Table and column names are written in the code; reject anything that is not a plain name"""
+    for name in names:
+        if not IDENTIFIER.match(name):
+            raise ValueError(f"❌ Invalid identifier: {name!r}")
+    return ", ".join(names)
+
 class QueriesdInfoHandling:
+    """
+        Builds the query text once per table/columns/condition, values are
+        always passed separately. Conditions are SQL written in the code with
+        %s placeholders, never user input.
+    """
     @staticmethod
-    def insert_handling(col,data,mapper):
-        # Handle data format to be correct written in the data
-        data = mapper.to_dict(data)
-        col_ = "(" + ", ".join(col) + ")"
-        placeholders = "("+", ".join(["%s"] * len(data))+")" 
-        return col_,placeholders,data
+    @lru_cache(maxsize=256)
+    def insert_query(table, col, pk=None, many=False):
+        values = "%s" if many else "(" + ", ".join(["%s"] * len(col)) + ")"
+        returning = " RETURNING " + _identifiers((pk,)) if pk else ""
+        return f"INSERT INTO {_identifiers((table,))} ({_identifiers(col)}) VALUES {values}{returning}"
+
     @staticmethod
-    def update_handling(col):
-        pattern = ",".join([f"{i} = %s" for i in col])
-        return pattern  
+    @lru_cache(maxsize=256)
+    def update_query(table, col, cond):
+        pattern = ", ".join(f"{c} = %s" for c in col)
+        _identifiers(col)
+        return f"UPDATE {_identifiers((table,))} SET {pattern} WHERE {cond}"
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def select_query(table, col=(), cond="", for_update=False):
+        col = _identifiers(col) if col else "*"
+        cond = f" WHERE {cond}" if cond else ""
+        lock = " FOR UPDATE" if for_update else ""
+        return f"SELECT {col} FROM {_identifiers((table,))}{cond}{lock}"
+
+def _columns(col):
+    if not col:
+        return ()
+    if isinstance(col, str):
+        return tuple(c.strip() for c in col.split(","))
+    return tuple(col)
+
 class QueryHandling:
     """
         Handling queries so that when need anything from db
-        it will me the query 
+        it will me the query
         columns is passed as lists or tuples
+
+        Group several calls in one transaction with
+        ``with QueryHandling.transaction():``
     """
     db = PostgresSQl()
+
+    @staticmethod
+    def transaction():
+        return QueryHandling.db.transaction()
+
     @staticmethod
     def add_data(table,col, data,mapper,pk =None):
-        col,place_holders,data = QueriesdInfoHandling.insert_handling(col,data,mapper)       
-        pk = "RETURNING "+pk if pk else ""
-        query = f"INSERT INTO {table} {col} VALUES {place_holders} {pk}"
-        result = QueryHandling.db.execute(query, values = data)
-        return result
+        query = QueriesdInfoHandling.insert_query(table, _columns(col), pk)
+        return QueryHandling.db.execute(query, values=mapper.to_dict(data))
+
+    @staticmethod
+    def add_many(table, col, records, mapper, pk=None, page_size=100):
+        """Insert many records in a few round-trips, returns their pk values when pk is given"""
+        query = QueriesdInfoHandling.insert_query(table, _columns(col), pk, many=True)
+        rows = [mapper.to_dict(record) for record in records]
+        return QueryHandling.db.execute_values(query, rows, page_size=page_size)
+
     @staticmethod
     def update_data(table,col,cond,data):
-        pt = QueriesdInfoHandling.update_handling(col)
-        query = f"UPDATE {table} SET {pt} WHERE {cond}"
-        QueryHandling.db.execute(query, values = data)
+        query = QueriesdInfoHandling.update_query(table, _columns(col), cond)
+        QueryHandling.db.execute(query, values=data)
+
+    @staticmethod
+    def update_many(table, col, cond, rows, page_size=100):
+        """Same update for many rows of values, e.g. [(balance, wallet_id), ...]"""
+        query = QueriesdInfoHandling.update_query(table, _columns(col), cond)
+        QueryHandling.db.execute_batch(query, rows, page_size=page_size)
+
+    @staticmethod
+    def retrieve_all(table, mapper, col="", cond="", data=None, for_update=False):
+        """Every matching row, as a list; for_update locks them until the transaction ends"""
+        query = QueriesdInfoHandling.select_query(table, _columns(col), cond, for_update)
+        return QueryHandling.db.execute(query, mapper, values=data) or []
+
     @staticmethod
-    def retrieve_data(table,mapper,col ="",cond="",data = None):
-        if not col:
-            col = '*'
-        elif isinstance(col, (list, tuple)):
-            col = ", ".join(col)
-        
-        cond = f"WHERE {cond}" if cond else ""
-        query = f"SELECT {col} FROM {table} {cond}"
-        result = QueryHandling.db.execute(query, mapper, values=data)
+    def retrieve_data(table,mapper,col ="",cond="",data = None, for_update=False):
+        result = QueryHandling.retrieve_all(table, mapper, col, cond, data, for_update)
         if not result:
             return None
-        return result if len(result)>1 else result[0] 
-    
\ No newline at end of file
+        return result if len(result)>1 else result[0]
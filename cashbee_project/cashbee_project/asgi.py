@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cashbee_project.settings')
+# Persistent connections are not reused across async requests, each one would
+# stay open until the worker exits, so default to closing them (settings.py
+# defaults to 60 for the WSGI deployment)
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
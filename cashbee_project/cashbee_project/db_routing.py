@@ -0,0 +1,108 @@
+"""
+Read replica routing.
+
+Only the viewset actions listed in ``ReplicaReadMixin.replica_actions`` read
+from READ_REPLICA['ALIAS']; everything else (transfers, limit checks, writes
+and any read inside a transaction) stays on the primary. After a transfer the
+users involved are pinned to the primary for READ_REPLICA['STICKY_SECONDS'] so
+they read their own writes despite replication lag. The pins must be visible
+to every worker, so READ_REPLICA['CACHE'] has to be a shared cache (Redis,
+Memcached, database): ``check_sticky_cache`` refuses to start otherwise.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULTS = {
+    'ALIAS': None,          # database alias of the replica, None disables routing
+    'STICKY_SECONDS': 5,    # should cover the replication lag
+    'CACHE': 'default',     # cache alias holding the sticky pins
+}
+
+# Backends that keep entries in the process: a pin set by one worker would not
+# be seen by the others
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_replica_settings():
+    return {**DEFAULTS, **getattr(settings, 'READ_REPLICA', {})}
+
+
+def check_sticky_cache():
+    """Raise ImproperlyConfigured when replica routing is on without a shared cache for the pins"""
+    conf = get_replica_settings()
+    if not conf['ALIAS']:
+        return
+    backend = settings.CACHES.get(conf['CACHE'], {}).get('BACKEND')
+    if backend is None or backend in PER_PROCESS_CACHES:
+        raise ImproperlyConfigured(
+            f"READ_REPLICA['CACHE'] ({conf['CACHE']!r}) must be a cache shared by all workers "
+            f"(Redis, Memcached or database), not {backend or 'an undefined cache'}: "
+            f"otherwise users don't read their own writes after a transfer."
+        )
+
+
+def current_read_alias():
+    return _read_alias.get()
+
+
+def _sticky_key(user_id):
+    return f"db:sticky:{user_id}"
+
+
+def pin_to_primary(*user_ids):
+    """Send reads of these users to the primary for a few seconds"""
+    conf = get_replica_settings()
+    if not conf['ALIAS']:
+        return
+    caches[conf['CACHE']].set_many({_sticky_key(pk): True for pk in user_ids}, timeout=conf['STICKY_SECONDS'])
+
+
+def is_pinned_to_primary(user_id):
+    conf = get_replica_settings()
+    return bool(caches[conf['CACHE']].get(_sticky_key(user_id)))
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """Route the read-only actions of a viewset to the replica"""
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        alias = get_replica_settings()['ALIAS']
+        if (alias and self.action in self.replica_actions
+                and not is_pinned_to_primary(request.user.pk)):
+            self._read_alias_token = _read_alias.set(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_alias_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._read_alias_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,8 @@ INSTALLED_APPS = [
     'users',
     'wallet',
     'scripts',
+    'fraud',
+    'notifications',
     'django_filters',
     'django.contrib.admin',
     'django.contrib.auth',  
@@ -85,11 +88,15 @@ WSGI_APPLICATION = 'cashbee_project.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'cashbee',        
-        'USER': 'postgres',            
-        'PASSWORD': 'So@1234',   
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': os.environ.get('DB_NAME', 'cashbee'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'So@1234'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # Keep connections open between requests instead of reconnecting
+        # every time, and check them before reuse
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
         'TEST': {
             'NAME': 'cashbee_test_db', 
         }
@@ -97,6 +104,57 @@ DATABASES = {
 
 }
 
+# DB_POOL=1 uses Django's built-in connection pool instead (needs psycopg 3,
+# `pip install "psycopg[binary,pool]"`). The pool lives in each gunicorn
+# worker, so size it to the worker's threads; workers * DB_POOL_MAX_SIZE must
+# stay below Postgres max_connections.
+if os.environ.get('DB_POOL') == '1':
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # required with a pool
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', os.environ.get('GUNICORN_THREADS', 4))),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'max_idle': 300,
+            'check': ConnectionPool.check_connection,  # health check on checkout
+        },
+    }
+
+
+# Caches: 'default' is per process. SHARED_CACHE_URL (e.g. redis://cache:6379/0)
+# adds a 'shared' cache seen by every worker
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+if os.environ.get('SHARED_CACHE_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['SHARED_CACHE_URL'],
+    }
+
+# Read replica (cashbee_project.db_routing): DB_REPLICA_HOST adds a 'replica'
+# alias that serves the read-only viewset actions, everything else stays on
+# the primary
+DATABASE_ROUTERS = ['cashbee_project.db_routing.ReadReplicaRouter']
+
+READ_REPLICA = {
+    'ALIAS': None,
+    'STICKY_SECONDS': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5)),
+    # Must be shared by all workers, startup fails on a per-process cache
+    'CACHE': os.environ.get('DB_REPLICA_STICKY_CACHE', 'shared'),
+}
+
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICA['ALIAS'] = 'replica'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -153,7 +211,7 @@ CORS_ALLOW_CREDENTIALS = True
 # إعدادات REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -167,4 +225,118 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
             'django_filters.rest_framework.DjangoFilterBackend',
             ],
-}
\ No newline at end of file
+}
+
+# Token -> user cache used by users.authentication.CachedTokenAuthentication.
+# SHARED_CACHE is an optional alias from CACHES shared by all workers (e.g. redis).
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,  # cached tokens per worker
+    'TTL': 60,          # seconds
+    'SHARED_CACHE': os.environ.get('TOKEN_AUTH_SHARED_CACHE'),
+}
+
+# Password hashing pool (users.hashing): PBKDF2 runs in worker processes with a
+# bounded queue, saturated pools answer 503 + Retry-After
+PASSWORD_HASHING = {
+    'ENABLED': os.environ.get('PASSWORD_HASHING_POOL') == '1',
+    'WORKERS': int(os.environ.get('PASSWORD_HASHING_WORKERS', 2)),
+    'MAX_PENDING': 16,
+    'TIMEOUT': 5,
+    'RETRY_AFTER': 1,
+}
+
+# PASSWORD_HASHER=argon2 (needs argon2-cffi) makes Argon2id the default hasher,
+# existing PBKDF2 hashes are rehashed transparently on the next login
+if os.environ.get('PASSWORD_HASHER') == 'argon2':
+    PASSWORD_HASHERS = [
+        'users.hashing.FastArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ]
+
+# Cold storage for old transactions (transactions.archive), written by the
+# archive_transactions command and read by ?include_archived=true on history
+TRANSACTION_ARCHIVE = {
+    'DIR': os.environ.get('TRANSACTION_ARCHIVE_DIR', BASE_DIR / 'archive' / 'transactions'),
+    'FORMAT': 'auto',
+}
+
+# Pending collection requests expire after TTL seconds, enforced by
+# `manage.py expire_collection_requests` (and checked again on approval)
+COLLECTION_REQUEST_EXPIRY = {
+    'TTL': int(os.environ.get('COLLECTION_REQUEST_TTL', 7 * 24 * 3600)),
+    'BATCH_SIZE': 1000,
+}
+
+# Recurring transfers, run by `manage.py run_recurring_transfers`
+RECURRING_TRANSFERS = {
+    'BATCH_SIZE': 50,
+    'MAX_FAILURES': 3,   # consecutive failed runs before a transfer is paused
+    'LEASE': 300,        # seconds a claimed transfer is reserved for its scheduler
+}
+
+# Credits to organizations with deferred_settlement are queued and added to
+# their wallets by `manage.py settle_deferred_credits`
+DEFERRED_SETTLEMENT = {
+    'BATCH_SIZE': 10000,
+}
+
+# Notifications: events are written to the outbox with each transfer or
+# collection request and delivered by `manage.py dispatch_outbox`
+NOTIFICATIONS = {
+    'NOTIFIERS': [
+        'notifications.notifiers.SMSNotifier',
+        'notifications.notifiers.PushNotifier',
+        'notifications.webhooks.WebhookNotifier',
+    ],
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF_BASE': 5,
+    'BACKOFF_MAX': 3600,
+    'LEASE': 300,
+}
+
+# Webhook delivery (notifications.webhooks), run by `manage.py deliver_webhooks`
+WEBHOOKS = {
+    'BATCH_SIZE': 500,
+    'CONCURRENCY': 200,
+    'TIMEOUT': 10,
+    'MAX_ATTEMPTS': 10,
+    'BACKOFF_BASE': 10,
+    'BACKOFF_MAX': 6 * 3600,
+    'LEASE': 120,
+    'ALLOW_INSECURE_URLS': False,
+}
+
+# Live updates stream (/api/async/live/, notifications.live). BROKER None picks
+# Postgres LISTEN/NOTIFY on PostgreSQL and the in-process broker otherwise
+LIVE_UPDATES = {
+    'BROKER': os.environ.get('LIVE_UPDATES_BROKER'),
+    'CHANNEL': 'cashbee_live',
+    'HEARTBEAT': 15,
+    'QUEUE_SIZE': 100,
+}
+
+# Login throttling (users.throttling): sliding windows are per worker,
+# lockouts are persisted on User.failed_attempts / User.lock_time
+LOGIN_THROTTLE = {
+    'IP_LIMIT': 20,
+    'IP_WINDOW': 60,
+    'PHONE_LIMIT': 5,
+    'PHONE_WINDOW': 300,
+    'MAX_FAILED_ATTEMPTS': 5,
+    'LOCKOUT': 900,
+}
+
+# Fraud detection model
+# The ML stack is imported lazily on the first score. Set FRAUD_MODEL_PRELOAD=1
+# with `gunicorn --preload` to load it once in the master and share it with workers.
+FRAUD_MODEL_PATH = os.environ.get(
+    'FRAUD_MODEL_PATH', str(BASE_DIR.parent / 'Data Science' / 'xgb_fraud_model.joblib')
+)
+FRAUD_MODEL_SHA256 = os.environ.get('FRAUD_MODEL_SHA256')  # pinned hash; a `<artifact>.sha256` sidecar is used only without it
+FRAUD_MODEL_CHECK_INTERVAL = 30  # seconds between checks for a new artifact
+FRAUD_MODEL_PRELOAD = os.environ.get('FRAUD_MODEL_PRELOAD') == '1'
@@ -5,18 +5,37 @@ from users import views as user_views
 from wallet import views as wallet_views
 from transactions import views as transaction_views
 from users import auth_views as auth_views 
+from users import async_views as user_async_views
+from wallet import async_views as wallet_async_views
+from transactions import async_views as transaction_async_views
+from notifications import views as notification_views
+from notifications import async_views as notification_async_views
 
 router = DefaultRouter()
 router.register(r'users', user_views.UserViewSet)
 router.register(r'transactions', transaction_views.TransactionViewSet)
 router.register(r"collection-requests", transaction_views.CollectionRequestViewSet, basename="collection-request")
+router.register(r'recurring-transfers', transaction_views.RecurringTransferViewSet, basename='recurring-transfer')
+router.register(r'organizations', transaction_views.OrganizationViewSet, basename='organization')
+router.register(r'bills', transaction_views.BillViewSet, basename='bill')
 router.register(r'children', user_views.ChildViewSet, basename='child')
 router.register(r'families', user_views.FamilyViewSet, basename='family')
+router.register(r'webhooks', notification_views.WebhookEndpointViewSet, basename='webhook')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/signup/', auth_views.SignupView.as_view(), name='signup'),
     path('api/login/', auth_views.LoginView.as_view(), name='login'),
-    path('api/', include('wallet.urls'))
+    path('api/', include('wallet.urls')),
+
+    # Async read endpoints, meant for the ASGI deployment (gunicorn_asgi.conf.py)
+    path('api/async/wallet/', wallet_async_views.wallet_detail, name='async-wallet-detail'),
+    path('api/async/transactions/', transaction_async_views.transaction_list, name='async-transaction-list'),
+    path('api/async/collection-requests/received/', transaction_async_views.received_requests,
+         name='async-collection-requests-received'),
+    path('api/async/collection-requests/sent/', transaction_async_views.sent_requests,
+         name='async-collection-requests-sent'),
+    path('api/async/families/<int:pk>/members/', user_async_views.family_members, name='async-family-members'),
+    path('api/async/live/', notification_async_views.live_updates, name='async-live-updates'),
 ]
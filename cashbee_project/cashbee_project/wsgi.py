@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cashbee_project.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.FRAUD_MODEL_PRELOAD:
+    # With `gunicorn --preload` this runs once in the master,
+    # forked workers then share the loaded model pages
+    from fraud.registry import get_registry
+    get_registry().warm_up()
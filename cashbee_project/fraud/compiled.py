@@ -0,0 +1,185 @@
+"""
+Array-backed tree ensemble for scoring without the XGBoost runtime.
+
+``export_booster`` converts a trained XGBClassifier / Booster (binary:logistic)
+into flattened node arrays saved with ``np.savez_compressed``.
+``CompiledForest`` evaluates those arrays with NumPy only, so workers never
+import xgboost to score.
+"""
+import json
+import math
+
+import numpy as np
+
+SUPPORTED_OBJECTIVES = ('binary:logistic', 'reg:logistic')
+
+
+class CompiledForest:
+    """
+    All trees flattened into one set of node arrays.
+    Leaves point to themselves, so walking ``depth`` steps from every root
+    always ends on a leaf whatever the tree depth.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, base_margin, depth,
+                 feature_names=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.base_margin = float(base_margin)
+        self.depth = int(depth)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        # children[2 * node] is the right child, children[2 * node + 1] the left one
+        self._children = np.stack([self.right, self.left], axis=1).ravel()
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right,
+                                      self.default_left, self.value, self.roots))
+
+    def _as_matrix(self, X):
+        if self.feature_names is not None and hasattr(X, 'columns'):
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return X
+
+    def predict_margin(self, X):
+        X = self._as_matrix(X)
+        n_rows, n_cols = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * n_cols)[:, None]
+        has_missing = bool(np.isnan(flat).any())
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+
+        for _ in range(self.depth):
+            values = flat[row_offsets + self.feature[nodes]]
+            go_left = values < self.threshold[nodes]
+            if has_missing:
+                missing = np.isnan(values)
+                go_left[missing] = self.default_left[nodes][missing]
+            nodes = self._children[2 * nodes + go_left]
+
+        # Sum leaves in float32 like XGBoost, then add the base margin
+        return self.value[nodes].sum(axis=1, dtype=np.float32) + np.float32(self.base_margin)
+
+    def predict_proba(self, X):
+        """Same layout as XGBClassifier.predict_proba: columns [class 0, class 1]"""
+        margin = self.predict_margin(X).astype(np.float64)
+        positive = 1.0 / (1.0 + np.exp(-margin))
+        return np.column_stack([1.0 - positive, positive])
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            default_left=self.default_left,
+            value=self.value,
+            roots=self.roots,
+            base_margin=np.float64(self.base_margin),
+            depth=np.int32(self.depth),
+            feature_names=np.array(self.feature_names or [], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            feature_names = data['feature_names'].tolist() or None
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['right'], data['default_left'],
+                data['value'], data['roots'], float(data['base_margin']), int(data['depth']),
+                feature_names=feature_names,
+            )
+
+
+def _parse_base_score(raw):
+    # XGBoost >= 3 writes base_score as "[1.6E-3]", older versions as "1.6E-3"
+    return float(str(raw).strip('[]').split(',')[0])
+
+
+def _tree_depth(left, right):
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, level = stack.pop()
+        if left[node] == -1:
+            depth = max(depth, level)
+        else:
+            stack.append((left[node], level + 1))
+            stack.append((right[node], level + 1))
+    return depth
+
+
+def compile_model_json(model_json):
+    """Build a CompiledForest from the dict produced by ``Booster.save_raw('json')``"""
+    learner = model_json['learner']
+    objective = learner['objective']['name']
+    if objective not in SUPPORTED_OBJECTIVES:
+        raise ValueError(f"❌ Unsupported objective for compilation: {objective}")
+
+    gbm = learner['gradient_booster']
+    if gbm['name'] != 'gbtree':
+        raise ValueError(f"❌ Only gbtree boosters can be compiled, got {gbm['name']}")
+
+    base_score = _parse_base_score(learner['learner_model_param']['base_score'])
+    base_margin = math.log(base_score / (1.0 - base_score))
+
+    feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+    depth = 0
+    for tree in gbm['model']['trees']:
+        if any(tree.get('split_type', [])):
+            raise ValueError("❌ Categorical splits are not supported")
+
+        offset = len(feature)
+        roots.append(offset)
+        t_left = tree['left_children']
+        t_right = tree['right_children']
+        depth = max(depth, _tree_depth(t_left, t_right))
+
+        for node, (l, r) in enumerate(zip(t_left, t_right)):
+            if l == -1:
+                # Leaf: split_conditions holds the leaf weight
+                feature.append(0)
+                threshold.append(0.0)
+                left.append(offset + node)
+                right.append(offset + node)
+                default_left.append(True)
+                value.append(tree['split_conditions'][node])
+            else:
+                feature.append(tree['split_indices'][node])
+                threshold.append(tree['split_conditions'][node])
+                left.append(offset + l)
+                right.append(offset + r)
+                default_left.append(bool(tree['default_left'][node]))
+                value.append(0.0)
+
+    feature_names = learner.get('feature_names') or None
+    return CompiledForest(feature, threshold, left, right, default_left, value, roots, base_margin, depth,
+                          feature_names=feature_names)
+
+
+def export_booster(model):
+    """Compile an XGBClassifier or Booster (requires xgboost, offline only)"""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None and getattr(model, 'early_stopping_rounds', None):
+        # predict_proba only uses the trees up to the best iteration
+        booster = booster[: best_iteration + 1]
+    raw = booster.save_raw(raw_format='json')
+    return compile_model_json(json.loads(bytes(raw)))
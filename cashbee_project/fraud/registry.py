@@ -0,0 +1,189 @@
+"""
+Registry for the fraud detection model artifact.
+
+joblib / xgboost / sklearn are never imported at module level: the artifact is
+only loaded the first time a score is requested (or when ``warm_up`` is called
+from the gunicorn master so forked workers share the loaded pages).
+The artifact file is re-checked every few seconds and a new
+``xgb_fraud_model.joblib`` is hot-swapped in without restarting workers.
+Pointing FRAUD_MODEL_PATH to an exported ``.npz`` keeps xgboost out of the
+workers entirely.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelArtifactError(Exception):
+    """Raised when the model artifact is missing or fails its hash check"""
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Compute the sha256 of a file without reading it all in memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_joblib(path):
+    """The ML stack is imported here, on first use only"""
+    import joblib
+    return joblib.load(path)
+
+
+def load_artifact(path):
+    """
+    Default loader: a ``.npz`` artifact is a compiled forest scored with NumPy
+    only (see fraud.compiled), anything else is a joblib-dumped model.
+    """
+    if str(path).endswith('.npz'):
+        from .compiled import CompiledForest
+        return CompiledForest.load(path)
+    return load_joblib(path)
+
+
+class ModelArtifact:
+    """A loaded model together with the file state it was loaded from"""
+
+    def __init__(self, model, path, sha256, signature):
+        self.model = model
+        self.path = path
+        self.sha256 = sha256
+        self.signature = signature
+        self.loaded_at = time.time()
+
+    def __repr__(self):
+        return f"ModelArtifact({os.path.basename(self.path)}, sha256={self.sha256[:12]})"
+
+
+class FraudModelRegistry:
+    """
+    Holds the current model artifact for this process.
+    Readers never block on a reload: the artifact reference is swapped
+    only after the new model is fully loaded and verified.
+    """
+
+    def __init__(self, path, expected_sha256=None, check_interval=30, loader=load_artifact):
+        self.path = str(path)
+        self.expected_sha256 = expected_sha256
+        self.check_interval = check_interval
+        self.loader = loader
+        self._artifact = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self):
+        return self._artifact is not None
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            raise ModelArtifactError(f"❌ Model artifact not found: {self.path}")
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _expected_hash(self):
+        """
+        The configured hash is authoritative: an artifact that does not match
+        it is rejected whatever its sidecar says. The ``<artifact>.sha256``
+        sidecar is only used when no hash is configured.
+        """
+        if self.expected_sha256:
+            return self.expected_sha256.lower()
+        sidecar = self.path + '.sha256'
+        if os.path.exists(sidecar):
+            with open(sidecar) as f:
+                content = f.read().split()
+            if content:
+                return content[0].lower()
+        return None
+
+    def _load(self, signature):
+        sha256 = file_sha256(self.path)
+        expected = self._expected_hash()
+        if expected and sha256 != expected:
+            raise ModelArtifactError(
+                f"❌ Model artifact hash mismatch for {self.path}: "
+                f"expected {expected}, got {sha256}"
+            )
+        model = self.loader(self.path)
+        return ModelArtifact(model, self.path, sha256, signature)
+
+    def get(self):
+        """Return the current artifact, loading or hot-swapping it if needed"""
+        artifact = self._artifact
+        now = time.monotonic()
+        if artifact is not None and now < self._next_check:
+            return artifact
+
+        with self._lock:
+            artifact = self._artifact
+            if artifact is not None and now < self._next_check:
+                return artifact
+            self._next_check = now + self.check_interval
+
+            try:
+                signature = self._signature()
+            except ModelArtifactError:
+                if artifact is None:
+                    raise
+                logger.warning("Model artifact %s disappeared, keeping loaded model", self.path)
+                return artifact
+
+            if artifact is not None and artifact.signature == signature:
+                return artifact
+
+            try:
+                new_artifact = self._load(signature)
+            except Exception:
+                if artifact is None:
+                    raise
+                # Keep serving the old model, a broken deploy must not take scoring down
+                logger.exception("Failed to hot-swap model artifact %s, keeping %r", self.path, artifact)
+                return artifact
+
+            if artifact is not None:
+                logger.info("Hot-swapped fraud model %r -> %r", artifact, new_artifact)
+            self._artifact = new_artifact
+            return new_artifact
+
+    def reload(self):
+        """Force a re-check of the artifact file on the next access"""
+        self._next_check = 0.0
+        return self.get()
+
+    def warm_up(self):
+        """Load the model now (e.g. in the gunicorn master before forking)"""
+        return self.get()
+
+    def predict_proba(self, rows):
+        """Fraud probability (class 1) for each row of features"""
+        model = self.get().model
+        return model.predict_proba(rows)[:, 1]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Process wide registry configured from settings"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FraudModelRegistry(
+                    path=settings.FRAUD_MODEL_PATH,
+                    expected_sha256=getattr(settings, 'FRAUD_MODEL_SHA256', None),
+                    check_interval=getattr(settings, 'FRAUD_MODEL_CHECK_INTERVAL', 30),
+                )
+    return _registry
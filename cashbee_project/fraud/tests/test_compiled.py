@@ -0,0 +1,97 @@
+import math
+import os
+import tempfile
+import unittest
+import numpy as np
+from django.test import SimpleTestCase
+from fraud.compiled import CompiledForest, compile_model_json
+
+try:
+    import xgboost
+except ImportError:
+    xgboost = None
+
+
+def model_json(trees, base_score='[5E-1]'):
+    return {
+        'learner': {
+            'objective': {'name': 'binary:logistic'},
+            'learner_model_param': {'base_score': base_score},
+            'feature_names': ['a', 'b'],
+            'gradient_booster': {'name': 'gbtree', 'model': {'trees': trees}},
+        }
+    }
+
+
+# a < 1.0 ? (b < 2.0 ? 0.1 : 0.2) : 0.3, missing a goes right
+TREE_1 = {
+    'left_children': [1, 3, -1, -1, -1],
+    'right_children': [2, 4, -1, -1, -1],
+    'split_indices': [0, 1, 0, 0, 0],
+    'split_conditions': [1.0, 2.0, 0.3, 0.1, 0.2],
+    'default_left': [0, 1, 0, 0, 0],
+}
+# single leaf
+TREE_2 = {
+    'left_children': [-1],
+    'right_children': [-1],
+    'split_indices': [0],
+    'split_conditions': [-0.5],
+    'default_left': [0],
+}
+
+
+class CompiledForestTest(SimpleTestCase):
+    def setUp(self):
+        self.forest = compile_model_json(model_json([TREE_1, TREE_2]))
+
+    def test_layout(self):
+        self.assertEqual(self.forest.n_trees, 2)
+        self.assertEqual(self.forest.n_nodes, 6)
+        self.assertEqual(self.forest.depth, 2)
+
+    def test_margins_follow_splits(self):
+        X = np.array([
+            [0.0, 0.0],     # left, left -> 0.1
+            [0.0, 5.0],     # left, right -> 0.2
+            [3.0, 0.0],     # right -> 0.3
+            [np.nan, 0.0],  # missing -> right -> 0.3
+            [0.0, np.nan],  # missing -> left -> 0.1
+        ])
+        expected = np.array([0.1, 0.2, 0.3, 0.3, 0.1]) - 0.5
+        np.testing.assert_allclose(self.forest.predict_margin(X), expected, atol=1e-6)
+
+    def test_predict_proba_uses_base_score(self):
+        forest = compile_model_json(model_json([TREE_2], base_score='2E-1'))
+        proba = forest.predict_proba(np.zeros((1, 2)))
+        margin = math.log(0.2 / 0.8) - 0.5
+        self.assertAlmostEqual(proba[0, 1], 1 / (1 + math.exp(-margin)), places=6)
+        self.assertAlmostEqual(proba[0, 0] + proba[0, 1], 1.0)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.npz')
+            self.forest.save(path)
+            loaded = CompiledForest.load(path)
+        self.assertEqual(loaded.feature_names, ['a', 'b'])
+        X = np.array([[0.0, 5.0], [3.0, 1.0]])
+        np.testing.assert_array_equal(loaded.predict_margin(X), self.forest.predict_margin(X))
+
+    def test_unsupported_objective(self):
+        data = model_json([TREE_2])
+        data['learner']['objective']['name'] = 'multi:softprob'
+        with self.assertRaises(ValueError):
+            compile_model_json(data)
+
+    @unittest.skipIf(xgboost is None, "xgboost not installed")
+    def test_matches_xgboost(self):
+        from fraud.compiled import export_booster
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(500, 5)).astype(np.float32)
+        y = (X[:, 0] + X[:, 1] * X[:, 2] > 0.5).astype(int)
+        X[::11, 3] = np.nan
+        model = xgboost.XGBClassifier(n_estimators=20, max_depth=4, random_state=0)
+        model.fit(X, y)
+
+        compiled = export_booster(model)
+        np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), atol=1e-5)
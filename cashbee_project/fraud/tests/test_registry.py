@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+from django.test import SimpleTestCase
+from fraud.registry import FraudModelRegistry, ModelArtifactError, file_sha256
+
+
+class FraudModelRegistryTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'model.joblib')
+        self.write_artifact(b'model-v1')
+        self.loads = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_artifact(self, content):
+        # Write then rename, the way a deploy swaps the artifact
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+    def loader(self, path):
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.loads.append(content)
+        return content
+
+    def make_registry(self, **kwargs):
+        kwargs.setdefault('check_interval', 0)
+        return FraudModelRegistry(self.path, loader=self.loader, **kwargs)
+
+    def test_model_is_loaded_lazily(self):
+        registry = self.make_registry()
+        self.assertFalse(registry.is_loaded)
+        self.assertEqual(self.loads, [])
+
+        self.assertEqual(registry.get().model, b'model-v1')
+        self.assertTrue(registry.is_loaded)
+
+    def test_unchanged_artifact_is_not_reloaded(self):
+        registry = self.make_registry()
+        registry.get()
+        registry.get()
+        self.assertEqual(len(self.loads), 1)
+
+    def test_hash_mismatch_is_rejected(self):
+        registry = self.make_registry(expected_sha256='0' * 64)
+        with self.assertRaises(ModelArtifactError):
+            registry.get()
+
+    def test_sidecar_hash_is_used_when_none_is_configured(self):
+        with open(self.path + '.sha256', 'w') as f:
+            f.write('0' * 64 + '\n')
+        with self.assertRaises(ModelArtifactError):
+            self.make_registry().get()
+
+        with open(self.path + '.sha256', 'w') as f:
+            f.write(file_sha256(self.path) + '\n')
+        self.assertEqual(self.make_registry().get().model, b'model-v1')
+
+    def test_configured_hash_wins_over_sidecar(self):
+        # A replaced artifact shipped with a matching sidecar is still rejected
+        with open(self.path + '.sha256', 'w') as f:
+            f.write(file_sha256(self.path) + '\n')
+        registry = self.make_registry(expected_sha256='0' * 64)
+        with self.assertRaises(ModelArtifactError):
+            registry.get()
+
+    def test_hot_swap_new_artifact(self):
+        registry = self.make_registry()
+        first = registry.get()
+
+        time.sleep(0.01)
+        self.write_artifact(b'model-v2-bigger')
+        second = registry.get()
+
+        self.assertEqual(second.model, b'model-v2-bigger')
+        self.assertNotEqual(first.sha256, second.sha256)
+
+    def test_bad_artifact_keeps_serving_old_model(self):
+        registry = self.make_registry(expected_sha256=file_sha256(self.path))
+        registry.get()
+
+        self.write_artifact(b'tampered-model')
+        self.assertEqual(registry.get().model, b'model-v1')
+
+    def test_missing_artifact(self):
+        os.remove(self.path)
+        with self.assertRaises(ModelArtifactError):
+            self.make_registry().get()
+
+    def test_check_interval_skips_stat(self):
+        registry = self.make_registry(check_interval=3600)
+        registry.get()
+        self.write_artifact(b'model-v2-bigger')
+        self.assertEqual(registry.get().model, b'model-v1')
+        self.assertEqual(registry.reload().model, b'model-v2-bigger')
@@ -0,0 +1,13 @@
+"""
+Gunicorn settings for the WSGI deployment.
+Run with: gunicorn -c gunicorn.conf.py cashbee_project.wsgi
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+# Import the app (and the fraud model when FRAUD_MODEL_PRELOAD=1) in the master
+# so workers share it copy-on-write instead of loading it once per worker
+preload_app = os.environ.get('FRAUD_MODEL_PRELOAD') == '1'
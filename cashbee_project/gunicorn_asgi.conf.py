@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for the ASGI deployment (uvicorn workers).
+Run with: gunicorn -c gunicorn_asgi.conf.py cashbee_project.asgi
+
+Each worker runs an event loop: the async endpoints under /api/async/ serve
+many slow clients per worker, the sync DRF views still work (in a thread).
+DB_CONN_MAX_AGE defaults to 0 here (see asgi.py), persistent connections are
+not reused across async requests; use DB_POOL=1 to keep connections around.
+"""
+import os
+
+if int(os.environ.get('DB_CONN_MAX_AGE') or 0) and os.environ.get('DB_POOL') != '1':
+    raise RuntimeError(
+        "❌ DB_CONN_MAX_AGE must be 0 under ASGI, persistent connections leak "
+        "one per async request; unset it or use DB_POOL=1"
+    )
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+worker_class = 'uvicorn.workers.UvicornWorker'
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+preload_app = os.environ.get('FRAUD_MODEL_PRELOAD') == '1'
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import OutboxEvent, WebhookDelivery, WebhookEndpoint
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('event_type', 'aggregate_id', 'status', 'attempts', 'available_at', 'created_at')
+    list_filter = ('status', 'event_type')
+    readonly_fields = ('created_at', 'delivered_at', 'delivered_to')
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'url', 'is_active', 'max_concurrency', 'created_at')
+    search_fields = ('owner__phone_number', 'url')
+    list_filter = ('is_active',)
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('endpoint', 'event_type', 'status', 'attempts', 'last_status_code', 'next_attempt_at')
+    list_filter = ('status', 'event_type')
+    readonly_fields = ('created_at', 'delivered_at')
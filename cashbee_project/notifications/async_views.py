@@ -0,0 +1,74 @@
+"""
+Server-sent events stream of live updates for the current user, served by the
+ASGI deployment. Only the initial snapshot reads the database; afterwards the
+connection waits on the live updates broker (see notifications.live).
+"""
+import json
+
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from users.authentication import async_token_required
+from wallet.models import Wallet
+
+from .live import get_broker, get_live_settings
+
+
+def format_event(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def event_stream(subscription, snapshot, heartbeat):
+    """SSE lines: the snapshot, then every published event, with keep-alive comments when idle"""
+    try:
+        yield "retry: 3000\n\n"
+        for event_type, data in snapshot:
+            yield format_event(event_type, data)
+        while True:
+            message = await subscription.get(timeout=heartbeat)
+            if message is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_event(message['type'], message['data'])
+    finally:
+        subscription.close()
+
+
+def token_from_query(view):
+    """
+    EventSource can't send headers, so also accept ?token=<key>. The key ends up
+    in the URL and so in proxy and server access logs: strip the query string
+    from the log format for /api/async/live/ or use a short-lived token.
+    """
+    async def wrapper(request, *args, **kwargs):
+        token = request.GET.get('token')
+        if token and 'HTTP_AUTHORIZATION' not in request.META:
+            request.META['HTTP_AUTHORIZATION'] = f"Token {token}"
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@require_GET
+@token_from_query
+@async_token_required
+async def live_updates(request):
+    # Subscribe before reading the snapshot so no update falls in between
+    subscription = get_broker().subscribe(request.user.pk)
+    try:
+        snapshot = []
+        balance = await Wallet.objects.filter(user_id=request.user.pk).values_list('balance', flat=True).afirst()
+        if balance is not None:
+            snapshot.append(('wallet.balance', {'balance': str(balance), 'transaction_id': None}))
+    except BaseException:
+        subscription.close()
+        raise
+
+    response = StreamingHttpResponse(
+        event_stream(subscription, snapshot, get_live_settings()['HEARTBEAT']),
+        content_type='text/event-stream',
+    )
+    # event_stream only unsubscribes once iterated, the handler closes the
+    # response even when the client is gone before the first chunk
+    response._resource_closers.append(subscription.close)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # no proxy buffering under nginx
+    return response
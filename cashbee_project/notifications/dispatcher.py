@@ -0,0 +1,111 @@
+"""
+Drains the outbox in batches. Several workers can run at once: each claims
+its batch with SELECT ... FOR UPDATE SKIP LOCKED and pushes available_at past
+a lease, then commits before calling any notifier, so no row lock is held
+during I/O. The notifiers that succeeded are saved in ``delivered_to`` and
+skipped when the event is retried with exponential backoff; it is marked
+Failed after MAX_ATTEMPTS.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+from .notifiers import get_notifiers
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'NOTIFIERS': ['notifications.notifiers.LoggingNotifier'],
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF_BASE': 5,      # seconds, doubled on every attempt
+    'BACKOFF_MAX': 3600,
+    'LEASE': 300,           # a claimed event is not picked up by another worker for this long
+}
+
+
+def get_notification_settings():
+    return {**DEFAULTS, **getattr(settings, 'NOTIFICATIONS', {})}
+
+
+def notifier_key(notifier):
+    return f"{type(notifier).__module__}.{type(notifier).__qualname__}"
+
+
+class OutboxDispatcher:
+    def __init__(self, notifiers=None, batch_size=None):
+        conf = get_notification_settings()
+        self.notifiers = notifiers if notifiers is not None else get_notifiers(conf['NOTIFIERS'])
+        self.batch_size = batch_size or conf['BATCH_SIZE']
+        self.max_attempts = conf['MAX_ATTEMPTS']
+        self.backoff_base = conf['BACKOFF_BASE']
+        self.backoff_max = conf['BACKOFF_MAX']
+        self.lease = conf['LEASE']
+
+    def backoff(self, attempts):
+        return timedelta(seconds=min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max))
+
+    def claim_batch(self, now):
+        """Lock due events, push available_at to the end of the lease and commit"""
+        lease_until = now + timedelta(seconds=self.lease)
+        with db_transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboxEvent.Status.PENDING, available_at__lte=now)
+                .order_by('id')[:self.batch_size]
+            )
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(available_at=lease_until)
+        for event in events:
+            event.available_at = lease_until
+        return events
+
+    def deliver(self, event):
+        """Send to the notifiers the event has not reached yet, return their errors"""
+        errors = []
+        for notifier in self.notifiers:
+            key = notifier_key(notifier)
+            if key in event.delivered_to:
+                continue
+            try:
+                notifier.send(event)
+            except Exception as e:
+                errors.append(f"{key}: {type(e).__name__}: {e}")
+            else:
+                event.delivered_to.append(key)
+        return errors
+
+    def record(self, event, errors, lease_until):
+        """Save one attempt, unless the lease ran out and another worker claimed the event"""
+        now = timezone.now()
+        event.attempts += 1
+        if not errors:
+            event.status = OutboxEvent.Status.DELIVERED
+            event.delivered_at = now
+        else:
+            event.last_error = "; ".join(errors)[:1000]
+            if event.attempts >= self.max_attempts:
+                event.status = OutboxEvent.Status.FAILED
+                logger.error("Outbox event %s failed after %s attempts: %s", event.pk, event.attempts, event.last_error)
+            else:
+                event.available_at = now + self.backoff(event.attempts)
+        return OutboxEvent.objects.filter(
+            pk=event.pk, status=OutboxEvent.Status.PENDING, available_at=lease_until,
+        ).update(
+            status=event.status, attempts=event.attempts, available_at=event.available_at,
+            last_error=event.last_error, delivered_at=event.delivered_at, delivered_to=event.delivered_to,
+        )
+
+    def dispatch_batch(self):
+        """Deliver one batch of due events, return how many were processed"""
+        events = self.claim_batch(timezone.now())
+        for event in events:
+            # Each event is saved as soon as it is done, a crash later in the
+            # batch does not resend it
+            lease_until = event.available_at
+            if not self.record(event, self.deliver(event), lease_until):
+                logger.warning("Outbox event %s was claimed again before its result was saved", event.pk)
+        return len(events)
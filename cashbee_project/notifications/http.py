@@ -0,0 +1,183 @@
+"""
+Minimal asyncio HTTP/1.1 client for webhook delivery.
+
+Only what posting a JSON body needs: one request per connection at a time,
+idle connections kept per (scheme, host, port) and reused, Content-Length and
+chunked responses. A pooled connection the server closed in the meantime is
+retried once on a fresh one.
+
+Webhook URLs are chosen by users, so only https URLs resolving to public
+addresses are accepted: ``check_public_url`` at registration, and again when
+connecting, to the address that was checked (a DNS answer changed in between
+cannot point the worker at an internal service). ``allow_insecure`` lifts both
+rules for local development and tests.
+"""
+import asyncio
+import ipaddress
+import socket
+import ssl
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+
+class HTTPClientError(Exception):
+    """The request could not be sent or the response could not be read"""
+
+
+class UnsafeURLError(HTTPClientError):
+    """The URL is not https or points at a loopback, private, link-local or reserved address"""
+
+
+def is_public_address(address):
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _public_addresses(host, infos):
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise UnsafeURLError(f"❌ {host} does not resolve to any address")
+    for address in addresses:
+        if not is_public_address(address):
+            raise UnsafeURLError(f"❌ {host} resolves to a non-public address ({address})")
+    return addresses
+
+
+def _split(url, allow_insecure):
+    parts = urlsplit(url)
+    schemes = ('http', 'https') if allow_insecure else ('https',)
+    if parts.scheme not in schemes or not parts.hostname:
+        raise UnsafeURLError(f"❌ Webhook URLs must use {' or '.join(schemes)}: {url}")
+    return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+
+
+def check_public_url(url, allow_insecure=False):
+    """Raise UnsafeURLError unless ``url`` is https and every address of its host is public"""
+    scheme, host, port = _split(url, allow_insecure)
+    if allow_insecure:
+        return
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError as e:
+        raise UnsafeURLError(f"❌ {host} could not be resolved") from e
+    _public_addresses(host, infos)
+
+
+class KeepAliveHTTPClient:
+    def __init__(self, timeout=10, max_idle_per_host=32, user_agent='Cashbee-Webhooks/1.0', allow_insecure=False):
+        self.timeout = timeout
+        self.allow_insecure = allow_insecure
+        self.max_idle_per_host = max_idle_per_host
+        self.user_agent = user_agent
+        self.connections_opened = 0
+        self._idle = defaultdict(deque)
+        self._ssl_context = None
+
+    def _ssl(self):
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        address = host
+        if not self.allow_insecure:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            address = _public_addresses(host, infos)[0]
+        if scheme == 'https':
+            conn = await asyncio.open_connection(address, port, ssl=self._ssl(), server_hostname=host)
+        else:
+            conn = await asyncio.open_connection(address, port)
+        self.connections_opened += 1
+        return conn
+
+    @staticmethod
+    def _close(conn):
+        conn[1].close()
+
+    async def post(self, url, body, headers=None):
+        """POST ``body`` (bytes) and return the response status code"""
+        key = _split(url, self.allow_insecure)
+        parts = urlsplit(url)
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        host = parts.netloc.rpartition('@')[2]
+
+        lines = [f'POST {target} HTTP/1.1', f'Host: {host}', f'User-Agent: {self.user_agent}',
+                 'Content-Type: application/json', f'Content-Length: {len(body)}', 'Connection: keep-alive']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+        idle = self._idle[key]
+        while idle:
+            conn = idle.pop()
+            try:
+                return await self._send(key, conn, request)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Closed by the server while idle, try the next one
+                continue
+        try:
+            conn = await asyncio.wait_for(self._connect(key), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise HTTPClientError(f"Connection to {key[1]}:{key[2]} failed: {e!r}") from e
+        try:
+            return await self._send(key, conn, request)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            raise HTTPClientError(f"Request to {url} failed: {e!r}") from e
+
+    async def _send(self, key, conn, request):
+        try:
+            status, keep_alive = await asyncio.wait_for(self._roundtrip(conn, request), self.timeout)
+        except asyncio.TimeoutError as e:
+            self._close(conn)
+            raise HTTPClientError(f"Timed out after {self.timeout}s") from e
+        except BaseException:
+            self._close(conn)
+            raise
+        idle = self._idle[key]
+        if keep_alive and len(idle) < self.max_idle_per_host:
+            idle.append(conn)
+        else:
+            self._close(conn)
+        return status
+
+    @staticmethod
+    async def _roundtrip(conn, request):
+        reader, writer = conn
+        writer.write(request)
+        await writer.drain()
+
+        status_line = await reader.readuntil(b'\r\n')
+        if not status_line.strip():
+            raise ConnectionResetError("Empty response")
+        version, status, _ = status_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        # The body is read and dropped, only the status matters
+        keep_alive = version != 'HTTP/1.0' and headers.get('connection', '').lower() != 'close'
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    while await reader.readuntil(b'\r\n') != b'\r\n':
+                        pass
+                    break
+                await reader.readexactly(size + 2)
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        else:
+            await reader.read()
+            keep_alive = False
+        return int(status), keep_alive
+
+    async def close(self):
+        for idle in self._idle.values():
+            while idle:
+                self._close(idle.pop())
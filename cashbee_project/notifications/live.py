@@ -0,0 +1,206 @@
+"""
+Live updates for connected clients (server-sent events, see async_views).
+
+Balance changes and collection request updates are published once their
+transaction commits. A broker fans them out to the subscribers connected to
+this worker:
+
+- PostgresBroker: publish runs NOTIFY, one LISTEN connection per worker
+  process forwards notifications to its subscribers. Works across workers,
+  and an idle client costs no query at all.
+- InProcessBroker: subscribers only see events published in the same process
+  (development on SQLite, tests).
+
+LIVE_UPDATES['BROKER'] picks one, by default PostgresBroker on PostgreSQL.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.db import transaction as db_transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BROKER': None,
+    'CHANNEL': 'cashbee_live',
+    'HEARTBEAT': 15,     # seconds between keep-alive comments on an idle stream
+    'QUEUE_SIZE': 100,   # pending events per client, the oldest are dropped past it
+}
+
+
+def get_live_settings():
+    return {**DEFAULTS, **getattr(settings, 'LIVE_UPDATES', {})}
+
+
+class Subscription:
+    """Events for one connected client, consumed from its event loop"""
+
+    def __init__(self, broker, user_id, queue_size):
+        self.broker = broker
+        self.user_id = user_id
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, message):
+        """Thread-safe, called by the broker"""
+        try:
+            self._loop.call_soon_threadsafe(self._put_nowait, message)
+        except RuntimeError:
+            # The client's event loop is gone
+            self.close()
+
+    def _put_nowait(self, message):
+        if self._queue.full():
+            # Slow client: drop the oldest event rather than grow without bound
+            self._queue.get_nowait()
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Next event, or None after ``timeout`` seconds without one"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self, channel=DEFAULTS['CHANNEL'], queue_size=DEFAULTS['QUEUE_SIZE']):
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id, self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, user_id, event_type, data):
+        self.dispatch({'user_id': user_id, 'type': event_type, 'data': data})
+
+    def dispatch(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(message['user_id'], ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+
+class PostgresBroker(InProcessBroker):
+    """LISTEN/NOTIFY on LIVE_UPDATES['CHANNEL'], the listener starts with the first subscriber"""
+
+    def __init__(self, *args, using='default', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.using = using
+        self._listener = None
+
+    def subscribe(self, user_id):
+        subscription = super().subscribe(user_id)
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='live-updates-listener', daemon=True)
+                self._listener.start()
+        return subscription
+
+    def publish(self, user_id, event_type, data):
+        payload = json.dumps({'user_id': user_id, 'type': event_type, 'data': data})
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def _connect(self):
+        wrapper = connections[self.using]
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    def _listen(self):
+        while True:
+            try:
+                conn = self._connect()
+                try:
+                    for payload in self._notifications(conn):
+                        self.dispatch(json.loads(payload))
+                finally:
+                    conn.close()
+            except Exception:
+                logger.exception("Live updates listener failed, reconnecting")
+                threading.Event().wait(5)
+
+    @staticmethod
+    def _notifications(conn):
+        if hasattr(conn, 'poll'):
+            # psycopg2
+            while True:
+                if select.select([conn], [], [], 30) != ([], [], []):
+                    conn.poll()
+                    while conn.notifies:
+                        yield conn.notifies.pop(0).payload
+        else:
+            # psycopg 3
+            for notify in conn.notifies():
+                yield notify.payload
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                conf = get_live_settings()
+                path = conf['BROKER']
+                if path is None:
+                    on_postgres = connections['default'].vendor == 'postgresql'
+                    path = 'notifications.live.PostgresBroker' if on_postgres else 'notifications.live.InProcessBroker'
+                _broker = import_string(path)(channel=conf['CHANNEL'], queue_size=conf['QUEUE_SIZE'])
+    return _broker
+
+
+def publish_on_commit(user_id, event_type, data):
+    """Publish once the current transaction commits (right away outside one)"""
+    db_transaction.on_commit(lambda: get_broker().publish(user_id, event_type, data), robust=True)
+
+
+def publish_balance(wallet, transaction=None):
+    publish_on_commit(wallet.user_id, 'wallet.balance', {
+        'balance': str(wallet.balance),
+        'transaction_id': transaction.pk if transaction is not None else None,
+    })
+
+
+def publish_collection_request(collection_req, user_id, event_type='collection_request.updated'):
+    publish_on_commit(user_id, event_type, {
+        'id': collection_req.pk,
+        'amount': str(collection_req.amount),
+        'req_type': collection_req.req_type,
+        'status': collection_req.status,
+        'from_user_id': collection_req.from_user_id,
+        'to_user_id': collection_req.to_user_id,
+    })
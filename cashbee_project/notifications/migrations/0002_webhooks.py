@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:41
+
+import django.db.models.deletion
+import notifications.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('secret', models.CharField(default=notifications.models.generate_webhook_secret, help_text='HMAC-SHA256 key for the X-Cashbee-Signature header', max_length=64)),
+                ('event_types', models.JSONField(blank=True, default=list, help_text='Subscribed event types, empty for all')),
+                ('max_concurrency', models.PositiveSmallIntegerField(default=4, help_text='Deliveries in flight to this URL')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhook_endpoints', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Webhook Endpoint',
+                'verbose_name_plural': 'Webhook Endpoints',
+                'db_table': 'webhook_endpoints',
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('transaction.succeeded', 'Transaction succeeded'), ('collection_request.created', 'Collection request created'), ('collection_request.approved', 'Collection request approved'), ('collection_request.rejected', 'Collection request rejected')], max_length=40)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Delivered', 'Delivered'), ('Dead', 'Dead')], default='Pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField()),
+                ('last_status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhook_deliveries', to='notifications.outboxevent')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='notifications.webhookendpoint')),
+            ],
+            options={
+                'verbose_name': 'Webhook Delivery',
+                'verbose_name_plural': 'Webhook Deliveries',
+                'db_table': 'webhook_deliveries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='webhook_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('endpoint', 'event'), name='unique_webhook_delivery')],
+            },
+        ),
+    ]
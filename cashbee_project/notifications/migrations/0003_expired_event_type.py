@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_webhooks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='event_type',
+            field=models.CharField(choices=[('transaction.succeeded', 'Transaction succeeded'), ('collection_request.created', 'Collection request created'), ('collection_request.approved', 'Collection request approved'), ('collection_request.rejected', 'Collection request rejected'), ('collection_request.expired', 'Collection request expired')], max_length=40),
+        ),
+        migrations.AlterField(
+            model_name='webhookdelivery',
+            name='event_type',
+            field=models.CharField(choices=[('transaction.succeeded', 'Transaction succeeded'), ('collection_request.created', 'Collection request created'), ('collection_request.approved', 'Collection request approved'), ('collection_request.rejected', 'Collection request rejected'), ('collection_request.expired', 'Collection request expired')], max_length=40),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_webhook_claim_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='delivered_to',
+            field=models.JSONField(blank=True, default=list, help_text='Notifiers that already got the event, skipped on retries'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+import secrets
+
+from django.conf import settings
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    Event written in the same database transaction as the change it describes.
+    The dispatch_outbox worker delivers it to the notifiers afterwards, so no
+    outbound I/O happens while a transfer holds its locks.
+    """
+    class EventType(models.TextChoices):
+        TRANSACTION_SUCCEEDED = 'transaction.succeeded', 'Transaction succeeded'
+        COLLECTION_REQUEST_CREATED = 'collection_request.created', 'Collection request created'
+        COLLECTION_REQUEST_APPROVED = 'collection_request.approved', 'Collection request approved'
+        COLLECTION_REQUEST_REJECTED = 'collection_request.rejected', 'Collection request rejected'
+        COLLECTION_REQUEST_EXPIRED = 'collection_request.expired', 'Collection request expired'
+
+    class Status(models.TextChoices):
+        PENDING = 'Pending', 'Pending'
+        DELIVERED = 'Delivered', 'Delivered'
+        FAILED = 'Failed', 'Failed'
+
+    event_type = models.CharField(max_length=40, choices=EventType.choices)
+    aggregate_id = models.BigIntegerField(help_text="Id of the transaction or collection request")
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(help_text="Not dispatched before this time (retry backoff)")
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    delivered_to = models.JSONField(default=list, blank=True,
+                                    help_text="Notifiers that already got the event, skipped on retries")
+
+    class Meta:
+        db_table = 'outbox_events'
+        ordering = ['id']
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+        indexes = [
+            # The worker polls pending events that are due
+            models.Index(fields=['status', 'available_at'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.aggregate_id} ({self.status})"
+
+
+def generate_webhook_secret():
+    return secrets.token_hex(32)
+
+
+class WebhookEndpoint(models.Model):
+    """A URL a merchant or organization wants its payment events posted to"""
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='webhook_endpoints')
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64, default=generate_webhook_secret,
+                              help_text="HMAC-SHA256 key for the X-Cashbee-Signature header")
+    event_types = models.JSONField(default=list, blank=True, help_text="Subscribed event types, empty for all")
+    max_concurrency = models.PositiveSmallIntegerField(default=4, help_text="Deliveries in flight to this URL")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'webhook_endpoints'
+        verbose_name = 'Webhook Endpoint'
+        verbose_name_plural = 'Webhook Endpoints'
+
+    def __str__(self):
+        return f"{self.owner} -> {self.url}"
+
+    def is_subscribed(self, event_type):
+        return not self.event_types or event_type in self.event_types
+
+
+class WebhookDelivery(models.Model):
+    """One outbox event to post to one endpoint, retried until delivered or dead-lettered"""
+    class Status(models.TextChoices):
+        PENDING = 'Pending', 'Pending'
+        DELIVERED = 'Delivered', 'Delivered'
+        DEAD = 'Dead', 'Dead'
+
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries')
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='webhook_deliveries')
+    event_type = models.CharField(max_length=40, choices=OutboxEvent.EventType.choices)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    last_status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    # Set by the worker holding the current lease, its result is saved only if it still matches
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+
+    class Meta:
+        db_table = 'webhook_deliveries'
+        ordering = ['id']
+        verbose_name = 'Webhook Delivery'
+        verbose_name_plural = 'Webhook Deliveries'
+        constraints = [
+            # A retried outbox event must not post twice
+            models.UniqueConstraint(fields=['endpoint', 'event'], name='unique_webhook_delivery'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='webhook_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} -> {self.endpoint.url} ({self.status})"
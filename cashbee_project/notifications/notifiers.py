@@ -0,0 +1,45 @@
+"""
+Notifiers the outbox dispatcher delivers events to, configured with
+NOTIFICATIONS['NOTIFIERS']. Raising from ``send`` makes the event retry with
+backoff. The SMS and push notifiers are stubs until a provider is wired in,
+webhooks are in notifications.webhooks.
+"""
+import logging
+from abc import ABC, abstractmethod
+
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Notifier(ABC):
+    @abstractmethod
+    def send(self, event):
+        """Deliver one OutboxEvent, raise on failure"""
+
+
+class SMSNotifier(Notifier):
+    """Text messages to the users of transfers and requests (stub)"""
+
+    def send(self, event):
+        from users.models import User
+
+        user_ids = [event.payload.get('from_user_id'), event.payload.get('to_user_id')]
+        for phone_number in User.objects.filter(pk__in=[pk for pk in user_ids if pk]).values_list('phone_number', flat=True):
+            logger.info("SMS to %s: %s #%s", phone_number, event.event_type, event.aggregate_id)
+
+
+class PushNotifier(Notifier):
+    """Push notifications (stub)"""
+
+    def send(self, event):
+        logger.info("Push: %s #%s", event.event_type, event.aggregate_id)
+
+
+class LoggingNotifier(Notifier):
+    def send(self, event):
+        logger.info("Outbox event %s #%s: %s", event.event_type, event.aggregate_id, event.payload)
+
+
+def get_notifiers(paths):
+    return [import_string(path)() for path in paths]
@@ -0,0 +1,50 @@
+"""
+Writing outbox events. Call these inside the transaction that makes the
+change: the event is committed (or rolled back) together with it.
+Payloads only carry ids and amounts already in memory, so recording an
+event costs one INSERT; the notifiers look up whatever else they need.
+"""
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+EventType = OutboxEvent.EventType
+
+
+def transaction_event(transaction):
+    return (EventType.TRANSACTION_SUCCEEDED, transaction.pk, {
+        'transaction_id': transaction.pk,
+        'amount': str(transaction.amount),
+        'transaction_type': transaction.transaction_type,
+        'from_user_id': transaction.from_wallet.user_id,
+        'to_user_id': transaction.to_wallet.user_id,
+    })
+
+
+def collection_request_event(event_type, collection_req):
+    return (event_type, collection_req.pk, {
+        'collection_request_id': collection_req.pk,
+        'amount': str(collection_req.amount),
+        'req_type': collection_req.req_type,
+        'from_user_id': collection_req.from_user_id,
+        'to_user_id': collection_req.to_user_id,
+        'transaction_id': collection_req.transaction_id,
+    })
+
+
+def record_event(event_type, aggregate_id, payload):
+    return OutboxEvent.objects.create(
+        event_type=event_type,
+        aggregate_id=aggregate_id,
+        payload=payload,
+        available_at=timezone.now(),
+    )
+
+
+def record_events(events):
+    """Bulk version of record_event for (event_type, aggregate_id, payload) tuples"""
+    now = timezone.now()
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(event_type=event_type, aggregate_id=aggregate_id, payload=payload, available_at=now)
+        for event_type, aggregate_id, payload in events
+    ])
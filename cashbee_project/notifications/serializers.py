@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from .http import UnsafeURLError, check_public_url
+from .models import OutboxEvent, WebhookEndpoint
+from .webhooks import get_webhook_settings
+
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    event_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=OutboxEvent.EventType.choices), required=False
+    )
+
+    class Meta:
+        model = WebhookEndpoint
+        fields = ['id', 'url', 'secret', 'event_types', 'max_concurrency', 'is_active', 'created_at']
+        read_only_fields = ['id', 'secret', 'created_at']
+
+    def validate_url(self, value):
+        try:
+            check_public_url(value, allow_insecure=get_webhook_settings()['ALLOW_INSECURE_URLS'])
+        except UnsafeURLError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def validate_max_concurrency(self, value):
+        if not 1 <= value <= 32:
+            raise serializers.ValidationError("❌ max_concurrency must be between 1 and 32.")
+        return value
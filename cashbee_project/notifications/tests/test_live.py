@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from notifications.async_views import event_stream
+from notifications.live import InProcessBroker
+from transactions.models import CollectionRequest
+from transactions.services import CollectMoney, SendRecievePayment
+from users.authentication import get_token_cache
+from users.models import User
+from wallet.models import Wallet
+
+
+class RecordingBroker:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, user_id, event_type, data):
+        self.published.append((user_id, event_type, data))
+
+
+class InProcessBrokerTest(TestCase):
+    def test_publish_reaches_only_the_users_subscribers(self):
+        broker = InProcessBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            other = broker.subscribe(2)
+            thread = threading.Thread(target=broker.publish, args=(1, 'wallet.balance', {'balance': '10.00'}))
+            thread.start()
+            thread.join()
+            message = await subscription.get(timeout=1)
+            missed = await other.get(timeout=0.05)
+            subscription.close()
+            other.close()
+            return message, missed
+
+        message, missed = asyncio.run(scenario())
+        self.assertEqual(message, {'user_id': 1, 'type': 'wallet.balance', 'data': {'balance': '10.00'}})
+        self.assertIsNone(missed)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_slow_client_keeps_the_latest_events(self):
+        broker = InProcessBroker(queue_size=2)
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            for i in range(3):
+                broker.publish(1, 'wallet.balance', {'n': i})
+            await asyncio.sleep(0)
+            return [(await subscription.get(timeout=0.05))['data']['n'] for _ in range(2)]
+
+        self.assertEqual(asyncio.run(scenario()), [1, 2])
+
+    def test_event_stream(self):
+        broker = InProcessBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            stream = event_stream(subscription, [('wallet.balance', {'balance': '5.00'})], heartbeat=0.05)
+            chunks = [await anext(stream), await anext(stream), await anext(stream)]
+            broker.publish(1, 'collection_request.created', {'id': 7})
+            chunks.append(await anext(stream))
+            await stream.aclose()
+            return chunks
+
+        chunks = asyncio.run(scenario())
+        self.assertEqual(chunks[1], 'event: wallet.balance\ndata: {"balance":"5.00"}\n\n')
+        self.assertEqual(chunks[2], ': keep-alive\n\n')
+        self.assertEqual(chunks[3], 'event: collection_request.created\ndata: {"id":7}\n\n')
+        self.assertEqual(broker.subscriber_count(), 0)
+
+
+class PublishOnCommitTest(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user(
+            phone_number="+201000000001", first_name="Omar", last_name="Ali", password="Om@1234567"
+        )
+        self.receiver = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        )
+        Wallet.objects.filter(user=self.sender).update(balance=Decimal('100.00'))
+        self.broker = RecordingBroker()
+        patcher = mock.patch('notifications.live.get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_transfer_publishes_both_balances_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            SendRecievePayment(self.sender.wallet, Decimal('40.00'), self.receiver.wallet).execute()
+        self.assertEqual(self.broker.published, [])
+
+        for callback in callbacks:
+            callback()
+        balances = {(user_id, data['balance']) for user_id, _, data in self.broker.published}
+        self.assertEqual(balances, {(self.sender.pk, '60.00'), (self.receiver.pk, '40.00')})
+
+    def test_new_request_is_pushed_to_the_payer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CollectMoney(self.receiver, Decimal('15.00'), to_user=self.sender).execute()
+        user_id, event_type, data = self.broker.published[0]
+        self.assertEqual((user_id, event_type), (self.sender.pk, 'collection_request.created'))
+        self.assertEqual(data['status'], CollectionRequest.Status.PENDING)
+
+
+class LiveUpdatesViewTest(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = User.objects.create_user(
+            phone_number="+201000000001", first_name="Omar", last_name="Ali", password="Om@1234567"
+        )
+        self.token, _ = Token.objects.get_or_create(user=self.user)
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get("/api/async/live/").status_code, 401)
+
+    def test_accepts_token_query_parameter(self):
+        response = self.client.get(f"/api/async/live/?token={self.token.key}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_closing_the_response_unsubscribes(self):
+        broker = InProcessBroker()
+        with mock.patch('notifications.async_views.get_broker', return_value=broker):
+            response = self.client.get(f"/api/async/live/?token={self.token.key}")
+        self.assertEqual(broker.subscriber_count(), 1)
+        response.close()
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_failed_snapshot_unsubscribes(self):
+        broker = InProcessBroker()
+        with mock.patch('notifications.async_views.get_broker', return_value=broker), \
+                mock.patch('notifications.async_views.Wallet.objects.filter', side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                self.client.get(f"/api/async/live/?token={self.token.key}")
+        self.assertEqual(broker.subscriber_count(), 0)
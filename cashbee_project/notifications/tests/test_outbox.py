@@ -0,0 +1,164 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from notifications.dispatcher import OutboxDispatcher
+from notifications.models import OutboxEvent
+from notifications.notifiers import Notifier
+from transactions.models import CollectionRequest
+from transactions.services import SendRecievePayment
+from users.models import User
+from wallet.models import Wallet
+
+
+class RecordingNotifier(Notifier):
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def send(self, event):
+        if self.fail:
+            raise ConnectionError("provider down")
+        self.sent.append(event.event_type)
+
+
+class FlakyNotifier(RecordingNotifier):
+    """Fails the first ``failures`` sends"""
+    def __init__(self, failures=1):
+        super().__init__()
+        self.failures = failures
+
+    def send(self, event):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("provider down")
+        super().send(event)
+
+
+class OutboxWriteTest(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user(
+            phone_number="+201000000001", first_name="Omar", last_name="Ali", password="Om@1234567"
+        )
+        self.receiver = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        )
+        Wallet.objects.filter(user=self.sender).update(balance=Decimal('500.00'))
+
+    def test_transfer_records_event(self):
+        msg, transaction = SendRecievePayment(self.sender.wallet, Decimal('50.00'), self.receiver.wallet).execute()
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, OutboxEvent.EventType.TRANSACTION_SUCCEEDED)
+        self.assertEqual(event.aggregate_id, transaction.pk)
+        self.assertEqual(event.payload["to_user_id"], self.receiver.pk)
+        self.assertEqual(event.payload["amount"], "50.00")
+
+    def test_failed_transfer_records_nothing(self):
+        with self.assertRaises(Exception):
+            SendRecievePayment(self.sender.wallet, Decimal('5000.00'), self.receiver.wallet).execute()
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_reject_records_event(self):
+        collection_req = CollectionRequest.objects.create(
+            from_user=self.receiver, to_user=self.sender, amount=Decimal('10.00')
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.sender)
+        response = client.patch(f"/api/collection-requests/{collection_req.pk}/reject/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, OutboxEvent.EventType.COLLECTION_REQUEST_REJECTED)
+        self.assertEqual(event.aggregate_id, collection_req.pk)
+
+
+class OutboxDispatcherTest(TestCase):
+    def make_event(self, **kwargs):
+        kwargs.setdefault('available_at', timezone.now())
+        return OutboxEvent.objects.create(
+            event_type=OutboxEvent.EventType.TRANSACTION_SUCCEEDED, aggregate_id=1, **kwargs
+        )
+
+    def test_delivers_due_events(self):
+        event = self.make_event()
+        later = self.make_event(available_at=timezone.now() + timedelta(hours=1))
+        notifier = RecordingNotifier()
+
+        self.assertEqual(OutboxDispatcher([notifier]).dispatch_batch(), 1)
+        self.assertEqual(notifier.sent, [OutboxEvent.EventType.TRANSACTION_SUCCEEDED])
+        event.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.Status.DELIVERED)
+        self.assertIsNotNone(event.delivered_at)
+        self.assertEqual(later.status, OutboxEvent.Status.PENDING)
+
+    def test_failure_backs_off_then_gives_up(self):
+        event = self.make_event()
+        dispatcher = OutboxDispatcher([RecordingNotifier(fail=True)])
+
+        before = timezone.now()
+        dispatcher.dispatch_batch()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.Status.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertGreaterEqual(event.available_at, before + dispatcher.backoff(1))
+        self.assertIn("provider down", event.last_error)
+
+        # Not due again until the backoff expires
+        self.assertEqual(dispatcher.dispatch_batch(), 0)
+
+        OutboxEvent.objects.filter(pk=event.pk).update(
+            attempts=dispatcher.max_attempts - 1, available_at=timezone.now()
+        )
+        dispatcher.dispatch_batch()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.Status.FAILED)
+
+    def test_retry_skips_notifiers_that_succeeded(self):
+        event = self.make_event()
+        sms, push = RecordingNotifier(), FlakyNotifier()
+        dispatcher = OutboxDispatcher([sms, push])
+
+        dispatcher.dispatch_batch()
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.Status.PENDING, 1))
+        self.assertIn("FlakyNotifier: ConnectionError", event.last_error)
+
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        dispatcher.dispatch_batch()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.Status.DELIVERED)
+        self.assertEqual(len(sms.sent), 1)
+        self.assertEqual(len(push.sent), 1)
+        self.assertEqual(len(event.delivered_to), 2)
+
+    def test_claimed_events_are_leased(self):
+        self.make_event()
+        dispatcher = OutboxDispatcher([])
+        self.assertEqual(len(dispatcher.claim_batch(timezone.now())), 1)
+        self.assertEqual(dispatcher.claim_batch(timezone.now()), [])
+
+    def test_backoff_is_exponential_and_capped(self):
+        dispatcher = OutboxDispatcher([])
+        self.assertEqual(dispatcher.backoff(2), 2 * dispatcher.backoff(1))
+        self.assertEqual(dispatcher.backoff(50).total_seconds(), dispatcher.backoff_max)
+
+
+class OutboxDispatcherIOTest(TransactionTestCase):
+    def test_notifiers_run_after_the_claim_is_committed(self):
+        OutboxEvent.objects.create(
+            event_type=OutboxEvent.EventType.TRANSACTION_SUCCEEDED, aggregate_id=1, available_at=timezone.now()
+        )
+        in_transaction = []
+
+        class CheckingNotifier(Notifier):
+            def send(self, event):
+                in_transaction.append(connection.in_atomic_block)
+
+        OutboxDispatcher([CheckingNotifier()]).dispatch_batch()
+        self.assertEqual(in_transaction, [False])
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.Status.DELIVERED)
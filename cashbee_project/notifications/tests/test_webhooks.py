@@ -0,0 +1,244 @@
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.http import KeepAliveHTTPClient, UnsafeURLError, check_public_url
+from notifications.models import OutboxEvent, WebhookDelivery, WebhookEndpoint
+from notifications.webhooks import (
+    SIGNATURE_HEADER, WebhookDeliveryWorker, create_deliveries, requeue_dead, sign_payload, verify_signature,
+)
+from users.models import User
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+            server.received.append((dict(self.headers), body))
+        self.send_response(server.status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class SignatureTest(TestCase):
+    def test_roundtrip(self):
+        header = sign_payload('secret', b'{"a":1}')
+        self.assertTrue(verify_signature('secret', b'{"a":1}', header))
+        self.assertFalse(verify_signature('secret', b'{"a":2}', header))
+        self.assertFalse(verify_signature('other', b'{"a":1}', header))
+        self.assertFalse(verify_signature('secret', b'{"a":1}', 'garbage'))
+
+    def test_stale_signature_is_rejected(self):
+        header = sign_payload('secret', b'{}', timestamp=time.time() - 3600)
+        self.assertFalse(verify_signature('secret', b'{}', header, tolerance=300))
+
+
+def resolves_to(*addresses):
+    return patch('notifications.http.socket.getaddrinfo', return_value=[
+        (2, 1, 6, '', (address, 443)) for address in addresses
+    ])
+
+
+# The stub receiver listens on 127.0.0.1 over plain http
+@override_settings(WEBHOOKS={**settings.WEBHOOKS, 'ALLOW_INSECURE_URLS': True})
+class WebhookDeliveryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/hooks/cashbee"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.status = 200
+        self.server.delay = 0
+        self.server.in_flight = self.server.max_in_flight = 0
+        self.server.received = []
+        self.merchant = User.objects.create_user(
+            phone_number="+201000000003", first_name="Cafe", last_name="Nile", password="Ca@1234567"
+        )
+        self.endpoint = WebhookEndpoint.objects.create(owner=self.merchant, url=self.url, max_concurrency=2)
+
+    def make_events(self, count):
+        events = []
+        for i in range(count):
+            event = OutboxEvent.objects.create(
+                event_type=OutboxEvent.EventType.TRANSACTION_SUCCEEDED, aggregate_id=i,
+                payload={'transaction_id': i, 'amount': '10.00', 'to_user_id': self.merchant.pk},
+                available_at=timezone.now(),
+            )
+            create_deliveries(event)
+            events.append(event)
+        return events
+
+    def run_worker(self, worker):
+        deliveries = worker.claim_batch()
+
+        async def deliver():
+            try:
+                return await worker.deliver_batch(deliveries)
+            finally:
+                await worker.client.close()
+
+        # Results are saved from the event loop, on this thread's connection
+        async_to_sync(deliver)()
+        return deliveries
+
+    def test_deliveries_are_created_once_per_subscribed_endpoint(self):
+        WebhookEndpoint.objects.create(owner=self.merchant, url=self.url, event_types=['collection_request.created'])
+        event = self.make_events(1)[0]
+        create_deliveries(event)  # outbox retry
+        self.assertEqual(WebhookDelivery.objects.get().endpoint, self.endpoint)
+
+    def test_signed_delivery_over_keep_alive_connections(self):
+        self.make_events(6)
+        worker = WebhookDeliveryWorker()
+        self.run_worker(worker)
+
+        self.assertEqual(WebhookDelivery.objects.filter(status=WebhookDelivery.Status.DELIVERED).count(), 6)
+        self.assertEqual(len(self.server.received), 6)
+        headers, body = self.server.received[0]
+        self.assertTrue(verify_signature(self.endpoint.secret, body, headers[SIGNATURE_HEADER]))
+        self.assertEqual(headers['X-Cashbee-Event'], 'transaction.succeeded')
+        # Two in flight at most, so at most two connections
+        self.assertLessEqual(worker.client.connections_opened, 2)
+
+    def test_per_endpoint_concurrency_cap(self):
+        self.server.delay = 0.05
+        self.make_events(6)
+        self.run_worker(WebhookDeliveryWorker())
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_failures_back_off_then_dead_letter(self):
+        self.server.status = 500
+        self.make_events(1)
+        self.run_worker(WebhookDeliveryWorker(MAX_ATTEMPTS=2))
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, WebhookDelivery.Status.PENDING)
+        self.assertEqual(delivery.last_status_code, 500)
+        self.assertGreater(delivery.next_attempt_at, timezone.now())
+
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+        self.run_worker(WebhookDeliveryWorker(MAX_ATTEMPTS=2))
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.Status.DEAD)
+
+        self.assertEqual(requeue_dead(), 1)
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), (WebhookDelivery.Status.PENDING, 0))
+
+    def test_claimed_deliveries_are_leased(self):
+        self.make_events(2)
+        worker = WebhookDeliveryWorker()
+        self.assertEqual(len(worker.claim_batch()), 2)
+        self.assertEqual(worker.claim_batch(), [])
+
+    def test_claim_fits_in_the_lease(self):
+        self.make_events(6)
+        # One round of posts fits: two deliveries for an endpoint with max_concurrency 2
+        worker = WebhookDeliveryWorker(LEASE=40, TIMEOUT=10)
+        self.assertEqual(len(worker.claim_batch()), 2)
+        self.assertEqual(len(WebhookDeliveryWorker(LEASE=60, TIMEOUT=10).claim_batch()), 4)
+
+    def test_result_of_a_lost_claim_is_not_saved(self):
+        self.make_events(2)
+        worker = WebhookDeliveryWorker()
+        deliveries = worker.claim_batch()
+        # The lease ran out and another worker claimed the first one again
+        WebhookDelivery.objects.filter(pk=deliveries[0].pk).update(claim_token=uuid.uuid4())
+
+        self.assertFalse(worker.record_result(deliveries[0], 200, ''))
+        self.assertTrue(worker.record_result(deliveries[1], 200, ''))
+        statuses = dict(WebhookDelivery.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[deliveries[0].pk], WebhookDelivery.Status.PENDING)
+        self.assertEqual(statuses[deliveries[1].pk], WebhookDelivery.Status.DELIVERED)
+
+
+class WebhookURLTest(TestCase):
+    def test_only_https_urls_of_public_hosts(self):
+        with resolves_to('93.184.215.14'):
+            check_public_url("https://shop.example/hook")
+        for url in ("http://shop.example/hook", "ftp://shop.example/hook"):
+            with self.subTest(url=url), self.assertRaises(UnsafeURLError):
+                check_public_url(url)
+        for address in ('127.0.0.1', '10.0.0.5', '169.254.169.254', '100.64.0.1', '240.0.0.1', '::1',
+                        '::ffff:192.168.1.1', 'fe80::1'):
+            with self.subTest(address=address), resolves_to('93.184.215.14', address):
+                with self.assertRaises(UnsafeURLError):
+                    check_public_url("https://shop.example/hook")
+
+    def test_client_refuses_to_connect_to_private_address(self):
+        client = KeepAliveHTTPClient()
+        # Resolved again at connect time: the answer may have changed since registration
+        with self.assertRaises(UnsafeURLError):
+            async_to_sync(client.post)("https://localhost/hook", b'{}')
+        self.assertEqual(client.connections_opened, 0)
+
+
+class WebhookEndpointAPITest(TestCase):
+    @resolves_to('93.184.215.14')
+    def test_create_and_list_own_endpoints(self, _):
+        owner = User.objects.create_user(
+            phone_number="+201000000004", first_name="Book", last_name="Shop", password="Bo@1234567"
+        )
+        other = User.objects.create_user(
+            phone_number="+201000000005", first_name="Other", last_name="Shop", password="Ot@1234567"
+        )
+        WebhookEndpoint.objects.create(owner=other, url="https://other.example/hook")
+        client = APIClient()
+        client.force_authenticate(user=owner)
+
+        response = client.post("/api/webhooks/", {
+            "url": "https://shop.example/hook", "event_types": ["transaction.succeeded"],
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["secret"]), 64)
+        self.assertEqual([e["url"] for e in client.get("/api/webhooks/").data], ["https://shop.example/hook"])
+
+        response = client.post("/api/webhooks/", {"url": "https://shop.example/x", "event_types": ["nope"]},
+                               format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_internal_urls_are_rejected(self):
+        owner = User.objects.create_user(
+            phone_number="+201000000004", first_name="Book", last_name="Shop", password="Bo@1234567"
+        )
+        client = APIClient()
+        client.force_authenticate(user=owner)
+        for url in ("https://169.254.169.254/latest/meta-data/", "https://127.0.0.1:8000/admin/",
+                    "http://shop.example/hook"):
+            with self.subTest(url=url):
+                response = client.post("/api/webhooks/", {"url": url}, format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("url", response.data)
+        self.assertFalse(WebhookEndpoint.objects.exists())
@@ -0,0 +1,16 @@
+from rest_framework import permissions, viewsets
+
+from .models import WebhookEndpoint
+from .serializers import WebhookEndpointSerializer
+
+
+class WebhookEndpointViewSet(viewsets.ModelViewSet):
+    """Webhook subscriptions of the current user"""
+    serializer_class = WebhookEndpointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return WebhookEndpoint.objects.filter(owner=self.request.user).order_by('id')
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
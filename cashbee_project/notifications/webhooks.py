@@ -0,0 +1,256 @@
+"""
+Webhook delivery.
+
+WebhookNotifier turns outbox events into WebhookDelivery rows for the
+subscribed endpoints of the users involved. The deliver_webhooks command then
+runs WebhookDeliveryWorker: it claims due deliveries in batches, posts them
+concurrently over pooled keep-alive connections (at most
+``endpoint.max_concurrency`` in flight per endpoint) and retries failures with
+exponential backoff. A claim is a lease: a worker only takes as many
+deliveries as it can post before the lease runs out, even if every request
+times out, and records each result as soon as it is known, guarded by the
+claim token so a worker that lost its lease never overwrites a newer claim.
+Deliveries that keep failing are dead-lettered
+(status Dead) and can be requeued once the endpoint is fixed.
+
+Each request is signed: ``X-Cashbee-Signature: t=<unix time>,v1=<hex>`` where
+v1 is HMAC-SHA256(secret, "<t>.<body>"). Receivers check it with
+``verify_signature``.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .http import KeepAliveHTTPClient
+from .models import WebhookDelivery, WebhookEndpoint
+from .notifiers import Notifier
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 500,
+    'CONCURRENCY': 200,      # deliveries in flight per worker
+    'TIMEOUT': 10,           # seconds to connect, then again to get the response
+    'MAX_ATTEMPTS': 10,
+    'BACKOFF_BASE': 10,      # seconds, doubled on every attempt
+    'BACKOFF_MAX': 6 * 3600,
+    'LEASE': 120,            # a claimed delivery is not picked up by another worker for this long
+    'SIGNATURE_TOLERANCE': 300,
+    'ALLOW_INSECURE_URLS': False,  # accept http and private addresses, local development only
+}
+
+SIGNATURE_HEADER = 'X-Cashbee-Signature'
+
+
+def get_webhook_settings():
+    return {**DEFAULTS, **getattr(settings, 'WEBHOOKS', {})}
+
+
+def sign_payload(secret, body, timestamp=None):
+    timestamp = int(time.time() if timestamp is None else timestamp)
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(secret, body, header, tolerance=None):
+    """Check a X-Cashbee-Signature header, rejecting it past ``tolerance`` seconds"""
+    if tolerance is None:
+        tolerance = get_webhook_settings()['SIGNATURE_TOLERANCE']
+    try:
+        fields = dict(part.split('=', 1) for part in header.split(','))
+        timestamp = int(fields['t'])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    expected = sign_payload(secret, body, timestamp)
+    return hmac.compare_digest(expected, header.strip())
+
+
+def delivery_body(delivery):
+    """The JSON body, identical on every attempt"""
+    return json.dumps({
+        'id': delivery.pk,
+        'type': delivery.event_type,
+        'created_at': delivery.created_at.isoformat(),
+        'data': delivery.payload,
+    }, separators=(',', ':')).encode()
+
+
+def create_deliveries(event):
+    """WebhookDelivery rows for the endpoints subscribed to ``event``"""
+    user_ids = [pk for pk in (event.payload.get('from_user_id'), event.payload.get('to_user_id')) if pk]
+    if not user_ids:
+        return []
+    endpoints = WebhookEndpoint.objects.filter(owner_id__in=user_ids, is_active=True)
+    now = timezone.now()
+    return WebhookDelivery.objects.bulk_create([
+        WebhookDelivery(endpoint=endpoint, event=event, event_type=event.event_type,
+                        payload=event.payload, next_attempt_at=now)
+        for endpoint in endpoints if endpoint.is_subscribed(event.event_type)
+    ], ignore_conflicts=True)
+
+
+class WebhookNotifier(Notifier):
+    """Queue webhook deliveries, the deliver_webhooks worker posts them"""
+
+    def send(self, event):
+        create_deliveries(event)
+
+
+class WebhookDeliveryWorker:
+    def __init__(self, client=None, **overrides):
+        conf = {**get_webhook_settings(), **overrides}
+        self.batch_size = conf['BATCH_SIZE']
+        self.max_attempts = conf['MAX_ATTEMPTS']
+        self.backoff_base = conf['BACKOFF_BASE']
+        self.backoff_max = conf['BACKOFF_MAX']
+        self.lease = conf['LEASE']
+        self.client = client or KeepAliveHTTPClient(
+            timeout=conf['TIMEOUT'], allow_insecure=conf['ALLOW_INSECURE_URLS']
+        )
+        self._concurrency = conf['CONCURRENCY']
+        # A post never takes longer than this (connect + response)
+        self.post_deadline = 2 * conf['TIMEOUT']
+        # Rounds of posts a claim has time for, keeping one round of margin
+        self.rounds = int(self.lease // self.post_deadline) - 1
+        if self.rounds < 1:
+            raise ImproperlyConfigured("❌ WEBHOOKS['LEASE'] must be at least 4 x WEBHOOKS['TIMEOUT']")
+        self._global_slots = None
+        self._endpoint_slots = {}
+
+    def backoff(self, attempts):
+        return timedelta(seconds=min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max))
+
+    def claim_batch(self):
+        """
+        Lock due deliveries with SKIP LOCKED and push their next attempt past
+        the lease, so concurrent workers never post the same one.
+
+        At most ``max_concurrency * rounds`` deliveries per endpoint (and
+        ``CONCURRENCY * rounds`` in all) are taken: the batch is posted before
+        the lease expires even when every request times out.
+        """
+        now = timezone.now()
+        token = uuid.uuid4()
+        limit = min(self.batch_size, self._concurrency * self.rounds)
+        with db_transaction.atomic():
+            due = (
+                WebhookDelivery.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('endpoint')
+                .filter(status=WebhookDelivery.Status.PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:self.batch_size]
+            )
+            deliveries = []
+            per_endpoint = Counter()
+            for delivery in due:
+                if per_endpoint[delivery.endpoint_id] >= max(1, delivery.endpoint.max_concurrency) * self.rounds:
+                    continue
+                per_endpoint[delivery.endpoint_id] += 1
+                delivery.claim_token = token
+                deliveries.append(delivery)
+                if len(deliveries) >= limit:
+                    break
+            WebhookDelivery.objects.filter(pk__in=[d.pk for d in deliveries]).update(
+                next_attempt_at=now + timedelta(seconds=self.lease), claim_token=token
+            )
+        return deliveries
+
+    def _slots(self, endpoint):
+        limit = max(1, endpoint.max_concurrency)
+        entry = self._endpoint_slots.get(endpoint.pk)
+        if entry is None or entry[0] != limit:
+            entry = self._endpoint_slots[endpoint.pk] = (limit, asyncio.Semaphore(limit))
+        return entry[1]
+
+    async def deliver(self, delivery):
+        """Post one delivery and record the result, return (delivery, status code or None, error)"""
+        endpoint = delivery.endpoint
+        body = delivery_body(delivery)
+        headers = {
+            SIGNATURE_HEADER: sign_payload(endpoint.secret, body),
+            'X-Cashbee-Event': delivery.event_type,
+            'X-Cashbee-Delivery': str(delivery.pk),
+        }
+        async with self._global_slots, self._slots(endpoint):
+            try:
+                status = await asyncio.wait_for(self.client.post(endpoint.url, body, headers), self.post_deadline)
+            except Exception as e:
+                status, error = None, f"{type(e).__name__}: {e}"
+            else:
+                error = '' if 200 <= status < 300 else f"HTTP {status}"
+        await sync_to_async(self.record_result)(delivery, status, error)
+        return delivery, status, error
+
+    async def deliver_batch(self, deliveries):
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self._concurrency)
+        return await asyncio.gather(*(self.deliver(d) for d in deliveries))
+
+    def record_result(self, delivery, status, error):
+        """Save one attempt, return False if the delivery was claimed again meanwhile"""
+        now = timezone.now()
+        delivery.attempts += 1
+        delivery.last_status_code = status
+        delivery.last_error = error[:1000]
+        if not error:
+            delivery.status = WebhookDelivery.Status.DELIVERED
+            delivery.delivered_at = now
+        elif delivery.attempts >= self.max_attempts:
+            delivery.status = WebhookDelivery.Status.DEAD
+            logger.warning("Webhook delivery %s dead-lettered after %s attempts: %s",
+                           delivery.pk, delivery.attempts, error)
+        else:
+            delivery.next_attempt_at = now + self.backoff(delivery.attempts)
+        updated = WebhookDelivery.objects.filter(
+            pk=delivery.pk, claim_token=delivery.claim_token, status=WebhookDelivery.Status.PENDING,
+        ).update(
+            status=delivery.status, attempts=delivery.attempts, next_attempt_at=delivery.next_attempt_at,
+            last_status_code=status, last_error=delivery.last_error, delivered_at=delivery.delivered_at,
+            claim_token=None,
+        )
+        if not updated:
+            logger.warning("Webhook delivery %s was claimed again before its result was saved", delivery.pk)
+        return bool(updated)
+
+    async def run_once(self):
+        """Claim and post one batch, return its size"""
+        deliveries = await sync_to_async(self.claim_batch)()
+        if deliveries:
+            await self.deliver_batch(deliveries)
+        return len(deliveries)
+
+    async def run(self, once=False, interval=1.0):
+        total = 0
+        try:
+            while True:
+                processed = await self.run_once()
+                total += processed
+                if processed:
+                    continue
+                if once:
+                    break
+                await asyncio.sleep(interval)
+        finally:
+            await self.client.close()
+        return total
+
+
+def requeue_dead(endpoint=None):
+    """Give dead-lettered deliveries a fresh set of attempts"""
+    deliveries = WebhookDelivery.objects.filter(status=WebhookDelivery.Status.DEAD)
+    if endpoint is not None:
+        deliveries = deliveries.filter(endpoint=endpoint)
+    return deliveries.update(status=WebhookDelivery.Status.PENDING, attempts=0, next_attempt_at=timezone.now())
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction as db_transaction
+from transactions.archive import TransactionArchive, transaction_to_row
+from transactions.models import CollectionRequest, Transaction
+from transactions.partitioning import add_months, is_partitioned, month_start, partition_name
+
+SETTLED = [Transaction.TransactionStatus.SUCCESS, Transaction.TransactionStatus.FAILED]
+
+
+def _month_range(month):
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    end_month = add_months(month, 1)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=timezone.utc)
+
+
+class Command(BaseCommand):
+    help = ("Move settled transactions older than N months into compressed monthly archive files "
+            "(Parquet with pyarrow, gzip NDJSON otherwise)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=12, metavar='MONTHS')
+        parser.add_argument('--format', choices=['auto', 'parquet', 'ndjson'], default=None)
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be archived")
+
+    def handle(self, *args, **options):
+        archive = TransactionArchive(file_format=options['format'])
+        cutoff = add_months(month_start(datetime.now(timezone.utc)), -options['older_than'])
+        cutoff_date = _month_range(cutoff)[0]
+
+        oldest = Transaction.objects.filter(date__lt=cutoff_date, status__in=SETTLED).order_by('date').first()
+        if oldest is None:
+            self.stdout.write("Nothing to archive")
+            return
+
+        month = month_start(oldest.date.astimezone(timezone.utc))
+        while month < cutoff:
+            self.archive_month(archive, month, options['dry_run'])
+            month = add_months(month, 1)
+
+    def archive_month(self, archive, month, dry_run):
+        start, end = _month_range(month)
+        queryset = (
+            Transaction.objects
+            .filter(date__gte=start, date__lt=end, status__in=SETTLED)
+            .select_related('from_wallet__user', 'to_wallet__user', 'collection_request')
+            .order_by('id')
+        )
+        rows = [transaction_to_row(tx) for tx in queryset.iterator(chunk_size=2000)]
+        if not rows:
+            return
+        if dry_run:
+            self.stdout.write(f"{month:%Y-%m}: {len(rows)} transactions")
+            return
+
+        # Merge with an earlier run of the same month (late settlements, or a run
+        # interrupted between writing the file and deleting the rows)
+        archived = {row['id']: row for row in archive.read_month(month)}
+        archived.update((row['id'], row) for row in rows)
+        path = archive.write_month(month, sorted(archived.values(), key=lambda row: row['id']))
+
+        ids = [row['id'] for row in rows]
+        with db_transaction.atomic():
+            CollectionRequest.objects.filter(transaction_id__in=ids).update(transaction=None)
+            for i in range(0, len(ids), 5000):
+                Transaction.objects.filter(id__in=ids[i:i + 5000]).delete()
+        self.drop_empty_partition(month)
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {month:%Y-%m}: archived {len(rows)} transactions to {path}"))
+
+    def drop_empty_partition(self, month):
+        """An emptied monthly partition is dropped instead of left for vacuum"""
+        if not is_partitioned():
+            return
+        name = partition_name(month)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            if cursor.fetchone()[0] is None:
+                return
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM "{name}")')
+            if cursor.fetchone()[0]:
+                return  # pending transactions left in that month
+            cursor.execute(f'ALTER TABLE transactions DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
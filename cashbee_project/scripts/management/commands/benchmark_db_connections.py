@@ -0,0 +1,62 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.utils import ConnectionHandler
+
+
+class Command(BaseCommand):
+    help = ("Simulated requests/sec against the default database with a new connection per request, "
+            "persistent connections (CONN_MAX_AGE) and the psycopg pool")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--queries', type=int, default=3, help="Queries per simulated request")
+
+    def database_settings(self, mode):
+        db = {k: v for k, v in settings.DATABASES['default'].items() if k != 'TEST'}
+        db['OPTIONS'] = {k: v for k, v in db.get('OPTIONS', {}).items() if k != 'pool'}
+        if mode == 'no-persistence':
+            db['CONN_MAX_AGE'] = 0
+        elif mode == 'persistent':
+            db['CONN_MAX_AGE'] = 600
+            db['CONN_HEALTH_CHECKS'] = True
+        elif mode == 'pool':
+            db['CONN_MAX_AGE'] = 0
+            db['OPTIONS']['pool'] = {'min_size': 1, 'max_size': 4}
+        return db
+
+    def measure(self, mode, n_requests, n_queries):
+        handler = ConnectionHandler({'default': self.database_settings(mode)})
+        connection = handler['default']
+        try:
+            start = time.perf_counter()
+            for _ in range(n_requests):
+                # What Django does around each request (request_started / request_finished)
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    for _ in range(n_queries):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+            elapsed = time.perf_counter() - start
+        finally:
+            connection.close()
+            if mode == 'pool':
+                connection.close_pool()
+        return {"mode": mode, "requests_per_sec": round(n_requests / elapsed, 1),
+                "ms_per_request": round(elapsed / n_requests * 1000, 3)}
+
+    def handle(self, *args, **options):
+        results = []
+        for mode in ('no-persistence', 'persistent', 'pool'):
+            if mode == 'pool' and 'postgresql' not in settings.DATABASES['default']['ENGINE']:
+                results.append({"mode": mode, "skipped": "the pool needs PostgreSQL"})
+                continue
+            try:
+                results.append(self.measure(mode, options['requests'], options['queries']))
+            except Exception as e:  # e.g. pool without psycopg 3
+                results.append({"mode": mode, "error": str(e)})
+        self.stdout.write(json.dumps({"vendor": settings.DATABASES['default']['ENGINE'], "results": results},
+                                     indent=2))
@@ -0,0 +1,111 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from fraud.compiled import CompiledForest
+from fraud.registry import load_joblib
+
+# VmHWM is reset on exec, unlike ru_maxrss which is inherited from this process
+IMPORT_RSS_SNIPPET = (
+    "import importlib; importlib.import_module({module!r}); "
+    "print([l.split()[1] for l in open('/proc/self/status') if l.startswith('VmHWM')][0])"
+)
+
+# Peak RSS (KB) of a fresh interpreter before loading the model, after loading
+# it and scoring one row, and after scoring the batch. tracemalloc would only
+# see Python allocations, not xgboost's native memory.
+PREDICT_RSS_SNIPPET = """
+import sys
+import numpy as np
+from fraud.registry import load_artifact
+def peak():
+    return int([l.split()[1] for l in open('/proc/self/status') if l.startswith('VmHWM')][0])
+X = np.load(sys.argv[2])
+baseline = peak()
+model = load_artifact(sys.argv[1])
+model.predict_proba(X[:1])
+loaded = peak()
+model.predict_proba(X)
+print(baseline, loaded, peak())
+"""
+
+
+class Command(BaseCommand):
+    help = "Compare the compiled NumPy scorer with XGBClassifier.predict_proba (speed and memory)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=settings.FRAUD_MODEL_PATH, help="joblib model")
+        parser.add_argument('--compiled', help="Exported .npz (default: next to the source)")
+        parser.add_argument('--single-rows', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeats', type=int, default=5)
+
+    def import_rss_kb(self, module):
+        """Peak RSS of a fresh interpreter after importing a module"""
+        out = subprocess.run(
+            [sys.executable, '-c', IMPORT_RSS_SNIPPET.format(module=module)],
+            capture_output=True, text=True, check=True,
+        )
+        return int(out.stdout.strip())
+
+    def predict_rss_kb(self, path, X):
+        """Memory of loading ``path`` and scoring X, measured in its own process"""
+        with tempfile.TemporaryDirectory() as tmp:
+            batch_path = os.path.join(tmp, 'batch.npy')
+            np.save(batch_path, X)
+            out = subprocess.run(
+                [sys.executable, '-c', PREDICT_RSS_SNIPPET, os.path.abspath(path), batch_path],
+                capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            )
+        baseline, loaded, peak = (int(v) for v in out.stdout.split())
+        return {"model_rss_kb": loaded - baseline, "batch_predict_rss_kb": peak - loaded}
+
+    def measure(self, predict, X, single_rows, repeats):
+        predict(X[:1])  # warm-up
+
+        start = time.perf_counter()
+        for i in range(single_rows):
+            predict(X[i:i + 1])
+        single_us = (time.perf_counter() - start) / single_rows * 1e6
+
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict(X)
+            timings.append(time.perf_counter() - start)
+        batch_s = sorted(timings)[len(timings) // 2]
+
+        return {
+            "single_row_us": round(single_us, 2),
+            "batch_rows_per_sec": round(len(X) / batch_s),
+        }
+
+    def handle(self, *args, **options):
+        source = str(options['source'])
+        compiled_path = options['compiled'] or source.rsplit('.', 1)[0] + '.npz'
+
+        xgb_model = load_joblib(source)
+        compiled = CompiledForest.load(compiled_path)
+
+        rng = np.random.default_rng(0)
+        n_features = len(compiled.feature_names or xgb_model.feature_importances_)
+        X = rng.normal(scale=3.0, size=(options['batch_size'], n_features)).astype(np.float32)
+
+        report = {
+            "xgboost": self.measure(xgb_model.predict_proba, X, options['single_rows'], options['repeats']),
+            "compiled": self.measure(compiled.predict_proba, X, options['single_rows'], options['repeats']),
+            "max_abs_diff": float(np.abs(xgb_model.predict_proba(X)[:, 1] - compiled.predict_proba(X)[:, 1]).max()),
+        }
+        report["xgboost"]["import_peak_rss_kb"] = self.import_rss_kb('xgboost')
+        report["compiled"]["import_peak_rss_kb"] = self.import_rss_kb('numpy')
+        report["xgboost"].update(self.predict_rss_kb(source, X))
+        report["compiled"].update(self.predict_rss_kb(compiled_path, X))
+        report["compiled"]["model_kb"] = round(compiled.nbytes / 1024, 1)
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,56 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand
+from users.hashing import PasswordHashingPool, _verify
+
+PASSWORD = "So@1234567"
+
+
+class Command(BaseCommand):
+    help = "Measure password checks (logins) per second, inline and through the hashing pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=50, help="Password checks per measurement")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                            help="Pool sizes to measure")
+        parser.add_argument('--hashers', nargs='+', default=['default'],
+                            help="Hasher algorithms, e.g. pbkdf2_sha256 argon2")
+
+    def measure_inline(self, encoded, logins):
+        start = time.perf_counter()
+        for _ in range(logins):
+            check_password(PASSWORD, encoded)
+        return logins / (time.perf_counter() - start)
+
+    def measure_pool(self, encoded, logins, workers):
+        pool = PasswordHashingPool(workers, max_pending=logins, timeout=600, retry_after=1)
+        try:
+            pool.submit(_verify, PASSWORD, encoded)  # start the processes
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers * 2) as clients:
+                list(clients.map(lambda _: pool.submit(_verify, PASSWORD, encoded), range(logins)))
+            return logins / (time.perf_counter() - start)
+        finally:
+            pool.shutdown()
+
+    def handle(self, *args, **options):
+        results = []
+        for algorithm in options['hashers']:
+            hasher = get_hasher(algorithm)
+            encoded = make_password(PASSWORD, hasher=hasher)
+
+            inline = self.measure_inline(encoded, options['logins'])
+            results.append({"hasher": hasher.algorithm, "mode": "inline", "workers": 1,
+                            "logins_per_sec": round(inline, 1), "logins_per_sec_per_core": round(inline, 1)})
+
+            for workers in options['workers']:
+                rate = self.measure_pool(encoded, options['logins'], workers)
+                results.append({"hasher": hasher.algorithm, "mode": "pool", "workers": workers,
+                                "logins_per_sec": round(rate, 1),
+                                "logins_per_sec_per_core": round(rate / workers, 1)})
+
+        self.stdout.write(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2))
@@ -0,0 +1,23 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+from notifications.webhooks import WebhookDeliveryWorker, requeue_dead
+
+
+class Command(BaseCommand):
+    help = "Post pending webhook deliveries to the subscribed endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Deliver what is due and exit")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds to sleep when nothing is due")
+        parser.add_argument('--requeue-dead', action='store_true', help="Retry dead-lettered deliveries and exit")
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            count = requeue_dead()
+            self.stdout.write(self.style.SUCCESS(f"✓ {count} dead deliveries requeued"))
+            return
+
+        worker = WebhookDeliveryWorker()
+        total = asyncio.run(worker.run(once=options['once'], interval=options['interval']))
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} webhook deliveries processed"))
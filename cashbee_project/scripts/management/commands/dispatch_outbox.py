@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from notifications.dispatcher import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox events to the configured notifiers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain what is due and exit")
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds to sleep when the outbox is empty")
+
+    def handle(self, *args, **options):
+        dispatcher = OutboxDispatcher(batch_size=options['batch_size'])
+        total = 0
+        while True:
+            processed = dispatcher.dispatch_batch()
+            total += processed
+            if processed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} outbox events processed"))
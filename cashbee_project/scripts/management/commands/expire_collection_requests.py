@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from transactions.services import CollectionRequestExpirySweeper
+
+
+class Command(BaseCommand):
+    help = "Expire pending collection requests older than COLLECTION_REQUEST_EXPIRY['TTL'] (run it from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Requests expired per transaction")
+
+    def handle(self, *args, **options):
+        count = CollectionRequestExpirySweeper(batch_size=options['batch_size']).sweep()
+        self.stdout.write(self.style.SUCCESS(f"✓ {count} collection requests expired"))
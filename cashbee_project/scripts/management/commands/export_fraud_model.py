@@ -0,0 +1,43 @@
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from fraud.compiled import CompiledForest, export_booster
+from fraud.registry import file_sha256, load_joblib
+
+
+class Command(BaseCommand):
+    help = "Compile the XGBoost fraud model into NumPy node arrays (.npz) and verify its predictions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=settings.FRAUD_MODEL_PATH, help="joblib model to export")
+        parser.add_argument('--output', help="Output .npz (default: next to the source)")
+        parser.add_argument('--verify-rows', type=int, default=10000)
+        parser.add_argument('--tolerance', type=float, default=1e-5)
+
+    def handle(self, *args, **options):
+        source = str(options['source'])
+        output = options['output'] or source.rsplit('.', 1)[0] + '.npz'
+
+        model = load_joblib(source)
+        compiled = export_booster(model)
+        compiled.save(output)
+        self.stdout.write(
+            f"Exported {compiled.n_trees} trees / {compiled.n_nodes} nodes "
+            f"(depth {compiled.depth}, {compiled.nbytes / 1024:.1f} KB) to {output}"
+        )
+
+        # Check the saved file, not the in-memory copy
+        reloaded = CompiledForest.load(output)
+        rng = np.random.default_rng(42)
+        X = rng.normal(scale=3.0, size=(options['verify_rows'], len(reloaded.feature_names or model.feature_importances_)))
+        X = X.astype(np.float32)
+        X[::17, 0] = np.nan  # exercise the missing-value branches
+
+        expected = model.predict_proba(X)[:, 1]
+        actual = reloaded.predict_proba(X)[:, 1]
+        max_diff = float(np.abs(expected - actual).max())
+        if max_diff > options['tolerance']:
+            raise CommandError(f"❌ Compiled model differs from XGBoost by {max_diff:.2e}")
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Predictions match XGBoost (max diff {max_diff:.2e})"))
+        self.stdout.write(f"sha256 {file_sha256(output)}")
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from fraud.registry import file_sha256
+
+
+class Command(BaseCommand):
+    help = "Print the sha256 of the fraud model artifact, optionally writing the .sha256 sidecar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=settings.FRAUD_MODEL_PATH)
+        parser.add_argument('--write', action='store_true', help="Write <artifact>.sha256 next to the model")
+
+    def handle(self, *args, **options):
+        path = str(options['path'])
+        sha256 = file_sha256(path)
+        self.stdout.write(f"{sha256}  {path}")
+
+        if options['write']:
+            with open(path + '.sha256', 'w') as f:
+                f.write(sha256 + '\n')
+            self.stdout.write(self.style.SUCCESS(f"✓ Wrote {path}.sha256"))
@@ -0,0 +1,86 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Closed-loop HTTP load test against a running server. Run it once against the WSGI "
+            "deployment (gunicorn.conf.py) and once against the ASGI one (gunicorn_asgi.conf.py)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help="e.g. http://localhost:8000/api/async/wallet/")
+        parser.add_argument('--token', help="Token for the Authorization header")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per URL")
+        parser.add_argument('--label', default='', help="Free text stored in the report, e.g. wsgi / asgi")
+
+    def run_client(self, url, headers, deadline, latencies, errors, lock):
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        conn = None
+        while time.monotonic() < deadline:
+            if conn is None:
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = None
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+        if conn is not None:
+            conn.close()
+
+    def measure(self, url, headers, concurrency, duration):
+        latencies, errors, lock = [], [0], threading.Lock()
+        deadline = time.monotonic() + duration
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(self.run_client, url, headers, deadline, latencies, errors, lock)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+        return {
+            "url": url,
+            "requests": len(latencies),
+            "errors": errors[0],
+            "requests_per_sec": round(len(latencies) / elapsed, 1),
+            "latency_ms": {
+                "p50": round(quantiles[49] * 1000, 2),
+                "p95": round(quantiles[94] * 1000, 2),
+                "p99": round(quantiles[98] * 1000, 2),
+            },
+        }
+
+    def handle(self, *args, **options):
+        headers = {'Connection': 'keep-alive'}
+        if options['token']:
+            headers['Authorization'] = f"Token {options['token']}"
+
+        results = [
+            self.measure(url, headers, options['concurrency'], options['duration'])
+            for url in options['urls']
+        ]
+        self.stdout.write(json.dumps({
+            "label": options['label'],
+            "concurrency": options['concurrency'],
+            "duration": options['duration'],
+            "results": results,
+        }, indent=2))
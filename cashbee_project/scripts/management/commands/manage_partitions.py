@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from transactions.partitioning import (
+    add_months, detach_partitions_before, ensure_partitions, is_partitioned, list_partitions, month_start,
+)
+
+
+class Command(BaseCommand):
+    help = ("Create upcoming monthly partitions of the transactions table and detach old ones. "
+            "Run daily from cron so new months never land in the default partition")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=3, help="Months of partitions to create in advance")
+        parser.add_argument('--detach-older-than', type=int, metavar='MONTHS',
+                            help="Detach partitions entirely older than this many months")
+        parser.add_argument('--list', action='store_true', help="Only list the attached partitions")
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError("❌ The transactions table is not partitioned (PostgreSQL only)")
+
+        if options['list']:
+            for name in list_partitions():
+                self.stdout.write(name)
+            return
+
+        this_month = month_start(datetime.now(timezone.utc))
+        ensure_partitions(this_month, options['ahead'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Partitions ready up to {add_months(this_month, options['ahead'])}"))
+
+        if options['detach_older_than']:
+            cutoff = add_months(this_month, -options['detach_older_than'])
+            for name in detach_partitions_before(cutoff):
+                self.stdout.write(self.style.SUCCESS(f"✓ Detached {name}"))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from wallet.reconciliation import WalletReconciler
+
+
+class Command(BaseCommand):
+    help = "Check every wallet balance against its successful transactions, from the last checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Ignore checkpoints and replay the whole history")
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Wallets read per query")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        run = WalletReconciler(chunk_size=options['chunk_size'], full=options['full']).run()
+        elapsed = time.perf_counter() - start
+
+        for mismatch in run.mismatches:
+            self.stdout.write(self.style.ERROR(
+                f"❌ Wallet {mismatch['wallet_id']}: balance {mismatch['balance']} EGP, "
+                f"expected {mismatch['expected']} EGP ({mismatch['difference']})"
+            ))
+        if run.mismatch_count > len(run.mismatches):
+            self.stdout.write(f"... {run.mismatch_count - len(run.mismatches)} more")
+
+        message = (f"{run.wallets_checked} wallets checked in {elapsed:.1f}s, "
+                   f"{run.mismatch_count} mismatches, checkpoint at transaction {run.last_transaction_id}")
+        if run.mismatch_count:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✓ {message}"))
@@ -0,0 +1,28 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from wallet.rollups import refresh_spend_rollups
+
+
+class Command(BaseCommand):
+    help = "Fold new successful transfers into the per-wallet daily spend rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Catch up and exit")
+        parser.add_argument('--batch-size', type=int, default=100000, help="Transactions folded in per run")
+        parser.add_argument('--lag', type=int, default=300, help="Skip transactions newer than this many seconds")
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds between refreshes")
+
+    def handle(self, *args, **options):
+        lag = timedelta(seconds=options['lag'])
+        while True:
+            while True:
+                read = refresh_spend_rollups(lag=lag, batch_size=options['batch_size'])
+                if read:
+                    self.stdout.write(self.style.SUCCESS(f"✓ {read} transactions folded into the spend rollups"))
+                if read < options['batch_size']:
+                    break
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from transactions.services import RecurringTransferScheduler
+
+
+class Command(BaseCommand):
+    help = "Execute due recurring transfers (several schedulers can run at once)"
+
+    def add_arguments(self, parser):
+        conf = getattr(settings, 'RECURRING_TRANSFERS', {})
+        parser.add_argument('--once', action='store_true', help="Run what is due and exit")
+        parser.add_argument('--batch-size', type=int, default=conf.get('BATCH_SIZE', 50))
+        parser.add_argument('--interval', type=float, default=30.0, help="Seconds to sleep when nothing is due")
+
+    def handle(self, *args, **options):
+        conf = getattr(settings, 'RECURRING_TRANSFERS', {})
+        scheduler = RecurringTransferScheduler(
+            batch_size=options['batch_size'], max_failures=conf.get('MAX_FAILURES', 3),
+            lease=conf.get('LEASE', 300),
+        )
+        succeeded = failed = 0
+        while True:
+            jobs = scheduler.run_batch()
+            for job in jobs:
+                if job.last_status == job.RunStatus.SUCCESS:
+                    succeeded += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"❌ Recurring transfer {job.pk}: {job.last_error}")
+            if jobs:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"✓ {succeeded} recurring transfers executed, {failed} failed"))
@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from transactions.services import DeferredCreditSettlement
+
+
+class Command(BaseCommand):
+    help = "Add queued organization credits to their wallets in settlement batches"
+
+    def add_arguments(self, parser):
+        conf = getattr(settings, 'DEFERRED_SETTLEMENT', {})
+        parser.add_argument('--once', action='store_true', help="Settle what is queued and exit")
+        parser.add_argument('--batch-size', type=int, default=conf.get('BATCH_SIZE', 10000))
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds between settlement runs")
+
+    def handle(self, *args, **options):
+        settlement = DeferredCreditSettlement(batch_size=options['batch_size'])
+        while True:
+            for batch in settlement.settle():
+                self.stdout.write(self.style.SUCCESS(
+                    f"✓ {batch.credits_count} credits settled to {batch.wallets_count} wallets ({batch.total_amount} EGP)"
+                ))
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CollectionRequest, Transaction
+from .models import Bill, CollectionRequest, Organization, RecurringTransfer, SettlementBatch, Transaction
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
@@ -13,4 +13,27 @@ class CollectionRequestAdmin(admin.ModelAdmin):
     list_display = ('id', 'from_user', 'to_user', 'amount', 'status', 'note','created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('from_user__username', 'to_user__username')
-    date_hierarchy = 'created_at'
\ No newline at end of file
+    date_hierarchy = 'created_at'
+
+@admin.register(RecurringTransfer)
+class RecurringTransferAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'receiver', 'amount', 'schedule', 'next_run_at', 'is_active', 'last_status')
+    list_filter = ('is_active', 'last_status')
+    search_fields = ('owner__phone_number', 'receiver__phone_number')
+
+@admin.register(Organization)
+class OrganizationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'org_type', 'category', 'user', 'deferred_settlement', 'is_active')
+    list_filter = ('org_type', 'deferred_settlement', 'is_active')
+    search_fields = ('name', 'user__phone_number')
+
+@admin.register(Bill)
+class BillAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'organization', 'customer', 'amount', 'due_date', 'status')
+    list_filter = ('status', 'organization')
+    search_fields = ('reference', 'customer__phone_number')
+
+@admin.register(SettlementBatch)
+class SettlementBatchAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'credits_count', 'wallets_count', 'total_amount')
+    readonly_fields = ('created_at', 'credits_count', 'wallets_count', 'total_amount')
@@ -0,0 +1,217 @@
+"""
+Cold storage for settled transactions.
+
+``archive_transactions`` moves whole months older than N months out of the
+live table into one file per month under TRANSACTION_ARCHIVE['DIR']:
+``2024-01.parquet`` (zstd, needs pyarrow) or ``2024-01.ndjson.gz`` otherwise.
+Rows are denormalized (user ids and names) so reading them back never joins
+the live tables. ``TransactionArchive.read`` feeds the history API when
+``include_archived`` is set; months outside the requested date range are
+skipped by file name, Parquet files are memory-mapped and filtered on the
+user and date columns.
+"""
+import gzip
+import json
+from datetime import timezone
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+FIELDS = [
+    'id', 'date', 'amount', 'transaction_type', 'status',
+    'from_wallet_id', 'to_wallet_id', 'from_user_id', 'to_user_id',
+    'from_user_name', 'to_user_name',
+    'from_wallet_balance_before', 'to_wallet_balance_before', 'collection_request_id',
+]
+
+# Fields of TransactionSerializer, archived rows are returned in the same shape
+API_FIELDS = [
+    'id', 'amount', 'transaction_type', 'status', 'date', 'from_user_name', 'to_user_name',
+    'from_wallet_balance_before', 'to_wallet_balance_before',
+]
+
+DEFAULTS = {
+    'DIR': None,
+    'FORMAT': 'auto',   # parquet, ndjson or auto (parquet when pyarrow is installed)
+}
+
+
+def get_archive_settings():
+    return {**DEFAULTS, **getattr(settings, 'TRANSACTION_ARCHIVE', {})}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def transaction_to_row(tx):
+    """Archive row for a Transaction fetched with select_related wallets and users"""
+    collection_request = getattr(tx, 'collection_request', None)
+    return {
+        'id': tx.id,
+        'date': tx.date.isoformat(),
+        'amount': str(tx.amount),
+        'transaction_type': tx.transaction_type,
+        'status': tx.status,
+        'from_wallet_id': tx.from_wallet_id,
+        'to_wallet_id': tx.to_wallet_id,
+        'from_user_id': tx.from_wallet.user_id,
+        'to_user_id': tx.to_wallet.user_id,
+        'from_user_name': tx.from_wallet.user.name,
+        'to_user_name': tx.to_wallet.user.name,
+        'from_wallet_balance_before': str(tx.from_wallet_balance_before),
+        'to_wallet_balance_before': str(tx.to_wallet_balance_before),
+        'collection_request_id': collection_request.id if collection_request else None,
+    }
+
+
+def _parquet_schema(pa):
+    money = pa.decimal128(15, 2)
+    return pa.schema([
+        ('id', pa.int64()),
+        ('date', pa.timestamp('us', tz='UTC')),
+        ('amount', money),
+        ('transaction_type', pa.string()),
+        ('status', pa.string()),
+        ('from_wallet_id', pa.int64()),
+        ('to_wallet_id', pa.int64()),
+        ('from_user_id', pa.int64()),
+        ('to_user_id', pa.int64()),
+        ('from_user_name', pa.string()),
+        ('to_user_name', pa.string()),
+        ('from_wallet_balance_before', money),
+        ('to_wallet_balance_before', money),
+        ('collection_request_id', pa.int64()),
+    ])
+
+
+class TransactionArchive:
+    def __init__(self, directory=None, file_format=None):
+        conf = get_archive_settings()
+        self.directory = Path(directory or conf['DIR'])
+        file_format = file_format or conf['FORMAT']
+        if file_format == 'auto':
+            file_format = 'parquet' if _pyarrow() else 'ndjson'
+        self.file_format = file_format
+
+    def _path(self, month, file_format):
+        suffix = '.parquet' if file_format == 'parquet' else '.ndjson.gz'
+        return self.directory / f"{month.year}-{month.month:02d}{suffix}"
+
+    def months(self):
+        """Archived months as 'YYYY-MM' strings, oldest first"""
+        if not self.directory.exists():
+            return []
+        return sorted({p.name[:7] for p in self.directory.iterdir()
+                       if p.name.endswith(('.parquet', '.ndjson.gz'))})
+
+    def write_month(self, month, rows):
+        """Write (or replace) the file of one month, atomically"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(month, self.file_format)
+        tmp = path.with_name(path.name + '.tmp')
+
+        if self.file_format == 'parquet':
+            pa = _pyarrow()
+            columns = {field: [row[field] for row in rows] for field in FIELDS}
+            columns['date'] = [parse_datetime(d) for d in columns['date']]
+            for field in ('amount', 'from_wallet_balance_before', 'to_wallet_balance_before'):
+                columns[field] = [Decimal(v) for v in columns[field]]
+            table = pa.table(columns, schema=_parquet_schema(pa))
+            pa.parquet.write_table(table, tmp, compression='zstd')
+        else:
+            with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row) + '\n')
+
+        tmp.replace(path)
+        # The rows of a file in the other format were merged into this one
+        # (archive_transactions reads the month first): drop it, or every row
+        # would be read twice after a FORMAT change
+        other = self._path(month, 'ndjson' if self.file_format == 'parquet' else 'parquet')
+        other.unlink(missing_ok=True)
+        return path
+
+    def read_month(self, month):
+        """All archived rows of one month in the archive row format"""
+        rows = []
+        for file_format in ('parquet', 'ndjson'):
+            path = self._path(month, file_format)
+            if not path.exists():
+                continue
+            if file_format == 'parquet':
+                for row in _pyarrow().parquet.read_table(path, memory_map=True).to_pylist():
+                    row['date'] = row['date'].isoformat()
+                    for field in ('amount', 'from_wallet_balance_before', 'to_wallet_balance_before'):
+                        row[field] = str(row[field])
+                    rows.append(row)
+            else:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    rows.extend(json.loads(line) for line in f)
+        return rows
+
+    def _read_file(self, path, user_id, date_from, date_to):
+        if path.name.endswith('.parquet'):
+            pa = _pyarrow()
+            dates = []
+            if date_from is not None:
+                dates.append(('date', '>=', date_from))
+            if date_to is not None:
+                dates.append(('date', '<=', date_to))
+            if user_id is not None:
+                filters = [[('from_user_id', '=', user_id), *dates], [('to_user_id', '=', user_id), *dates]]
+            else:
+                filters = [dates] if dates else None
+            table = pa.parquet.read_table(path, columns=API_FIELDS, filters=filters, memory_map=True)
+            for row in table.to_pylist():
+                for field in ('amount', 'from_wallet_balance_before', 'to_wallet_balance_before'):
+                    row[field] = str(row[field])
+                yield row
+        else:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if user_id is not None and user_id not in (row['from_user_id'], row['to_user_id']):
+                        continue
+                    row['date'] = parse_datetime(row['date'])
+                    if date_from is not None and row['date'] < date_from:
+                        continue
+                    if date_to is not None and row['date'] > date_to:
+                        continue
+                    yield {field: row[field] for field in API_FIELDS}
+
+    def read(self, user_id=None, transaction_type=None, status=None, date_from=None, date_to=None):
+        """
+        Archived transactions of a user (all users when None), newest first, in
+        the API shape. date_from/date_to (aware datetimes) bound the date,
+        inclusive; only the files of the months in that range are opened.
+        """
+        # Files are named after the UTC month of their transactions
+        first = f"{date_from.astimezone(timezone.utc):%Y-%m}" if date_from else None
+        last = f"{date_to.astimezone(timezone.utc):%Y-%m}" if date_to else None
+        rows = []
+        for month in reversed(self.months()):
+            if (first and month < first) or (last and month > last):
+                continue
+            for path in self.directory.glob(f"{month}.*"):
+                if path.name.endswith('.tmp'):
+                    continue
+                for row in self._read_file(path, user_id, date_from, date_to):
+                    if transaction_type and row['transaction_type'] != transaction_type:
+                        continue
+                    if status and row['status'] != status:
+                        continue
+                    rows.append(row)
+        rows.sort(key=lambda row: row['date'], reverse=True)
+        date_field = serializers.DateTimeField()
+        for row in rows:
+            row['date'] = date_field.to_representation(row['date'])
+        return rows
@@ -0,0 +1,60 @@
+"""
+Async read endpoints served under /api/async/ by the ASGI deployment
+(gunicorn_asgi.conf.py). Related rows are fetched with select_related so
+serialization never falls back to a lazy (sync) query.
+"""
+from django.db import models
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from django_filters.filterset import filterset_factory
+from users.authentication import async_token_required
+from .models import Transaction, CollectionRequest
+from .serializers import TransactionSerializer, CollectMoneySerializer
+from .views import TransactionViewSet
+
+TransactionFilterSet = filterset_factory(Transaction, fields=TransactionViewSet.filterset_fields)
+
+
+@require_GET
+@async_token_required
+async def transaction_list(request):
+    """Async version of TransactionViewSet.list, same filters"""
+    user = request.user
+    queryset = Transaction.objects.select_related('from_wallet__user', 'to_wallet__user')
+    if not user.is_superuser:
+        queryset = queryset.filter(
+            models.Q(from_wallet__user=user) |
+            models.Q(to_wallet__user=user)
+        ).order_by('-date')
+
+    filterset = TransactionFilterSet(request.GET, queryset=queryset)
+    if not filterset.is_valid():
+        return JsonResponse(filterset.errors, status=400)
+
+    transactions = [t async for t in filterset.qs]
+    return JsonResponse(TransactionSerializer(transactions, many=True).data, safe=False)
+
+
+async def _collection_requests(request, user_field):
+    filters = {user_field: request.user}
+    status_param = request.GET.get("status")
+    if status_param:
+        filters["status"] = status_param
+
+    queryset = CollectionRequest.objects.filter(**filters).select_related("from_user", "to_user")
+    collection_requests = [r async for r in queryset]
+    return JsonResponse(CollectMoneySerializer(collection_requests, many=True).data, safe=False)
+
+
+@require_GET
+@async_token_required
+async def received_requests(request):
+    """Async version of CollectionRequestViewSet.received_requests"""
+    return await _collection_requests(request, "to_user")
+
+
+@require_GET
+@async_token_required
+async def sent_requests(request):
+    """Async version of CollectionRequestViewSet.sent_requests"""
+    return await _collection_requests(request, "from_user")
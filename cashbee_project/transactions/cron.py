@@ -0,0 +1,100 @@
+"""
+Cron expressions for recurring transfers.
+
+Standard five fields: minute hour day-of-month month day-of-week, each a
+``*``, a value, a range ``a-b``, a list ``a,b`` or a step ``*/n`` / ``a-b/n``.
+Day of week is 0-6 from Sunday (7 is Sunday too). Like cron, when both day
+fields are restricted a day matching either one fires. The @hourly, @daily,
+@weekly, @monthly and @yearly shortcuts are accepted.
+Times are evaluated in the project time zone.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+}
+
+FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day of month', 1, 31),
+    ('month', 1, 12),
+    ('day of week', 0, 7),
+)
+
+# How far ahead to look before deciding a schedule never fires (e.g. "0 0 30 2 *")
+MAX_YEARS = 5
+
+
+def _parse_field(text, name, low, high):
+    values = set()
+    for part in text.split(','):
+        span, _, step = part.partition('/')
+        try:
+            step = int(step) if step else 1
+            if span == '*':
+                start, end = low, high
+            elif '-' in span:
+                start, end = (int(v) for v in span.split('-', 1))
+            else:
+                start = end = int(span)
+        except ValueError:
+            raise ValueError(f"❌ Invalid {name} field: {text}")
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"❌ Invalid {name} field: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        parts = ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(parts) != 5:
+            raise ValueError(f"❌ A schedule needs 5 fields, got: {expression}")
+
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, name, low, high) for text, (name, low, high) in zip(parts, FIELDS)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days = days
+        self.months = months
+        self.weekdays = {7 if d == 0 else d for d in weekdays}  # isoweekday(): Sunday is 7
+        # As in Vixie cron, a day field starting with '*' (also '*/2') doesn't
+        # restrict the day on its own, so the two fields are ANDed
+        self.any_day = parts[2].startswith('*')
+        self.any_weekday = parts[4].startswith('*')
+
+    def __str__(self):
+        return self.expression
+
+    def _day_matches(self, day):
+        in_month = day.day in self.days
+        in_week = day.isoweekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, after):
+        """First firing time strictly after ``after`` (an aware datetime)"""
+        tz = timezone.get_current_timezone()
+        local = timezone.localtime(after, tz).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = local.date()
+        first_minute = local.hour * 60 + local.minute
+        for _ in range(366 * MAX_YEARS):
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        if hour * 60 + minute >= first_minute:
+                            return datetime.combine(day, time(hour, minute), tzinfo=tz)
+            day += timedelta(days=1)
+            first_minute = 0
+        raise ValueError(f"❌ Schedule never fires: {self.expression}")
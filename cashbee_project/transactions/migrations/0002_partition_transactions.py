@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def partition_transactions(apps, schema_editor):
+    # Postgres only, other backends keep the plain table
+    from transactions.partitioning import is_partitioned, partition_table
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql' and not is_partitioned(connection):
+        partition_table(connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+        ('wallet', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='collectionrequest',
+            name='transaction',
+            field=models.OneToOneField(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='collection_request', to='transactions.transaction'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['from_wallet', 'date'], name='transactions_from_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['to_wallet', 'date'], name='transactions_to_date_idx'),
+        ),
+        migrations.RunPython(partition_transactions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def reject_duplicate_pending(apps, schema_editor):
+    """Keep the oldest of identical pending requests so the unique index can be built"""
+    CollectionRequest = apps.get_model('transactions', 'CollectionRequest')
+    duplicates = (
+        CollectionRequest.objects.filter(status='Pending')
+        .values('from_user', 'to_user', 'amount', 'req_type')
+        .annotate(count=Count('id'), keep=Min('id'))
+        .filter(count__gt=1)
+    )
+    for group in duplicates:
+        keep = group.pop('keep')
+        group.pop('count')
+        CollectionRequest.objects.filter(status='Pending', **group).exclude(id=keep).update(status='Rejected')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_partition_transactions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(reject_duplicate_pending, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='collectionrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'Pending')), fields=('from_user', 'to_user', 'amount', 'req_type'), name='unique_pending_collection_request'),
+        ),
+    ]
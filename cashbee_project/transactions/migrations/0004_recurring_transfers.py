@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:48
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_unique_pending_collection_request'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('1.00'))])),
+                ('schedule', models.CharField(help_text="Cron expression, e.g. '0 9 * * 5' for Fridays at 9:00", max_length=100)),
+                ('next_run_at', models.DateTimeField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status', models.CharField(blank=True, choices=[('Success', 'Success'), ('Failed', 'Failed')], default='', max_length=10)),
+                ('last_error', models.CharField(blank=True, default='', max_length=255)),
+                ('failure_count', models.PositiveIntegerField(default=0, help_text='Consecutive failed runs')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_transaction', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='transactions.transaction')),
+                ('owner', models.ForeignKey(help_text='The user who pays.', on_delete=django.db.models.deletion.CASCADE, related_name='recurring_transfers', to=settings.AUTH_USER_MODEL)),
+                ('receiver', models.ForeignKey(help_text='The user who receives the money.', on_delete=django.db.models.deletion.CASCADE, related_name='incoming_recurring_transfers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Recurring Transfer',
+                'verbose_name_plural': 'Recurring Transfers',
+                'db_table': 'recurring_transfers',
+                'ordering': ['next_run_at'],
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['next_run_at'], name='recurring_due_idx')],
+            },
+        ),
+    ]
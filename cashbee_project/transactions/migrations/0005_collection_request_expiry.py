@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_recurring_transfers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='collectionrequest',
+            name='status',
+            field=models.CharField(choices=[('Pending', 'Pending'), ('Approved', 'Approved'), ('Rejected', 'Rejected'), ('Expired', 'Expired')], default='Pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='collectionrequest',
+            index=models.Index(fields=['status', 'created_at'], name='collection_status_created_idx'),
+        ),
+    ]
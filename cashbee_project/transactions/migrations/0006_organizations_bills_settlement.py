@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:56
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_collection_request_expiry'),
+        ('wallet', '0002_reconciliation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettlementBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('credits_count', models.PositiveIntegerField(default=0)),
+                ('wallets_count', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+            ],
+            options={
+                'verbose_name': 'Settlement Batch',
+                'verbose_name_plural': 'Settlement Batches',
+                'db_table': 'settlement_batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='transaction_type',
+            field=models.CharField(choices=[('Send', 'Send'), ('Donate', 'Donate'), ('Bill Pay', 'Bill Pay')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='Organization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('org_type', models.CharField(choices=[('Charity', 'Charity'), ('Biller', 'Biller')], max_length=10)),
+                ('category', models.CharField(blank=True, default='', help_text='Gas, Water, Electricity... for billers', max_length=50)),
+                ('deferred_settlement', models.BooleanField(default=False, help_text='Queue incoming credits and add them to the wallet in settlement batches (high volume).')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.OneToOneField(help_text="Account holding the organization's wallet.", on_delete=django.db.models.deletion.CASCADE, related_name='organization', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Organization',
+                'verbose_name_plural': 'Organizations',
+                'db_table': 'organizations',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Bill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(help_text='Invoice or account number at the organization.', max_length=50)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))])),
+                ('due_date', models.DateField()),
+                ('status', models.CharField(choices=[('Unpaid', 'Unpaid'), ('Paid', 'Paid')], default='Unpaid', max_length=10)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bills', to=settings.AUTH_USER_MODEL)),
+                ('transaction', models.OneToOneField(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bill', to='transactions.transaction')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bills', to='transactions.organization')),
+            ],
+            options={
+                'verbose_name': 'Bill',
+                'verbose_name_plural': 'Bills',
+                'db_table': 'bills',
+                'ordering': ['due_date'],
+                'indexes': [models.Index(fields=['customer', 'status'], name='bills_customer_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('organization', 'reference'), name='unique_bill_reference')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DeferredCredit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.OneToOneField(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deferred_credit', to='transactions.transaction')),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='deferred_credits', to='wallet.wallet')),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='credits', to='transactions.settlementbatch')),
+            ],
+            options={
+                'verbose_name': 'Deferred Credit',
+                'verbose_name_plural': 'Deferred Credits',
+                'db_table': 'deferred_credits',
+                'indexes': [models.Index(condition=models.Q(('batch__isnull', True)), fields=['wallet'], name='deferred_unsettled_idx')],
+            },
+        ),
+    ]
@@ -9,6 +9,8 @@ class Transaction(models.Model):
     """Represents a financial transaction between two wallets."""
     class TransactionType(models.TextChoices):
         SEND = 'Send', 'Send'
+        DONATE = 'Donate', 'Donate'
+        BILL_PAY = 'Bill Pay', 'Bill Pay'
     
     class TransactionStatus(models.TextChoices):
         PENDING = 'Pending', 'Pending'  
@@ -62,6 +64,11 @@ class Transaction(models.Model):
         db_table = 'transactions'
         verbose_name = 'Transaction'
         verbose_name_plural = 'Transactions'
+        indexes = [
+            # Limit checks and history: one wallet, bounded on date
+            models.Index(fields=['from_wallet', 'date'], name='transactions_from_date_idx'),
+            models.Index(fields=['to_wallet', 'date'], name='transactions_to_date_idx'),
+        ]
 
     def clean(self):
         super().clean()
@@ -82,6 +89,7 @@ class CollectionRequest(models.Model):
         PENDING = 'Pending', 'Pending'
         APPROVED = 'Approved', 'Approved'
         REJECTED = 'Rejected', 'Rejected'
+        EXPIRED = 'Expired', 'Expired'
 
     class ReqType(models.TextChoices):
         COLLECT_MONEY = "Collect Money", "Collect Money"
@@ -121,7 +129,9 @@ class CollectionRequest(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name='collection_request'
+        related_name='collection_request',
+        # transactions is partitioned on date, Postgres can't reference its id alone
+        db_constraint=False
     )
     note = models.CharField(
         max_length=60,
@@ -134,6 +144,18 @@ class CollectionRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Collection Request'
         verbose_name_plural = 'Collection Requests'
+        constraints = [
+            # At most one identical pending request, enforced by a partial unique index
+            models.UniqueConstraint(
+                fields=['from_user', 'to_user', 'amount', 'req_type'],
+                condition=models.Q(status='Pending'),
+                name='unique_pending_collection_request',
+            ),
+        ]
+        indexes = [
+            # The expiry sweeper walks pending requests oldest first
+            models.Index(fields=['status', 'created_at'], name='collection_status_created_idx'),
+        ]
     
     def clean(self):
         super().clean()
@@ -145,4 +167,190 @@ class CollectionRequest(models.Model):
     def __str__(self):
         if self.pk:
             return f"Request #{self.id}: {self.from_user.name} → {self.to_user.name} | {self.amount} EGP ({self.get_status_display()})"
-        return f"Request: {self.from_user.name} → {self.to_user.name} | {self.amount} EGP"
\ No newline at end of file
+        return f"Request: {self.from_user.name} → {self.to_user.name} | {self.amount} EGP"
+
+class RecurringTransfer(models.Model):
+    """A transfer repeated on a cron schedule (e.g. a weekly allowance), run by run_recurring_transfers"""
+    class RunStatus(models.TextChoices):
+        SUCCESS = 'Success', 'Success'
+        FAILED = 'Failed', 'Failed'
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='recurring_transfers',
+        help_text="The user who pays."
+    )
+    receiver = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='incoming_recurring_transfers',
+        help_text="The user who receives the money."
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('1.00'))]
+    )
+    schedule = models.CharField(max_length=100, help_text="Cron expression, e.g. '0 9 * * 5' for Fridays at 9:00")
+    next_run_at = models.DateTimeField()
+    is_active = models.BooleanField(default=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.CharField(max_length=10, choices=RunStatus.choices, blank=True, default='')
+    last_error = models.CharField(max_length=255, blank=True, default='')
+    failure_count = models.PositiveIntegerField(default=0, help_text="Consecutive failed runs")
+    last_transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        # transactions is partitioned on date, Postgres can't reference its id alone
+        db_constraint=False
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recurring_transfers'
+        ordering = ['next_run_at']
+        verbose_name = 'Recurring Transfer'
+        verbose_name_plural = 'Recurring Transfers'
+        indexes = [
+            # The scheduler polls active transfers that are due
+            models.Index(fields=['next_run_at'], condition=models.Q(is_active=True), name='recurring_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner} → {self.receiver} | {self.amount} EGP ({self.schedule})"
+
+
+class Organization(models.Model):
+    """A charity or a biller. It receives money through the wallet of its own user account."""
+    class OrgType(models.TextChoices):
+        CHARITY = 'Charity', 'Charity'
+        BILLER = 'Biller', 'Biller'
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='organization',
+        help_text="Account holding the organization's wallet."
+    )
+    name = models.CharField(max_length=100)
+    org_type = models.CharField(max_length=10, choices=OrgType.choices)
+    category = models.CharField(max_length=50, blank=True, default='', help_text="Gas, Water, Electricity... for billers")
+    deferred_settlement = models.BooleanField(
+        default=False,
+        help_text="Queue incoming credits and add them to the wallet in settlement batches (high volume)."
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'organizations'
+        ordering = ['name']
+        verbose_name = 'Organization'
+        verbose_name_plural = 'Organizations'
+
+    def __str__(self):
+        return f"{self.name} ({self.get_org_type_display()})"
+
+
+class Bill(models.Model):
+    """A bill issued by a biller organization to one of its customers."""
+    class Status(models.TextChoices):
+        UNPAID = 'Unpaid', 'Unpaid'
+        PAID = 'Paid', 'Paid'
+
+    organization = models.ForeignKey(Organization, on_delete=models.PROTECT, related_name='bills')
+    customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bills')
+    reference = models.CharField(max_length=50, help_text="Invoice or account number at the organization.")
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0.01'))]
+    )
+    due_date = models.DateField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.UNPAID)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    transaction = models.OneToOneField(
+        Transaction,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bill',
+        # transactions is partitioned on date, Postgres can't reference its id alone
+        db_constraint=False
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'bills'
+        ordering = ['due_date']
+        verbose_name = 'Bill'
+        verbose_name_plural = 'Bills'
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'reference'], name='unique_bill_reference'),
+        ]
+        indexes = [
+            models.Index(fields=['customer', 'status'], name='bills_customer_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Bill {self.reference} | {self.amount} EGP ({self.get_status_display()})"
+
+
+class SettlementBatch(models.Model):
+    """One run of DeferredCreditSettlement: queued credits added to their wallets."""
+    created_at = models.DateTimeField(auto_now_add=True)
+    credits_count = models.PositiveIntegerField(default=0)
+    wallets_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        db_table = 'settlement_batches'
+        ordering = ['-created_at']
+        verbose_name = 'Settlement Batch'
+        verbose_name_plural = 'Settlement Batches'
+
+    def __str__(self):
+        return f"Settlement {self.created_at:%Y-%m-%d %H:%M} | {self.credits_count} credits, {self.total_amount} EGP"
+
+
+class DeferredCredit(models.Model):
+    """
+    Money owed to an organization wallet for a successful payment, until a
+    settlement batch adds it to the balance. The transaction already counts
+    it as received: balance + unsettled credits is what the ledger says.
+    """
+    wallet = models.ForeignKey(Wallet, on_delete=models.PROTECT, related_name='deferred_credits')
+    transaction = models.OneToOneField(
+        Transaction,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='deferred_credit',
+        # transactions is partitioned on date, Postgres can't reference its id alone
+        db_constraint=False
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    batch = models.ForeignKey(
+        SettlementBatch,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='credits'
+    )
+
+    class Meta:
+        db_table = 'deferred_credits'
+        verbose_name = 'Deferred Credit'
+        verbose_name_plural = 'Deferred Credits'
+        indexes = [
+            # Settlement and reconciliation only read the unsettled credits
+            models.Index(fields=['wallet'], condition=models.Q(batch__isnull=True), name='deferred_unsettled_idx'),
+        ]
+
+    def __str__(self):
+        return f"Credit of {self.amount} EGP to wallet {self.wallet_id}"
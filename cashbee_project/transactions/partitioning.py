@@ -0,0 +1,170 @@
+"""
+Monthly range partitioning of the ``transactions`` table (PostgreSQL only).
+
+The parent table is partitioned on ``date`` with one partition per month
+(``transactions_y2025m01``) plus a DEFAULT partition catching anything outside
+the created ranges. Rows that landed in the DEFAULT partition (a month whose
+partition was not created in time) are moved into the monthly partition when
+it is created. Queries bounded on ``date`` (limit checks, recent history)
+only touch the matching partitions, and old months can be detached and
+archived without a bulk DELETE.
+
+The primary key is (id, date) in the database since Postgres requires the
+partition key in unique constraints; ids still come from one sequence so
+Django keeps using ``id`` alone.
+"""
+from datetime import date, datetime, timezone
+
+from django.db import connection as default_connection, transaction as db_transaction
+
+TABLE = 'transactions'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_y{month.year}m{month.month:02d}"
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat()
+
+
+def is_partitioned(connection=default_connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection=default_connection):
+    """Names of the attached partitions, oldest first"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+            [TABLE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f'"{name}"'])
+    return cursor.fetchone()[0]
+
+
+def create_partition(cursor, month):
+    """
+    Create the partition of ``month``. Postgres refuses to while the DEFAULT
+    partition holds rows of that month, so those are moved: detach the
+    default, create the partition, move the rows, attach the default again.
+    """
+    name = partition_name(month)
+    if _exists(cursor, name):
+        return name
+    start, end = _bound(month), _bound(add_months(month, 1))
+    create = (
+        f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" '
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+    in_default = False
+    if _exists(cursor, DEFAULT_PARTITION):
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE date >= %s AND date < %s)', [start, end]
+        )
+        in_default = cursor.fetchone()[0]
+    if not in_default:
+        cursor.execute(create)
+        return name
+
+    with db_transaction.atomic(using=cursor.db.alias):
+        cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{DEFAULT_PARTITION}"')
+        cursor.execute(create)
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE date >= %s AND date < %s RETURNING *) '
+            f'INSERT INTO "{TABLE}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT')
+    return name
+
+
+def ensure_partitions(start, months_ahead=3, connection=default_connection):
+    """Create the monthly partitions from ``start`` up to ``months_ahead`` months after today"""
+    last = add_months(month_start(datetime.now(timezone.utc)), months_ahead)
+    month = month_start(start)
+    created = []
+    with connection.cursor() as cursor:
+        while month <= last:
+            created.append(create_partition(cursor, month))
+            month = add_months(month, 1)
+    return created
+
+
+def detach_partitions_before(cutoff, connection=default_connection):
+    """
+    Detach the monthly partitions entirely before ``cutoff``. They become plain
+    tables that can be archived (see archive_transactions) and dropped.
+    """
+    boundary = partition_name(month_start(cutoff))
+    detached = []
+    with connection.cursor() as cursor:
+        for name in list_partitions(connection):
+            if name == DEFAULT_PARTITION or name >= boundary:
+                continue
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+            detached.append(name)
+    return detached
+
+
+def partition_table(connection, months_ahead=3):
+    """
+    Convert the plain ``transactions`` table into a partitioned one, keeping
+    rows, indexes, foreign keys and the id sequence. Run from a migration.
+    """
+    legacy = f'{TABLE}_legacy'
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT min(date), coalesce(max(id), 0) FROM "{TABLE}"')
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{legacy}"')
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+            [legacy, f'{TABLE}_pkey'],
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [legacy],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f'ALTER TABLE "{legacy}" ALTER COLUMN id DROP IDENTITY IF EXISTS')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (date)'
+        )
+        cursor.execute(f'CREATE SEQUENCE "{TABLE}_id_seq" START WITH {max_id + 1} OWNED BY "{TABLE}".id')
+        cursor.execute(f"""ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval('"{TABLE}_id_seq"')""")
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, date)')
+
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+    ensure_partitions(oldest or datetime.now(timezone.utc), months_ahead, connection)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{legacy}"')
+        cursor.execute(f'DROP TABLE "{legacy}"')
+        for index_def in index_defs:
+            cursor.execute(index_def.replace(f'.{legacy} ', f'.{TABLE} ').replace(f' {legacy} ', f' {TABLE} '))
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
@@ -4,10 +4,15 @@ from rest_framework import serializers
 from users.models import User
 
 from .services import CollectMoney, TransactionOperation
-from .models import Transaction, CollectionRequest
+from .cron import CronSchedule
+from .models import Transaction, CollectionRequest, RecurringTransfer, Organization, Bill
+from django.utils import timezone
 
 class TransactionSerializer(serializers.ModelSerializer):
-    receiver_phone = serializers.CharField(write_only=True)
+    # Send needs receiver_phone, Donate organization_id, Bill Pay bill_id
+    receiver_phone = serializers.CharField(write_only=True, required=False)
+    organization_id = serializers.IntegerField(write_only=True, required=False)
+    bill_id = serializers.IntegerField(write_only=True, required=False)
     
     # Read-only fields for display
     from_user_name = serializers.CharField(source='from_wallet.user.name', read_only=True)
@@ -16,22 +21,49 @@ class TransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
         fields = [
-            'id', 'amount', 'transaction_type', 'receiver_phone', 
+            'id', 'amount', 'transaction_type', 'receiver_phone', 'organization_id', 'bill_id',
             'status', 'date', 'from_user_name', 'to_user_name',
             'from_wallet_balance_before', 'to_wallet_balance_before'
         ]
         read_only_fields = ['id', 'status', 'date', 'from_user_name', 'to_user_name', 
                            'from_wallet_balance_before', 'to_wallet_balance_before']
+        extra_kwargs = {'amount': {'required': False}}
     
     def validate(self, data):
         """Validation logic before making a transaction"""
         user = self.context['request'].user
+        tx_type = data['transaction_type']
         to_phone = data.get('receiver_phone')
         amount = data.get('amount')
 
+        if tx_type == Transaction.TransactionType.BILL_PAY:
+            bill = Bill.objects.select_related('organization__user__wallet').filter(
+                pk=data.get('bill_id'), customer=user
+            ).first()
+            if not bill:
+                raise serializers.ValidationError("Bill not found.")
+            if amount is not None and amount != bill.amount:
+                raise serializers.ValidationError(f"The bill amount is {bill.amount}.")
+            data['bill'] = bill
+            data['amount'] = bill.amount
+            return data
+
+        if amount is None:
+            raise serializers.ValidationError({"amount": "This field is required."})
         if amount <= 0:
             raise serializers.ValidationError("Invalid amount.")
 
+        if tx_type == Transaction.TransactionType.DONATE:
+            organization = Organization.objects.select_related('user__wallet').filter(
+                pk=data.get('organization_id'), org_type=Organization.OrgType.CHARITY
+            ).first()
+            if not organization:
+                raise serializers.ValidationError("Charity not found.")
+            data['organization'] = organization
+            return data
+
+        if not to_phone:
+            raise serializers.ValidationError({"receiver_phone": "This field is required."})
         if user.phone_number == to_phone:
             raise serializers.ValidationError("Cannot send money to yourself.")
 
@@ -40,11 +72,14 @@ class TransactionSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create a transaction via services layer"""
         from_user = self.context['request'].user
-        to_phone = validated_data['receiver_phone']
+        to_phone = validated_data.get('receiver_phone')
         amount = validated_data['amount']
         tx_type = validated_data['transaction_type']
         
-        operation = TransactionOperation(from_user, to_phone, tx_type, amount)
+        operation = TransactionOperation(
+            from_user, to_phone, tx_type, amount,
+            bill=validated_data.get('bill'), organization=validated_data.get('organization'),
+        )
         
         try:
             tr = operation.execute_transaction()
@@ -78,7 +113,7 @@ class CollectMoneySerializer(serializers.ModelSerializer):
         if not to_user:
             raise serializers.ValidationError("Receiver not found.")
 
-        if from_user.national_id == to_user.national_id:
+        if from_user.pk == to_user.pk:
             raise serializers.ValidationError("Cannot send a request to yourself.")
 
         if data["amount"] <= 0:
@@ -91,13 +126,81 @@ class CollectMoneySerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create collect money request through service layer"""
         from_user = validated_data["from_user"]
-        to_phone = validated_data["to_phone"]
         amount = validated_data["amount"]
         req_type = validated_data.get("req_type", CollectionRequest.ReqType.COLLECT_MONEY)
 
         try:
-            collect = CollectMoney(from_user, amount, to_phone)
+            # Receiver already fetched in validate()
+            collect = CollectMoney(from_user, amount, req_type=req_type, to_user=validated_data["to_user"])
             collection_request = collect.execute()
             return collection_request
         except DjangoValidationError as e:
-            raise serializers.ValidationError(str(e))
\ No newline at end of file
+            raise serializers.ValidationError(str(e))
+
+class BulkCollectionActionSerializer(serializers.Serializer):
+    """Input of the bulk approve/reject action"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+    action = serializers.ChoiceField(choices=["approve", "reject"])
+
+
+class RecurringTransferSerializer(serializers.ModelSerializer):
+    receiver_phone = serializers.CharField(write_only=True)
+    receiver_name = serializers.CharField(source="receiver.name", read_only=True)
+
+    class Meta:
+        model = RecurringTransfer
+        fields = [
+            "id", "receiver_phone", "receiver_name", "amount", "schedule", "is_active",
+            "next_run_at", "last_run_at", "last_status", "last_error", "created_at",
+        ]
+        read_only_fields = ["id", "receiver_name", "next_run_at", "last_run_at", "last_status", "last_error", "created_at"]
+
+    def validate_schedule(self, value):
+        try:
+            CronSchedule(value).next_after(timezone.now())
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def validate(self, data):
+        user = self.context["request"].user
+        if "receiver_phone" in data:
+            receiver = User.objects.filter(phone_number=data.pop("receiver_phone")).first()
+            if not receiver:
+                raise serializers.ValidationError("Receiver not found.")
+            if receiver.pk == user.pk:
+                raise serializers.ValidationError("Cannot send money to yourself.")
+            data["receiver"] = receiver
+        elif self.instance is None:
+            raise serializers.ValidationError({"receiver_phone": "This field is required."})
+        return data
+
+    def save(self, **kwargs):
+        # A new or changed schedule, or a reactivated transfer, starts from now
+        instance = self.instance
+        data = self.validated_data
+        if (instance is None or data.get("schedule", instance.schedule) != instance.schedule
+                or (data.get("is_active") and not instance.is_active)):
+            schedule = data.get("schedule") or instance.schedule
+            kwargs["next_run_at"] = CronSchedule(schedule).next_after(timezone.now())
+            kwargs["failure_count"] = 0
+        return super().save(**kwargs)
+
+
+class OrganizationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Organization
+        fields = ['id', 'name', 'org_type', 'category']
+
+
+class BillSerializer(serializers.ModelSerializer):
+    organization_name = serializers.CharField(source='organization.name', read_only=True)
+
+    class Meta:
+        model = Bill
+        fields = ['id', 'organization', 'organization_name', 'reference', 'amount', 'due_date', 'status', 'paid_at']
+        read_only_fields = fields
@@ -1,14 +1,25 @@
+import logging
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from datetime import datetime
-from django.db.models import Sum
+from datetime import datetime, timedelta
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction as db_transaction
-from django.shortcuts import get_object_or_404
-from .models import CollectionRequest, Transaction
+from django.db import IntegrityError, transaction as db_transaction
+from .cron import CronSchedule
+from .models import (
+    Bill, CollectionRequest, DeferredCredit, Organization, RecurringTransfer, SettlementBatch, Transaction,
+)
 from wallet.models import Wallet, SystemLimit, PersonalLimit, FamilyLimit
 from users.models import User, UsersRole
+from cashbee_project.db_routing import pin_to_primary
+from notifications.live import publish_balance, publish_collection_request
+from notifications.models import OutboxEvent
+from notifications.outbox import collection_request_event, record_event, record_events, transaction_event
+
+logger = logging.getLogger(__name__)
 
 
 class UserRepository:
@@ -126,11 +137,62 @@ class TransactionLimitChecker:
                 f"Available: {limits['monthly'] - monthly_total} EGP"
             )
 
+    @staticmethod
+    def spent_totals(wallet):
+        """(today, this month) totals of successful transfers from the wallet, in one query"""
+        today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start_of_month = today_start.replace(day=1)
+        totals = Transaction.objects.filter(
+            from_wallet=wallet,
+            date__gte=start_of_month,
+            status=Transaction.TransactionStatus.SUCCESS,
+        ).aggregate(
+            daily=Sum('amount', filter=Q(date__gte=today_start)),
+            monthly=Sum('amount'),
+        )
+        return totals['daily'] or Decimal('0.00'), totals['monthly'] or Decimal('0.00')
+
+    @staticmethod
+    def check_amount(limits, amount, daily_total, monthly_total):
+        """Check an amount against already computed limits and totals"""
+        if amount > limits['per_transaction']:
+            raise ValidationError(
+                f"❌ Amount exceeds your per-transaction limit of {limits['per_transaction']} EGP"
+            )
+        if daily_total + amount > limits['daily']:
+            raise ValidationError(
+                f"❌ Transaction would exceed your daily limit. "
+                f"Spent today: {daily_total} EGP, Limit: {limits['daily']} EGP, "
+                f"Available: {limits['daily'] - daily_total} EGP"
+            )
+        if monthly_total + amount > limits['monthly']:
+            raise ValidationError(
+                f"❌ Transaction would exceed your monthly limit. "
+                f"Spent this month: {monthly_total} EGP, Limit: {limits['monthly']} EGP, "
+                f"Available: {limits['monthly'] - monthly_total} EGP"
+            )
+
+    @staticmethod
+    def check_all(user, amount, wallet=None):
+        """
+        Per-transaction, daily and monthly checks with a single limits lookup
+        and one aggregate query for both totals
+        """
+        limits = TransactionLimitChecker.get_effective_limits(user)
+        if amount > limits['per_transaction']:
+            raise ValidationError(
+                f"❌ Amount exceeds your per-transaction limit of {limits['per_transaction']} EGP"
+            )
+        wallet = wallet or WalletRepository.get_wallet_by_user(user)
+        daily_total, monthly_total = TransactionLimitChecker.spent_totals(wallet)
+        TransactionLimitChecker.check_amount(limits, amount, daily_total, monthly_total)
+
 
 class Payment(ABC):
     def __init__(self, from_wallet: Wallet, amount: Decimal, to_wallet: Wallet, tx_type: str):
-        self.from_wallet = get_object_or_404(Wallet, pk=from_wallet.id)
-        self.to_wallet = get_object_or_404(Wallet, pk=to_wallet.id)
+        # Re-read with a row lock by lock_wallets() once inside the transaction
+        self.from_wallet = from_wallet
+        self.to_wallet = to_wallet
         self.amount = amount
         self.tx_type = tx_type
         self.date = datetime.now()
@@ -156,17 +218,24 @@ class Payment(ABC):
                 f"Required: {amount} EGP"
             )
         
-        # Check all limits
-        user = from_wallet.user
-        
-        # Check per-transaction limit
-        TransactionLimitChecker.check_per_transaction_limit(user, amount)
-        
-        # Check daily limit
-        TransactionLimitChecker.check_daily_limit(user, amount)
-        
-        # Check monthly limit
-        TransactionLimitChecker.check_monthly_limit(user, amount)
+        # Check per-transaction, daily and monthly limits
+        TransactionLimitChecker.check_all(from_wallet.user, amount, wallet=from_wallet)
+
+    def lock_wallets(self):
+        """
+        Re-read both wallets with a row lock (in id order, so two opposite
+        transfers can't deadlock). Balances are checked and updated under it.
+        """
+        ids = {self.from_wallet.pk, self.to_wallet.pk}
+        wallets = {
+            wallet.pk: wallet
+            for wallet in Wallet.objects.select_for_update(of=('self',))
+            .select_related('user').filter(pk__in=ids).order_by('pk')
+        }
+        if len(wallets) != len(ids):
+            raise ValidationError("❌ Wallet not found.")
+        self.from_wallet = wallets[self.from_wallet.pk]
+        self.to_wallet = wallets[self.to_wallet.pk]
     
     def create_transaction(self):
         self.transaction = Transaction.objects.create(
@@ -176,8 +245,11 @@ class Payment(ABC):
             transaction_type=self.tx_type,
             status=Transaction.TransactionStatus.PENDING,
             from_wallet_balance_before=self.from_wallet.balance,  
-            to_wallet_balance_before=self.to_wallet.balance       
+            to_wallet_balance_before=self.to_wallet_balance_before()
         )
+
+    def to_wallet_balance_before(self):
+        return self.to_wallet.balance
     
     def update_transaction(self, res):
         self.transaction.status = (
@@ -194,15 +266,22 @@ class SendRecievePayment(Payment):
     @db_transaction.atomic
     def execute(self) -> tuple[str, Transaction]:
         try:
+            self.lock_wallets()
             self.validate_transaction(self.from_wallet, self.to_wallet, self.amount)
             self.create_transaction()
 
             self.from_wallet.balance -= Decimal(self.amount)
-            self.from_wallet.save()
+            self.from_wallet.save(update_fields=['balance', 'updated_at'])
             self.to_wallet.balance += Decimal(self.amount)
-            self.to_wallet.save()
+            self.to_wallet.save(update_fields=['balance', 'updated_at'])
 
             self.update_transaction(True)
+            record_event(*transaction_event(self.transaction))
+            publish_balance(self.from_wallet, self.transaction)
+            publish_balance(self.to_wallet, self.transaction)
+            # Both users read their new balances from the primary for a while
+            users = (self.from_wallet.user_id, self.to_wallet.user_id)
+            db_transaction.on_commit(lambda: pin_to_primary(*users))
             return f"✅ {self.tx_type} successful", self.transaction
         except Exception as e:
             if self.transaction:
@@ -210,11 +289,125 @@ class SendRecievePayment(Payment):
             raise  # Re-raise the exception so it can be handled by the caller
 
 
+class OrganizationPayment(Payment):
+    """
+    Payment to an organization's wallet. With deferred_settlement only the
+    payer's wallet is locked: the credit is queued as a DeferredCredit and
+    added by the next settlement batch, so busy organizations never serialize
+    their incoming payments on one wallet row.
+    """
+
+    def __init__(self, from_wallet: Wallet, amount: Decimal, organization: Organization, tx_type: str):
+        super().__init__(from_wallet, amount, organization.user.wallet, tx_type)
+        self.organization = organization
+
+    def lock_wallets(self):
+        if not self.organization.deferred_settlement:
+            return super().lock_wallets()
+        try:
+            self.from_wallet = (
+                Wallet.objects.select_for_update(of=('self',)).select_related('user').get(pk=self.from_wallet.pk)
+            )
+            # The organization's wallet stays unlocked, read what the ledger
+            # says it holds (balance + unsettled credits) in one statement so
+            # a settlement committing in between is counted exactly once
+            unsettled = (
+                DeferredCredit.objects.filter(wallet=OuterRef('pk'), batch__isnull=True)
+                .order_by().values('wallet').annotate(total=Sum('amount')).values('total')
+            )
+            self.to_wallet = Wallet.objects.select_related('user').annotate(
+                ledger_balance=ExpressionWrapper(
+                    F('balance') + Coalesce(Subquery(unsettled), Value(Decimal('0.00'))),
+                    output_field=DecimalField(max_digits=15, decimal_places=2),
+                )
+            ).get(pk=self.to_wallet.pk)
+        except Wallet.DoesNotExist:
+            raise ValidationError("❌ Wallet not found.")
+
+    def to_wallet_balance_before(self):
+        if self.organization.deferred_settlement:
+            return self.to_wallet.ledger_balance
+        return super().to_wallet_balance_before()
+
+    def validate_payment(self):
+        if not self.organization.is_active:
+            raise ValidationError("❌ Organization is not accepting payments.")
+
+    def after_payment(self):
+        pass
+
+    @db_transaction.atomic
+    def execute(self) -> tuple[str, Transaction]:
+        try:
+            self.lock_wallets()
+            self.validate_payment()
+            self.validate_transaction(self.from_wallet, self.to_wallet, self.amount)
+            self.create_transaction()
+
+            self.from_wallet.balance -= Decimal(self.amount)
+            self.from_wallet.save(update_fields=['balance', 'updated_at'])
+            if self.organization.deferred_settlement:
+                DeferredCredit.objects.create(wallet=self.to_wallet, transaction=self.transaction, amount=self.amount)
+            else:
+                self.to_wallet.balance += Decimal(self.amount)
+                self.to_wallet.save(update_fields=['balance', 'updated_at'])
+                publish_balance(self.to_wallet, self.transaction)
+
+            self.update_transaction(True)
+            self.after_payment()
+            record_event(*transaction_event(self.transaction))
+            publish_balance(self.from_wallet, self.transaction)
+            user_id = self.from_wallet.user_id
+            db_transaction.on_commit(lambda: pin_to_primary(user_id))
+            return f"✅ {self.tx_type} successful", self.transaction
+        except Exception:
+            if self.transaction:
+                self.update_transaction(False)
+            raise
+
+
+class DonationPayment(OrganizationPayment):
+    def __init__(self, from_wallet: Wallet, amount: Decimal, organization: Organization):
+        super().__init__(from_wallet, amount, organization, Transaction.TransactionType.DONATE)
+
+    def validate_payment(self):
+        super().validate_payment()
+        if self.organization.org_type != Organization.OrgType.CHARITY:
+            raise ValidationError("❌ Donations can only be made to charities.")
+
+
+class BillPayment(OrganizationPayment):
+    """Pays a whole bill, the amount is the bill's"""
+
+    def __init__(self, from_wallet: Wallet, bill: Bill):
+        super().__init__(from_wallet, bill.amount, bill.organization, Transaction.TransactionType.BILL_PAY)
+        self.bill = bill
+
+    def validate_payment(self):
+        super().validate_payment()
+        # Lock the bill, a double tap waits here and then sees it paid
+        self.bill = Bill.objects.select_for_update().get(pk=self.bill.pk)
+        if self.bill.customer_id != self.from_wallet.user_id:
+            raise ValidationError("❌ This bill belongs to another customer.")
+        if self.bill.status == Bill.Status.PAID:
+            raise ValidationError(f"❌ Bill {self.bill.reference} is already paid.")
+
+    def after_payment(self):
+        self.bill.status = Bill.Status.PAID
+        self.bill.paid_at = timezone.now()
+        self.bill.transaction = self.transaction
+        self.bill.save(update_fields=['status', 'paid_at', 'transaction'])
+
+
 class PaymentFactory:
     @staticmethod
-    def create_payment(payment_type, from_wallet, amount, to_wallet, bill=None) -> Payment:
+    def create_payment(payment_type, from_wallet, amount, to_wallet, bill=None, organization=None) -> Payment:
         if payment_type == Transaction.TransactionType.SEND:
             return SendRecievePayment(from_wallet, amount, to_wallet)
+        elif payment_type == Transaction.TransactionType.DONATE:
+            return DonationPayment(from_wallet, amount, organization)
+        elif payment_type == Transaction.TransactionType.BILL_PAY:
+            return BillPayment(from_wallet, bill)
         else:
             raise ValueError("❌ Invalid payment type")
 
@@ -222,14 +415,18 @@ class PaymentFactory:
 class TransactionOperation:
     """To apply any operation send, receive, donate, bill pay"""
     
-    def __init__(self, from_user, to_phone, payment_type, amount, bill=None):
+    def __init__(self, from_user, to_phone, payment_type, amount, bill=None, organization=None):
         self.from_user = from_user
         self.from_wallet = WalletRepository.get_wallet_by_user(from_user)
-        to_user = UserRepository.get_user_by_phone(to_phone)
-        self.to_wallet = WalletRepository.get_wallet_by_user(to_user)
         self.payment_type = payment_type 
         self.amount = amount
-        self.bill = None
+        self.bill = bill
+        self.organization = bill.organization if bill is not None else organization
+        if self.organization is not None:
+            self.to_wallet = self.organization.user.wallet
+        else:
+            to_user = UserRepository.get_user_by_phone(to_phone)
+            self.to_wallet = WalletRepository.get_wallet_by_user(to_user)
     
     def execute_transaction(self):       
         payment: Payment = PaymentFactory.create_payment(
@@ -237,15 +434,18 @@ class TransactionOperation:
             self.from_wallet, 
             self.amount, 
             self.to_wallet, 
-            self.bill
+            self.bill,
+            self.organization,
         )
         msg, tr = payment.execute()
         return tr
 
 
 class CollectMoney:
-    def __init__(self, from_user: User, amount: Decimal, to_phone, req_type=CollectionRequest.ReqType.COLLECT_MONEY):
-        self.to_user = UserRepository.get_user_by_phone(to_phone)
+    def __init__(self, from_user: User, amount: Decimal, to_phone=None, req_type=CollectionRequest.ReqType.COLLECT_MONEY,
+                 to_user: User = None):
+        # Pass to_user when the caller already looked it up
+        self.to_user = to_user or UserRepository.get_user_by_phone(to_phone)
         self.from_user = from_user
         self.amount = amount
         self.req_type = req_type
@@ -264,27 +464,414 @@ class CollectMoney:
         # You can implement role-based logic here if needed
         return True
 
-    @db_transaction.atomic
-    def execute(self, req_type=CollectionRequest.ReqType.COLLECT_MONEY):
+    def execute(self):
         """Create a collection request if allowed."""
         
         if not self.can_collect():
             raise ValidationError("❌ Request not allowed for these user roles.") 
 
-        if CollectionRequest.objects.filter(
-            from_user=self.from_user,
-            to_user=self.to_user,
-            amount=self.amount,
-            status=CollectionRequest.Status.PENDING,
-            req_type=req_type,
-        ).exists():
-            raise ValidationError("❌ A pending request already exists between these users.")
-        
-        new_request = CollectionRequest.objects.create(
-            from_user=self.from_user,
-            to_user=self.to_user,
-            amount=self.amount,
-            req_type=self.req_type,
-            status=CollectionRequest.Status.PENDING,
+        fields = dict(from_user=self.from_user, to_user=self.to_user, amount=self.amount, req_type=self.req_type)
+        now = timezone.now()
+        with db_transaction.atomic():
+            # A matching request past its TTL can no longer be approved: expire
+            # it now rather than let it hold the slot until the sweeper runs
+            stale = list(
+                CollectionRequest.objects.select_for_update()
+                .filter(status=CollectionRequest.Status.PENDING, created_at__lt=expiry_cutoff(now), **fields)
+                .only(*EXPIRY_FIELDS)
+            )
+            if stale:
+                CollectionRequestExpirySweeper.expire(stale, now)
+
+            # Duplicates are rejected by the unique_pending_collection_request index,
+            # no check-then-insert race between two identical requests
+            try:
+                with db_transaction.atomic():
+                    new_request = CollectionRequest.objects.create(status=CollectionRequest.Status.PENDING, **fields)
+            except IntegrityError as e:
+                if not violates(e, CollectionRequest, 'unique_pending_collection_request'):
+                    raise
+                raise ValidationError("❌ A pending request already exists between these users.")
+            record_event(*collection_request_event(OutboxEvent.EventType.COLLECTION_REQUEST_CREATED, new_request))
+            publish_collection_request(new_request, new_request.to_user_id, 'collection_request.created')
+        return new_request
+
+
+def violates(error, model, constraint_name):
+    """Whether an IntegrityError was raised by the unique constraint ``constraint_name`` of ``model``"""
+    name = getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None)
+    if name is not None:  # PostgreSQL reports the constraint
+        return name == constraint_name
+    # SQLite only lists the columns
+    constraint = next(c for c in model._meta.constraints if c.name == constraint_name)
+    table = model._meta.db_table
+    columns = ', '.join(f"{table}.{model._meta.get_field(field).column}" for field in constraint.fields)
+    return str(error) == f"UNIQUE constraint failed: {columns}"
+
+
+# What expiring a request needs: the outbox event and live update payloads
+EXPIRY_FIELDS = ('id', 'from_user_id', 'to_user_id', 'amount', 'req_type', 'transaction_id')
+
+
+def get_expiry_settings():
+    return {'TTL': 7 * 24 * 3600, 'BATCH_SIZE': 1000, **getattr(settings, 'COLLECTION_REQUEST_EXPIRY', {})}
+
+
+def expiry_cutoff(now=None):
+    """Pending requests created before this are expired"""
+    return (now or timezone.now()) - timedelta(seconds=get_expiry_settings()['TTL'])
+
+
+class CollectionRequestApproval:
+    """
+    Settle a pending collection request: the recipient pays the requester.
+    Call it inside an atomic block holding the request row lock, with
+    from_user__wallet and to_user__wallet already loaded.
+    """
+
+    def __init__(self, collection_req: CollectionRequest):
+        self.collection_req = collection_req
+
+    def execute(self) -> Transaction:
+        collection_req = self.collection_req
+        if collection_req.created_at < expiry_cutoff():
+            # Past its TTL but not swept yet
+            raise ValidationError("❌ Request expired.")
+        payment = PaymentFactory.create_payment(
+            Transaction.TransactionType.SEND,
+            collection_req.to_user.wallet,
+            collection_req.amount,
+            collection_req.from_user.wallet,
+        )
+        msg, transaction = payment.execute()
+
+        collection_req.status = CollectionRequest.Status.APPROVED
+        collection_req.transaction = transaction
+        collection_req.save(update_fields=['status', 'transaction', 'updated_at'])
+        record_event(*collection_request_event(OutboxEvent.EventType.COLLECTION_REQUEST_APPROVED, collection_req))
+        publish_collection_request(collection_req, collection_req.from_user_id)
+        return transaction
+
+
+class BulkCollectionSettlement:
+    """
+    Approve or reject many collection requests addressed to one payer in a
+    single transaction. Requests and wallets are locked with one query each,
+    limits are computed once and the running totals checked per item, so one
+    failing request doesn't block the others. Returns one result per id.
+    """
+
+    def __init__(self, payer: User, request_ids):
+        self.payer = payer
+        self.request_ids = list(dict.fromkeys(request_ids))
+
+    def _lock_requests(self):
+        requests = CollectionRequest.objects.select_for_update(of=('self',)).filter(
+            pk__in=self.request_ids, to_user=self.payer
+        ).order_by('pk')
+        return {req.pk: req for req in requests}
+
+    def _results(self, requests, process):
+        cutoff = expiry_cutoff()
+        results = []
+        for request_id in self.request_ids:
+            collection_req = requests.get(request_id)
+            if collection_req is None:
+                results.append({"id": request_id, "status": "error", "error": "❌ Request not found"})
+            elif collection_req.status != CollectionRequest.Status.PENDING:
+                results.append({"id": request_id, "status": "error", "error": "❌ Request already processed"})
+            elif collection_req.created_at < cutoff:
+                results.append({"id": request_id, "status": "error", "error": "❌ Request expired."})
+            else:
+                try:
+                    results.append({"id": request_id, "status": process(collection_req)})
+                except ValidationError as e:
+                    results.append({"id": request_id, "status": "error", "error": e.messages[0]})
+        return results
+
+    @db_transaction.atomic
+    def reject(self):
+        requests = self._lock_requests()
+        rejected = []
+
+        def process(collection_req):
+            rejected.append(collection_req.pk)
+            return "rejected"
+
+        results = self._results(requests, process)
+        CollectionRequest.objects.filter(pk__in=rejected).update(
+            status=CollectionRequest.Status.REJECTED, updated_at=timezone.now()
+        )
+        if rejected:
+            record_events([
+                collection_request_event(OutboxEvent.EventType.COLLECTION_REQUEST_REJECTED, requests[pk])
+                for pk in rejected
+            ])
+        for pk in rejected:
+            requests[pk].status = CollectionRequest.Status.REJECTED
+            publish_collection_request(requests[pk], requests[pk].from_user_id)
+        return results
+
+    @db_transaction.atomic
+    def approve(self):
+        requests = self._lock_requests()
+        user_ids = {self.payer.pk} | {req.from_user_id for req in requests.values()}
+        wallets = {
+            wallet.user_id: wallet
+            for wallet in Wallet.objects.select_for_update().filter(user_id__in=user_ids).order_by('pk')
+        }
+        payer_wallet = wallets.get(self.payer.pk)
+        if payer_wallet is None:
+            raise ValidationError(f"❌ Wallet not found for user {self.payer}.")
+
+        limits = TransactionLimitChecker.get_effective_limits(self.payer)
+        daily_total, monthly_total = TransactionLimitChecker.spent_totals(payer_wallet)
+        now = timezone.now()
+        transactions, approved = [], []
+
+        def process(collection_req):
+            nonlocal daily_total, monthly_total
+            amount = collection_req.amount
+            to_wallet = wallets.get(collection_req.from_user_id)
+            if to_wallet is None:
+                raise ValidationError("❌ Target wallet not found.")
+            if amount < Decimal('1.0'):
+                raise ValidationError("❌ Amount must be at least 1.0 EGP.")
+            if amount > payer_wallet.balance:
+                raise ValidationError(
+                    f"❌ Insufficient balance. Available: {payer_wallet.balance} EGP, "
+                    f"Required: {amount} EGP"
+                )
+            TransactionLimitChecker.check_amount(limits, amount, daily_total, monthly_total)
+
+            transactions.append(Transaction(
+                from_wallet=payer_wallet,
+                to_wallet=to_wallet,
+                amount=amount,
+                transaction_type=Transaction.TransactionType.SEND,
+                status=Transaction.TransactionStatus.SUCCESS,
+                from_wallet_balance_before=payer_wallet.balance,
+                to_wallet_balance_before=to_wallet.balance,
+            ))
+            payer_wallet.balance -= amount
+            to_wallet.balance += amount
+            daily_total += amount
+            monthly_total += amount
+            approved.append(collection_req)
+            return "approved"
+
+        results = self._results(requests, process)
+        if not approved:
+            return results
+
+        Transaction.objects.bulk_create(transactions)
+        for collection_req, transaction in zip(approved, transactions):
+            collection_req.status = CollectionRequest.Status.APPROVED
+            collection_req.transaction = transaction
+            collection_req.updated_at = now
+        CollectionRequest.objects.bulk_update(approved, ['status', 'transaction', 'updated_at'])
+
+        changed = [payer_wallet] + [wallets[req.from_user_id] for req in approved]
+        changed = list({wallet.pk: wallet for wallet in changed}.values())
+        for wallet in changed:
+            wallet.updated_at = now
+        Wallet.objects.bulk_update(changed, ['balance', 'updated_at'])
+
+        events = []
+        for collection_req, transaction in zip(approved, transactions):
+            events.append(transaction_event(transaction))
+            events.append(collection_request_event(OutboxEvent.EventType.COLLECTION_REQUEST_APPROVED, collection_req))
+            publish_collection_request(collection_req, collection_req.from_user_id)
+        record_events(events)
+        for wallet in changed:
+            publish_balance(wallet)
+
+        for result, transaction in zip([r for r in results if r["status"] == "approved"], transactions):
+            result["transaction_id"] = transaction.id
+        db_transaction.on_commit(lambda: pin_to_primary(*user_ids))
+        return results
+
+
+class CollectionRequestExpirySweeper:
+    """
+    Mark pending requests older than the TTL as Expired, oldest first through
+    the (status, created_at) index. Each chunk is its own short transaction
+    and skips rows an approval currently holds locked.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or get_expiry_settings()['BATCH_SIZE']
+
+    @db_transaction.atomic
+    def sweep_batch(self, now=None):
+        now = now or timezone.now()
+        expired = list(
+            CollectionRequest.objects.select_for_update(skip_locked=True)
+            .filter(status=CollectionRequest.Status.PENDING, created_at__lt=expiry_cutoff(now))
+            .order_by('created_at')
+            .only(*EXPIRY_FIELDS)[:self.batch_size]
+        )
+        if expired:
+            self.expire(expired, now)
+        return len(expired)
+
+    @staticmethod
+    def expire(requests, now):
+        """Mark locked pending requests Expired, with their outbox events and live updates"""
+        CollectionRequest.objects.filter(pk__in=[req.pk for req in requests]).update(
+            status=CollectionRequest.Status.EXPIRED, updated_at=now
+        )
+        record_events([
+            collection_request_event(OutboxEvent.EventType.COLLECTION_REQUEST_EXPIRED, req) for req in requests
+        ])
+        for req in requests:
+            req.status = CollectionRequest.Status.EXPIRED
+            publish_collection_request(req, req.from_user_id)
+            publish_collection_request(req, req.to_user_id)
+
+    def sweep(self, now=None):
+        """Expire everything that is due, return how many requests expired"""
+        total = 0
+        while True:
+            count = self.sweep_batch(now)
+            total += count
+            if count < self.batch_size:
+                return total
+
+
+class DeferredCreditSettlement:
+    """
+    Adds queued DeferredCredits to their organization wallets. Each batch
+    claims up to ``batch_size`` credits with SKIP LOCKED, sums them per wallet
+    and locks and updates every wallet once, then records a SettlementBatch.
+    """
+
+    def __init__(self, batch_size=10000):
+        self.batch_size = batch_size
+
+    @db_transaction.atomic
+    def settle_batch(self):
+        credits = list(
+            DeferredCredit.objects.select_for_update(skip_locked=True)
+            .filter(batch__isnull=True).order_by('id')
+            .values_list('id', 'wallet_id', 'amount')[:self.batch_size]
         )
-        return new_request
\ No newline at end of file
+        if not credits:
+            return None
+
+        totals = {}
+        for _, wallet_id, amount in credits:
+            totals[wallet_id] = totals.get(wallet_id, Decimal('0.00')) + amount
+        now = timezone.now()
+        wallets = list(Wallet.objects.select_for_update().filter(pk__in=totals).order_by('pk'))
+        for wallet in wallets:
+            wallet.balance += totals[wallet.pk]
+            wallet.updated_at = now
+        Wallet.objects.bulk_update(wallets, ['balance', 'updated_at'])
+
+        batch = SettlementBatch.objects.create(
+            credits_count=len(credits), wallets_count=len(totals), total_amount=sum(totals.values())
+        )
+        DeferredCredit.objects.filter(pk__in=[credit_id for credit_id, _, _ in credits]).update(batch=batch)
+        for wallet in wallets:
+            publish_balance(wallet)
+        return batch
+
+    def settle(self):
+        """Settle everything queued, return the batches"""
+        batches = []
+        while True:
+            batch = self.settle_batch()
+            if batch is None:
+                return batches
+            batches.append(batch)
+            if batch.credits_count < self.batch_size:
+                return batches
+
+
+class RecurringTransferScheduler:
+    """
+    Runs due recurring transfers through SendRecievePayment.
+
+    A short transaction claims a batch with SELECT ... FOR UPDATE SKIP LOCKED
+    and pushes next_run_at forward by ``lease`` seconds, so other schedulers
+    leave those jobs alone. Each job then runs in its own transaction: the job
+    row is locked again, the transfer is made and the new next_run_at saved
+    and committed together, so wallet locks are only held for one transfer.
+    The leased next_run_at is the claim: a job claimed again by another
+    scheduler after its lease ran out is skipped. A job whose scheduler died
+    runs once the lease expires. Runs missed while no scheduler was up are
+    not replayed.
+    """
+
+    def __init__(self, batch_size=50, max_failures=3, lease=300):
+        self.batch_size = batch_size
+        self.max_failures = max_failures
+        self.lease = lease
+
+    def claim_batch(self, now=None):
+        """Lease due jobs, return (job id, scheduled time, lease) claims"""
+        now = now or timezone.now()
+        lease_until = now + timedelta(seconds=self.lease)
+        with db_transaction.atomic():
+            due = list(
+                RecurringTransfer.objects.select_for_update(skip_locked=True)
+                .filter(is_active=True, next_run_at__lte=now)
+                .order_by('next_run_at', 'pk')
+                .values_list('pk', 'next_run_at')[:self.batch_size]
+            )
+            RecurringTransfer.objects.filter(pk__in=[pk for pk, _ in due]).update(next_run_at=lease_until)
+        return [(pk, scheduled_at, lease_until) for pk, scheduled_at in due]
+
+    def run_job(self, claim, now=None):
+        """Run one claimed job in its own transaction, None if the claim was lost"""
+        pk, scheduled_at, lease_until = claim
+        now = now or timezone.now()
+        with db_transaction.atomic():
+            job = (
+                RecurringTransfer.objects.select_for_update(of=('self',))
+                .select_related('owner__wallet', 'receiver__wallet')
+                .filter(pk=pk, is_active=True, next_run_at=lease_until)
+                .first()
+            )
+            if job is None:
+                return None
+            self._run(job, now, scheduled_at)
+            job.save(update_fields=[
+                'next_run_at', 'is_active', 'last_run_at', 'last_status', 'last_error',
+                'failure_count', 'last_transaction', 'updated_at',
+            ])
+        return job
+
+    def run_batch(self, now=None):
+        jobs = []
+        for claim in self.claim_batch(now):
+            try:
+                job = self.run_job(claim, now)
+            except Exception:
+                # Left leased, it runs again once the lease expires
+                logger.exception("Recurring transfer %s could not be run", claim[0])
+                continue
+            if job is not None:
+                jobs.append(job)
+        return jobs
+
+    def _run(self, job, now, scheduled_at):
+        job.last_run_at = job.updated_at = now
+        try:
+            payment = SendRecievePayment(job.owner.wallet, job.amount, job.receiver.wallet)
+            msg, transaction = payment.execute()
+        except Exception as e:
+            if not isinstance(e, ValidationError):
+                logger.exception("Recurring transfer %s failed", job.pk)
+            job.last_status = RecurringTransfer.RunStatus.FAILED
+            job.last_error = (e.messages[0] if isinstance(e, ValidationError) else str(e))[:255]
+            job.failure_count += 1
+            if job.failure_count >= self.max_failures:
+                job.is_active = False
+        else:
+            job.last_status = RecurringTransfer.RunStatus.SUCCESS
+            job.last_error = ''
+            job.failure_count = 0
+            job.last_transaction = transaction
+        job.next_run_at = CronSchedule(job.schedule).next_after(max(now, scheduled_at))
@@ -0,0 +1,168 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.models import User
+from transactions.archive import TransactionArchive, _pyarrow, transaction_to_row
+from transactions.models import CollectionRequest, Transaction
+
+
+class ArchiveTransactionsTest(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        settings_override = override_settings(TRANSACTION_ARCHIVE={'DIR': self.archive_dir, 'FORMAT': 'ndjson'})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            phone_number="+201000000001",
+            first_name="Sondos",
+            last_name="Ali",
+            password="So@1234567"
+        )
+        self.receiver = User.objects.create_user(
+            phone_number="+201000000002",
+            first_name="Nada",
+            last_name="Hassan",
+            password="Na@1234567"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_transaction(self, days_ago, status=Transaction.TransactionStatus.SUCCESS):
+        tx = Transaction.objects.create(
+            from_wallet=self.user.wallet,
+            to_wallet=self.receiver.wallet,
+            amount=Decimal('10.00'),
+            transaction_type=Transaction.TransactionType.SEND,
+            status=status,
+            from_wallet_balance_before=Decimal('100.00'),
+            to_wallet_balance_before=Decimal('0.00'),
+        )
+        # date is auto_now_add
+        Transaction.objects.filter(pk=tx.pk).update(date=timezone.now() - timedelta(days=days_ago))
+        return tx
+
+    def test_archives_old_settled_transactions(self):
+        old = self.create_transaction(days_ago=500)
+        pending = self.create_transaction(days_ago=500, status=Transaction.TransactionStatus.PENDING)
+        recent = self.create_transaction(days_ago=1)
+        request = CollectionRequest.objects.create(
+            from_user=self.receiver, to_user=self.user, amount=Decimal('10.00'), transaction=old
+        )
+
+        before = self.client.get("/api/transactions/").json()
+        call_command('archive_transactions', '--older-than', '12', stdout=StringIO())
+
+        self.assertEqual(
+            set(Transaction.objects.values_list('id', flat=True)), {pending.id, recent.id}
+        )
+        request.refresh_from_db()
+        self.assertIsNone(request.transaction)
+
+        live = self.client.get("/api/transactions/").json()
+        self.assertEqual(len(live), 2)
+
+        merged = self.client.get("/api/transactions/?include_archived=true").json()
+        self.assertEqual(merged, before)
+
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(
+            phone_number="+201000000003", first_name="Omar", last_name="Adel", password="Om@1234567"
+        ))
+        self.assertEqual(other.get("/api/transactions/?include_archived=true").json(), [])
+
+    def test_rerun_merges_with_existing_month(self):
+        first = self.create_transaction(days_ago=500)
+        call_command('archive_transactions', stdout=StringIO())
+        second = self.create_transaction(days_ago=500)
+        call_command('archive_transactions', stdout=StringIO())
+
+        archived = self.client.get("/api/transactions/?include_archived=1").json()
+        self.assertEqual({tx['id'] for tx in archived}, {first.id, second.id})
+
+    def test_date_filter_skips_other_months(self):
+        older = self.create_transaction(days_ago=560)
+        newer = self.create_transaction(days_ago=450)
+        older_date, newer_date = (Transaction.objects.get(pk=tx.pk).date for tx in (older, newer))
+        call_command('archive_transactions', stdout=StringIO())
+        archived = self.client.get("/api/transactions/", {
+            'include_archived': 'true', 'date__lte': (newer_date - timedelta(days=1)).isoformat(),
+            'date__gte': (older_date + timedelta(days=1)).isoformat(),
+        }).json()
+        self.assertEqual(archived, [])
+
+        # Opening the older month's file would fail
+        for path in TransactionArchive().directory.glob(f"{older_date:%Y-%m}.*"):
+            path.write_bytes(b"not gzip")
+
+        since = (timezone.now() - timedelta(days=460)).isoformat()
+        archived = self.client.get("/api/transactions/", {'include_archived': 'true', 'date__gte': since}).json()
+        self.assertEqual([tx['id'] for tx in archived], [newer.id])
+
+        archived = self.client.get("/api/transactions/", {
+            'include_archived': 'true', 'date': newer_date.isoformat(),
+        }).json()
+        self.assertEqual([tx['id'] for tx in archived], [newer.id])
+
+    def test_rewriting_a_month_drops_the_other_format(self):
+        archive = TransactionArchive(file_format='ndjson')
+        month = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        archive.directory.mkdir(parents=True, exist_ok=True)
+        stale = archive.directory / "2024-01.parquet"
+        stale.write_bytes(b"rows already merged into the new file")
+
+        path = archive.write_month(month, [])
+        self.assertTrue(path.exists())
+        self.assertFalse(stale.exists())
+
+    @unittest.skipUnless(_pyarrow(), "pyarrow is not installed")
+    def test_format_switch_does_not_duplicate_rows(self):
+        first = self.create_transaction(days_ago=500)
+        call_command('archive_transactions', stdout=StringIO())
+        second = self.create_transaction(days_ago=500)
+        with override_settings(TRANSACTION_ARCHIVE={'DIR': self.archive_dir, 'FORMAT': 'parquet'}):
+            call_command('archive_transactions', stdout=StringIO())
+
+        self.assertEqual(sorted(p.suffix for p in TransactionArchive().directory.iterdir()), ['.parquet'])
+        archived = self.client.get("/api/transactions/?include_archived=1").json()
+        self.assertEqual(sorted(tx['id'] for tx in archived), [first.id, second.id])
+
+    @unittest.skipUnless(_pyarrow(), "pyarrow is not installed")
+    def test_parquet_archive(self):
+        older = self.create_transaction(days_ago=500)
+        newer = self.create_transaction(days_ago=500)
+        other = User.objects.create_user(
+            phone_number="+201000000003", first_name="Omar", last_name="Adel", password="Om@1234567"
+        )
+        unrelated = Transaction.objects.create(
+            from_wallet=other.wallet, to_wallet=self.receiver.wallet, amount=Decimal('5.00'),
+            transaction_type=Transaction.TransactionType.SEND, status=Transaction.TransactionStatus.SUCCESS,
+            from_wallet_balance_before=Decimal('50.00'), to_wallet_balance_before=Decimal('0.00'),
+        )
+        month = datetime(2024, 1, 10, 12, 0, tzinfo=dt_timezone.utc)
+        Transaction.objects.filter(pk__in=[older.pk, unrelated.pk]).update(date=month)
+        Transaction.objects.filter(pk=newer.pk).update(date=month + timedelta(hours=1))
+        before = self.client.get("/api/transactions/").json()
+        rows = [
+            transaction_to_row(tx) for tx in Transaction.objects.select_related(
+                'from_wallet__user', 'to_wallet__user').order_by('id')
+        ]
+
+        archive = TransactionArchive(file_format='parquet')
+        path = archive.write_month(month, rows)
+        self.assertTrue(path.name.endswith('.parquet'))
+        self.assertEqual([row['id'] for row in archive.read_month(month)], [row['id'] for row in rows])
+        Transaction.objects.all().delete()
+
+        self.assertEqual(self.client.get("/api/transactions/?include_archived=true").json(), before)
+        archived = archive.read(user_id=self.user.pk, date_from=month + timedelta(minutes=30))
+        self.assertEqual([tx['id'] for tx in archived], [newer.id])
+        self.assertEqual({tx['id'] for tx in archive.read()}, {older.id, newer.id, unrelated.id})
@@ -0,0 +1,88 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from users.authentication import get_token_cache
+from users.models import User, Family, UsersRole
+from wallet.models import SystemLimit
+from transactions.models import CollectionRequest, Transaction
+
+
+class AsyncReadViewsTest(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        SystemLimit.objects.all().delete()
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('1000.00'),
+            daily_limit=Decimal('5000.00'),
+            monthly_limit=Decimal('20000.00'),
+            is_active=True
+        )
+        self.user = User.objects.create_user(
+            phone_number="+201000000001",
+            first_name="Sondos",
+            last_name="Ali",
+            password="So@1234567"
+        )
+        self.receiver = User.objects.create_user(
+            phone_number="+201000000002",
+            first_name="Nada",
+            last_name="Hassan",
+            password="Na@1234567"
+        )
+        self.token, _ = Token.objects.get_or_create(user=self.user)
+        self.auth = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+
+    def test_requires_token(self):
+        response = self.client.get("/api/async/wallet/")
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.get("/api/async/wallet/", HTTP_AUTHORIZATION="Token invalid")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"detail": "Invalid token."})
+
+    def test_wallet_matches_sync_endpoint(self):
+        async_data = self.client.get("/api/async/wallet/", **self.auth).json()
+        sync_data = self.client.get("/api/wallet/", **self.auth).json()
+        self.assertEqual(async_data, sync_data)
+
+    def test_transaction_list_matches_sync_endpoint(self):
+        Transaction.objects.create(
+            from_wallet=self.user.wallet,
+            to_wallet=self.receiver.wallet,
+            amount=Decimal('100.00'),
+            transaction_type=Transaction.TransactionType.SEND,
+            from_wallet_balance_before=Decimal('500.00'),
+            to_wallet_balance_before=Decimal('0.00'),
+        )
+        async_data = self.client.get("/api/async/transactions/", **self.auth).json()
+        self.assertEqual(len(async_data), 1)
+        self.assertEqual(async_data, self.client.get("/api/transactions/", **self.auth).json())
+
+        response = self.client.get("/api/async/transactions/?status=nope", **self.auth)
+        self.assertEqual(response.status_code, 400)
+
+    def test_collection_requests_received_and_sent(self):
+        CollectionRequest.objects.create(from_user=self.user, to_user=self.receiver, amount=Decimal('50.00'))
+
+        sent = self.client.get("/api/async/collection-requests/sent/", **self.auth).json()
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sent[0]["to_user_name"], self.receiver.name)
+        self.assertEqual(
+            sent, self.client.get("/api/collection-requests/sent/", **self.auth).json()
+        )
+
+        received = self.client.get("/api/async/collection-requests/received/", **self.auth).json()
+        self.assertEqual(received, [])
+
+    def test_family_members(self):
+        family = Family.objects.create(name="Ali")
+        User.objects.filter(pk=self.user.pk).update(family=family, role=UsersRole.PARENT)
+        get_token_cache().clear()
+
+        data = self.client.get(f"/api/async/families/{family.pk}/members/", **self.auth).json()
+        self.assertEqual(data["total_members"], 1)
+        self.assertEqual(data, self.client.get(f"/api/families/{family.pk}/members/", **self.auth).json())
+
+        other = Family.objects.create(name="Hassan")
+        response = self.client.get(f"/api/async/families/{other.pk}/members/", **self.auth)
+        self.assertEqual(response.status_code, 404)
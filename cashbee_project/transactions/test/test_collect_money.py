@@ -0,0 +1,111 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from transactions.models import CollectionRequest
+from transactions.services import CollectMoney, CollectionRequestExpirySweeper
+from notifications.models import OutboxEvent
+from wallet.models import Wallet
+
+
+class CollectMoneyTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            phone_number="+201000000001", first_name="Sondos", last_name="Ali", password="So@1234567"
+        )
+        self.payer = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/collection-requests/"
+        self.data = {"to_phone": "+201000000002", "amount": "100.00"}
+
+    def test_create_takes_four_queries(self):
+        # lookup of the payer, stale duplicates to expire, the request INSERT and its outbox event
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        queries = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(queries), 4)
+
+    def test_duplicate_pending_request_is_rejected(self):
+        self.assertEqual(self.client.post(self.url, self.data, format="json").status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.url, self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("A pending request already exists", str(response.data))
+        self.assertEqual(CollectionRequest.objects.count(), 1)
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        with patch('transactions.services.record_event', side_effect=IntegrityError("outbox insert failed")):
+            with self.assertRaises(IntegrityError):
+                CollectMoney(self.user, Decimal('100.00'), to_user=self.payer).execute()
+        self.assertFalse(CollectionRequest.objects.exists())
+
+    def test_same_request_allowed_once_processed(self):
+        self.client.post(self.url, self.data, format="json")
+        CollectionRequest.objects.update(status=CollectionRequest.Status.REJECTED)
+        response = self.client.post(self.url, self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_expired_duplicate_does_not_block_a_new_request(self):
+        self.client.post(self.url, self.data, format="json")
+        stale = CollectionRequest.objects.get()
+        CollectionRequest.objects.update(created_at=timezone.now() - timedelta(days=8))
+
+        response = self.client.post(self.url, self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, CollectionRequest.Status.EXPIRED)
+        self.assertTrue(OutboxEvent.objects.filter(
+            event_type=OutboxEvent.EventType.COLLECTION_REQUEST_EXPIRED, aggregate_id=stale.pk
+        ).exists())
+
+
+class CollectionRequestExpiryTest(TestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(
+            phone_number="+201000000001", first_name="Omar", last_name="Ali", password="Om@1234567"
+        )
+        self.payer = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        )
+        self.old = CollectionRequest.objects.create(from_user=self.requester, to_user=self.payer, amount=Decimal('10.00'))
+        self.fresh = CollectionRequest.objects.create(from_user=self.requester, to_user=self.payer, amount=Decimal('20.00'))
+        CollectionRequest.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=8))
+
+    def test_sweeper_expires_old_pending_requests_in_batches(self):
+        older = CollectionRequest.objects.create(from_user=self.requester, to_user=self.payer, amount=Decimal('30.00'))
+        CollectionRequest.objects.filter(pk=older.pk).update(created_at=timezone.now() - timedelta(days=9))
+
+        self.assertEqual(CollectionRequestExpirySweeper(batch_size=1).sweep(), 2)
+        statuses = dict(CollectionRequest.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[self.old.pk], CollectionRequest.Status.EXPIRED)
+        self.assertEqual(statuses[older.pk], CollectionRequest.Status.EXPIRED)
+        self.assertEqual(statuses[self.fresh.pk], CollectionRequest.Status.PENDING)
+        self.assertEqual(
+            OutboxEvent.objects.filter(event_type=OutboxEvent.EventType.COLLECTION_REQUEST_EXPIRED).count(), 2
+        )
+
+    def test_sweeper_publishes_live_updates(self):
+        with patch('transactions.services.publish_collection_request') as publish:
+            CollectionRequestExpirySweeper().sweep()
+        self.assertEqual(
+            sorted((call.args[0].pk, call.args[0].status, call.args[1]) for call in publish.call_args_list),
+            sorted([(self.old.pk, CollectionRequest.Status.EXPIRED, self.requester.pk),
+                    (self.old.pk, CollectionRequest.Status.EXPIRED, self.payer.pk)]),
+        )
+
+    def test_unswept_expired_request_cannot_be_approved(self):
+        Wallet.objects.filter(user=self.payer).update(balance=Decimal('100.00'))
+        client = APIClient()
+        client.force_authenticate(user=self.payer)
+        response = client.patch(f"/api/collection-requests/{self.old.pk}/approve/")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Request expired", str(response.data))
@@ -0,0 +1,153 @@
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from wallet.models import SystemLimit, Wallet
+from notifications.models import OutboxEvent
+from transactions.models import CollectionRequest, Transaction
+from transactions.views import CollectionRequestViewSet
+
+
+class CollectionApprovalTest(TestCase):
+    def setUp(self):
+        SystemLimit.objects.all().delete()
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('1000.00'),
+            daily_limit=Decimal('5000.00'),
+            monthly_limit=Decimal('20000.00'),
+            is_active=True
+        )
+        self.requester = User.objects.create_user(
+            phone_number="+201000000001", first_name="Sondos", last_name="Ali", password="So@1234567"
+        )
+        self.payer = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        )
+        Wallet.objects.filter(user=self.payer).update(balance=Decimal('500.00'))
+        self.collection_req = CollectionRequest.objects.create(
+            from_user=self.requester, to_user=self.payer, amount=Decimal('100.00')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.payer)
+        self.url = f"/api/collection-requests/{self.collection_req.pk}/approve/"
+
+    def test_approve_transfers_in_bounded_queries(self):
+        with self.assertNumQueries(16):
+            response = self.client.patch(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.collection_req.refresh_from_db()
+        self.assertEqual(self.collection_req.status, CollectionRequest.Status.APPROVED)
+        self.assertEqual(self.collection_req.transaction.status, Transaction.TransactionStatus.SUCCESS)
+        self.assertEqual(Wallet.objects.get(user=self.payer).balance, Decimal('400.00'))
+        self.assertEqual(Wallet.objects.get(user=self.requester).balance, Decimal('100.00'))
+
+    def test_second_approval_is_rejected(self):
+        self.assertEqual(self.client.patch(self.url).status_code, status.HTTP_200_OK)
+        response = self.client.patch(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(Wallet.objects.get(user=self.payer).balance, Decimal('400.00'))
+
+    def test_reject_cannot_override_an_approval(self):
+        stale = CollectionRequest.objects.get(pk=self.collection_req.pk)
+        self.assertEqual(self.client.patch(self.url).status_code, status.HTTP_200_OK)
+
+        # The reject read the request before the approval committed: the
+        # status is checked again under the row lock, not on that stale copy
+        with patch.object(CollectionRequestViewSet, 'get_object', return_value=stale):
+            response = self.client.patch(f"/api/collection-requests/{self.collection_req.pk}/reject/")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.collection_req.refresh_from_db()
+        self.assertEqual(self.collection_req.status, CollectionRequest.Status.APPROVED)
+        self.assertIsNotNone(self.collection_req.transaction)
+        self.assertFalse(OutboxEvent.objects.filter(
+            event_type=OutboxEvent.EventType.COLLECTION_REQUEST_REJECTED
+        ).exists())
+
+    def test_failed_transfer_leaves_request_pending(self):
+        Wallet.objects.filter(user=self.payer).update(balance=Decimal('50.00'))
+        response = self.client.patch(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Insufficient balance", response.data["error"])
+
+        self.collection_req.refresh_from_db()
+        self.assertEqual(self.collection_req.status, CollectionRequest.Status.PENDING)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_only_recipient_can_approve(self):
+        self.client.force_authenticate(user=self.requester)
+        response = self.client.patch(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BulkCollectionActionTest(TestCase):
+    def setUp(self):
+        SystemLimit.objects.all().delete()
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('1000.00'),
+            daily_limit=Decimal('250.00'),
+            monthly_limit=Decimal('20000.00'),
+            is_active=True
+        )
+        self.payer = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        )
+        Wallet.objects.filter(user=self.payer).update(balance=Decimal('500.00'))
+        self.requesters = [
+            User.objects.create_user(
+                phone_number=f"+20100000001{i}", first_name="Child", last_name=str(i), password="Ch@1234567"
+            )
+            for i in range(3)
+        ]
+        self.requests = [
+            CollectionRequest.objects.create(from_user=user, to_user=self.payer, amount=Decimal('100.00'))
+            for user in self.requesters
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.payer)
+        self.url = "/api/collection-requests/bulk/"
+
+    def test_bulk_approve_with_per_item_results(self):
+        ids = [req.pk for req in self.requests] + [9999]
+        response = self.client.post(self.url, {"ids": ids, "action": "approve"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.data["results"]
+        self.assertEqual([r["status"] for r in results], ["approved", "approved", "error", "error"])
+        self.assertIn("daily limit", results[2]["error"])
+        self.assertEqual(results[3]["error"], "❌ Request not found")
+
+        self.assertEqual(Wallet.objects.get(user=self.payer).balance, Decimal('300.00'))
+        self.assertEqual(Wallet.objects.get(user=self.requesters[0]).balance, Decimal('100.00'))
+        self.assertEqual(
+            CollectionRequest.objects.get(pk=self.requests[0].pk).transaction_id, results[0]["transaction_id"]
+        )
+        self.assertEqual(CollectionRequest.objects.get(pk=self.requests[2].pk).status, CollectionRequest.Status.PENDING)
+
+    def test_bulk_approve_query_count_does_not_grow(self):
+        SystemLimit.objects.update(daily_limit=Decimal('5000.00'))
+        ids = [req.pk for req in self.requests]
+        with self.assertNumQueries(11):
+            self.client.post(self.url, {"ids": ids, "action": "approve"}, format="json")
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_bulk_reject(self):
+        ids = [req.pk for req in self.requests[:2]]
+        response = self.client.post(self.url, {"ids": ids, "action": "reject"}, format="json")
+        self.assertEqual([r["status"] for r in response.data["results"]], ["rejected", "rejected"])
+        self.assertEqual(
+            CollectionRequest.objects.filter(status=CollectionRequest.Status.REJECTED).count(), 2
+        )
+
+        response = self.client.post(self.url, {"ids": ids, "action": "reject"}, format="json")
+        self.assertEqual(response.data["results"][0]["error"], "❌ Request already processed")
+
+    def test_only_received_requests(self):
+        self.client.force_authenticate(user=self.requesters[0])
+        response = self.client.post(self.url, {"ids": [self.requests[0].pk], "action": "approve"}, format="json")
+        self.assertEqual(response.data["results"][0]["status"], "error")
+        self.assertFalse(Transaction.objects.exists())
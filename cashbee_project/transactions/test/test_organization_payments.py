@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from transactions.models import Bill, DeferredCredit, Organization, SettlementBatch, Transaction
+from transactions.services import DeferredCreditSettlement, DonationPayment
+from users.models import User
+from wallet.models import SystemLimit, Wallet
+from wallet.reconciliation import WalletReconciler
+
+
+class OrganizationPaymentTest(TestCase):
+    def setUp(self):
+        SystemLimit.objects.all().delete()
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('1000.00'), daily_limit=Decimal('5000.00'),
+            monthly_limit=Decimal('20000.00'), is_active=True
+        )
+        self.user = User.objects.create_user(
+            phone_number="+201000000001", first_name="Omar", last_name="Ali", password="Om@1234567"
+        )
+        Wallet.objects.filter(user=self.user).update(balance=Decimal('500.00'))
+        charity_user = User.objects.create_user(
+            phone_number="+201000000010", first_name="Resala", last_name="Charity", password="Re@1234567"
+        )
+        self.charity = Organization.objects.create(
+            user=charity_user, name="Resala", org_type=Organization.OrgType.CHARITY, deferred_settlement=True
+        )
+        biller_user = User.objects.create_user(
+            phone_number="+201000000011", first_name="Cairo", last_name="Electricity", password="Ce@1234567"
+        )
+        self.biller = Organization.objects.create(
+            user=biller_user, name="Cairo Electricity", org_type=Organization.OrgType.BILLER, category="Electricity"
+        )
+        self.bill = Bill.objects.create(
+            organization=self.biller, customer=self.user, reference="EL-1001",
+            amount=Decimal('120.00'), due_date=date(2026, 11, 1)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def balance(self, user):
+        return Wallet.objects.get(user=user).balance
+
+    def test_deferred_donation_is_settled_in_a_batch(self):
+        for amount in ('10.00', '15.00'):
+            DonationPayment(self.user.wallet, Decimal(amount), self.charity).execute()
+
+        self.assertEqual(self.balance(self.user), Decimal('475.00'))
+        self.assertEqual(self.balance(self.charity.user), Decimal('0.00'))
+        self.assertEqual(DeferredCredit.objects.filter(batch__isnull=True).count(), 2)
+        # The ledger already counts the queued credits, the balance doesn't yet
+        self.assertEqual(WalletReconciler(lag=timedelta(0)).run().mismatch_count, 0)
+
+        batches = DeferredCreditSettlement().settle()
+        self.assertEqual(len(batches), 1)
+        self.assertEqual((batches[0].credits_count, batches[0].total_amount), (2, Decimal('25.00')))
+        self.assertEqual(self.balance(self.charity.user), Decimal('25.00'))
+        self.assertFalse(DeferredCredit.objects.filter(batch__isnull=True).exists())
+        self.assertEqual(DeferredCreditSettlement().settle(), [])
+        self.assertEqual(WalletReconciler(full=True).run().mismatch_count, 0)
+
+    def test_deferred_donation_records_the_ledger_balance(self):
+        Wallet.objects.filter(user=self.charity.user).update(balance=Decimal('100.00'))
+        stale = Wallet.objects.get(user=self.charity.user)
+        DonationPayment(self.user.wallet, Decimal('10.00'), self.charity).execute()
+        DeferredCreditSettlement().settle()
+        DonationPayment(self.user.wallet, Decimal('15.00'), self.charity).execute()
+
+        # Settled and unsettled credits both count, whatever the caller read
+        self.charity.user.wallet = stale
+        _, tx = DonationPayment(self.user.wallet, Decimal('20.00'), self.charity).execute()
+        self.assertEqual(tx.to_wallet_balance_before, Decimal('125.00'))
+
+    def test_donate_through_api(self):
+        response = self.client.post("/api/transactions/", {
+            "transaction_type": "Donate", "organization_id": self.charity.pk, "amount": "50.00",
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["transaction_type"], Transaction.TransactionType.DONATE)
+        self.assertEqual(self.balance(self.user), Decimal('450.00'))
+
+        response = self.client.post("/api/transactions/", {
+            "transaction_type": "Donate", "organization_id": self.biller.pk, "amount": "50.00",
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pay_bill_once(self):
+        data = {"transaction_type": "Bill Pay", "bill_id": self.bill.pk}
+        response = self.client.post("/api/transactions/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.bill.refresh_from_db()
+        self.assertEqual(self.bill.status, Bill.Status.PAID)
+        self.assertEqual(self.bill.transaction.amount, Decimal('120.00'))
+        # The biller settles immediately
+        self.assertEqual(self.balance(self.biller.user), Decimal('120.00'))
+        self.assertEqual(self.balance(self.user), Decimal('380.00'))
+
+        response = self.client.post("/api/transactions/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already paid", str(response.data))
+        self.assertEqual(self.balance(self.user), Decimal('380.00'))
+
+    def test_bills_and_organizations_listing(self):
+        bills = self.client.get("/api/bills/").data
+        self.assertEqual([bill["reference"] for bill in bills], ["EL-1001"])
+        names = [org["name"] for org in self.client.get("/api/organizations/?org_type=Charity").data]
+        self.assertEqual(names, ["Resala"])
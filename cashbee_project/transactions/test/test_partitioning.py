@@ -0,0 +1,82 @@
+import unittest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from transactions.models import Transaction
+from transactions.partitioning import (
+    DEFAULT_PARTITION, TABLE, add_months, ensure_partitions, is_partitioned, list_partitions, month_start,
+    partition_name, _bound,
+)
+from users.models import User
+
+
+class PartitionNamingTest(SimpleTestCase):
+    def test_month_arithmetic(self):
+        self.assertEqual(add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        self.assertEqual(month_start(datetime(2025, 3, 31, 23, 59)), date(2025, 3, 1))
+
+    def test_partition_names_sort_chronologically(self):
+        names = [partition_name(add_months(date(2024, 11, 1), i)) for i in range(4)]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(names[0], 'transactions_y2024m11')
+
+    def test_bounds_are_utc(self):
+        self.assertEqual(_bound(date(2025, 2, 1)), datetime(2025, 2, 1, tzinfo=timezone.utc).isoformat())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "Partitioning is PostgreSQL only")
+class PartitionedTableTest(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user(
+            phone_number="+201000000001", first_name="Sondos", last_name="Ali", password="So@1234567"
+        )
+        self.receiver = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        )
+
+    def create_transaction(self, when):
+        tx = Transaction.objects.create(
+            from_wallet=self.sender.wallet, to_wallet=self.receiver.wallet, amount=Decimal('10.00'),
+            transaction_type=Transaction.TransactionType.SEND, status=Transaction.TransactionStatus.SUCCESS,
+            from_wallet_balance_before=Decimal('100.00'), to_wallet_balance_before=Decimal('0.00'),
+        )
+        Transaction.objects.filter(pk=tx.pk).update(date=when)
+        return tx
+
+    def rows_in(self, table, tx):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM "{table}" WHERE id = %s', [tx.pk])
+            return cursor.fetchone()[0]
+
+    def test_migration_partitions_the_table(self):
+        this_month = month_start(datetime.now(timezone.utc))
+        self.assertTrue(is_partitioned())
+        partitions = list_partitions()
+        self.assertIn(DEFAULT_PARTITION, partitions)
+        self.assertIn(partition_name(this_month), partitions)
+        self.assertIn(partition_name(add_months(this_month, 3)), partitions)
+
+        tx = self.create_transaction(datetime.now(timezone.utc))
+        self.assertEqual(self.rows_in(partition_name(this_month), tx), 1)
+        self.assertEqual(Transaction.objects.get(pk=tx.pk).amount, Decimal('10.00'))
+
+    def test_new_partition_takes_rows_from_default(self):
+        this_month = month_start(datetime.now(timezone.utc))
+        later = add_months(this_month, 12)
+        tx = self.create_transaction(datetime(later.year, later.month, 15, tzinfo=timezone.utc))
+        other = self.create_transaction(datetime(later.year, later.month, 1, tzinfo=timezone.utc))
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION, tx), 1)
+
+        created = ensure_partitions(this_month, months_ahead=12)
+
+        name = partition_name(later)
+        self.assertEqual(created[-1], name)
+        self.assertIn(DEFAULT_PARTITION, list_partitions())
+        for moved in (tx, other):
+            self.assertEqual(self.rows_in(name, moved), 1)
+            self.assertEqual(self.rows_in(DEFAULT_PARTITION, moved), 0)
+            self.assertEqual(self.rows_in(TABLE, moved), 1)
+        # Running again is a no-op
+        self.assertEqual(ensure_partitions(this_month, months_ahead=12), created)
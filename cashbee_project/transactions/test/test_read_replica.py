@@ -0,0 +1,129 @@
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import transaction as db_transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from cashbee_project.db_routing import (
+    ReadReplicaRouter, _read_alias, check_sticky_cache, current_read_alias, is_pinned_to_primary, pin_to_primary,
+)
+from users.models import User
+from wallet.models import SystemLimit
+from transactions.models import Transaction
+from transactions.services import TransactionOperation
+from transactions.views import TransactionViewSet
+
+REPLICA = {'ALIAS': 'replica', 'STICKY_SECONDS': 5}
+
+
+class ReadReplicaRouterTest(TestCase):
+    def test_reads_follow_context_writes_stay_on_primary(self):
+        router = ReadReplicaRouter()
+        self.assertIsNone(router.db_for_read(Transaction))
+
+        token = _read_alias.set('replica')
+        try:
+            # TestCase wraps each test in atomic(), leave it to check the routing
+            with patch('cashbee_project.db_routing.connections') as connections:
+                connections.__getitem__.return_value.in_atomic_block = False
+                self.assertEqual(router.db_for_read(Transaction), 'replica')
+                connections.__getitem__.return_value.in_atomic_block = True
+                self.assertIsNone(router.db_for_read(Transaction))
+            self.assertEqual(router.db_for_write(Transaction), 'default')
+        finally:
+            _read_alias.reset(token)
+
+        self.assertFalse(router.allow_migrate('replica', 'transactions'))
+
+    def test_sticky_pins_require_a_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        shared = {**locmem, 'shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'pins'}}
+        for caches, conf in ((locmem, REPLICA), (locmem, {**REPLICA, 'CACHE': 'shared'})):
+            with self.subTest(conf=conf), override_settings(CACHES=caches, READ_REPLICA=conf):
+                with self.assertRaises(ImproperlyConfigured):
+                    check_sticky_cache()
+
+        with override_settings(CACHES=shared, READ_REPLICA={**REPLICA, 'CACHE': 'shared'}):
+            check_sticky_cache()
+        with override_settings(CACHES=locmem, READ_REPLICA={'ALIAS': None}):
+            check_sticky_cache()
+
+
+@override_settings(READ_REPLICA=REPLICA)
+class ReplicaReadMixinTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        SystemLimit.objects.all().delete()
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('1000.00'),
+            daily_limit=Decimal('5000.00'),
+            monthly_limit=Decimal('20000.00'),
+            is_active=True
+        )
+        self.user = User.objects.create_user(
+            phone_number="+201000000001",
+            first_name="Sondos",
+            last_name="Ali",
+            password="So@1234567"
+        )
+        self.receiver = User.objects.create_user(
+            phone_number="+201000000002",
+            first_name="Nada",
+            last_name="Hassan",
+            password="Na@1234567"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def list_alias(self):
+        """Read alias seen by TransactionViewSet.get_queryset during a list request"""
+        seen = []
+        original = TransactionViewSet.get_queryset
+
+        def get_queryset(view):
+            seen.append(current_read_alias())
+            return original(view)
+
+        with patch.object(TransactionViewSet, 'get_queryset', get_queryset):
+            self.client.get("/api/transactions/")
+        return seen[0]
+
+    def test_list_uses_replica(self):
+        self.assertEqual(self.list_alias(), 'replica')
+        self.assertIsNone(current_read_alias())
+
+    def test_write_actions_stay_on_primary(self):
+        seen = []
+
+        def operation(*args, **kwargs):
+            seen.append(current_read_alias())
+            raise ValidationError("❌ Stop here")
+
+        with patch('transactions.serializers.TransactionOperation', side_effect=operation):
+            self.client.post("/api/transactions/", {"receiver_phone": "+201000000002", "amount": "10.00", "transaction_type": "Send"},
+                             format="json")
+        self.assertEqual(seen, [None])
+
+    def test_transfer_pins_users_to_primary(self):
+        self.user.wallet.balance = Decimal('500.00')
+        self.user.wallet.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with db_transaction.atomic():
+                TransactionOperation(
+                    from_user=self.user,
+                    to_phone="+201000000002",
+                    payment_type=Transaction.TransactionType.SEND,
+                    amount=Decimal('100.00')
+                ).execute_transaction()
+
+        self.assertTrue(is_pinned_to_primary(self.user.pk))
+        self.assertTrue(is_pinned_to_primary(self.receiver.pk))
+        self.assertIsNone(self.list_alias())
+
+    @override_settings(READ_REPLICA={'ALIAS': None})
+    def test_disabled_without_replica(self):
+        pin_to_primary(self.user.pk)
+        self.assertFalse(is_pinned_to_primary(self.user.pk))
+        self.assertIsNone(self.list_alias())
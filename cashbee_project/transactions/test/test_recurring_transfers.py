@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from transactions.cron import CronSchedule
+from transactions.models import RecurringTransfer, Transaction
+from transactions.services import RecurringTransferScheduler, SendRecievePayment
+from users.models import User
+from wallet.models import SystemLimit, Wallet
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class CronScheduleTest(TestCase):
+    def test_next_after(self):
+        friday_9am = CronSchedule('0 9 * * 5')
+        # 2026-10-19 is a Monday
+        self.assertEqual(friday_9am.next_after(utc(2026, 10, 19, 12, 0)), utc(2026, 10, 23, 9, 0))
+        self.assertEqual(friday_9am.next_after(utc(2026, 10, 23, 9, 0)), utc(2026, 10, 30, 9, 0))
+        self.assertEqual(CronSchedule('*/15 * * * *').next_after(utc(2026, 10, 19, 12, 7, 30)), utc(2026, 10, 19, 12, 15))
+        self.assertEqual(CronSchedule('@monthly').next_after(utc(2026, 12, 5)), utc(2027, 1, 1))
+        self.assertEqual(CronSchedule('0 0 31 * *').next_after(utc(2026, 11, 1)), utc(2026, 12, 31))
+
+    def test_day_fields_are_or_when_both_set(self):
+        # The 1st of the month or any Sunday
+        schedule = CronSchedule('0 8 1 * 0')
+        self.assertEqual(schedule.next_after(utc(2026, 10, 19)), utc(2026, 10, 25, 8, 0))
+        self.assertEqual(schedule.next_after(utc(2026, 10, 27)), utc(2026, 11, 1, 8, 0))
+
+    def test_stepped_star_day_field_is_and(self):
+        # Mondays falling on an odd day of the month
+        schedule = CronSchedule('0 9 */2 * 1')
+        self.assertEqual(schedule.next_after(utc(2026, 10, 19, 12, 0)), utc(2026, 11, 9, 9, 0))
+
+    def test_invalid_expressions(self):
+        for expression in ('* * * *', '60 * * * *', '*/0 * * * *', 'a b c d e', '0 0 30 2 *'):
+            with self.assertRaises(ValueError):
+                CronSchedule(expression).next_after(utc(2026, 1, 1))
+
+
+class RecurringTransferSchedulerTest(TestCase):
+    def setUp(self):
+        SystemLimit.objects.all().delete()
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('1000.00'), daily_limit=Decimal('5000.00'),
+            monthly_limit=Decimal('20000.00'), is_active=True
+        )
+        self.parent = User.objects.create_user(
+            phone_number="+201000000001", first_name="Omar", last_name="Ali", password="Om@1234567"
+        )
+        self.child = User.objects.create_user(
+            phone_number="+201000000002", first_name="Mona", last_name="Omar", password="Mo@1234567"
+        )
+        Wallet.objects.filter(user=self.parent).update(balance=Decimal('120.00'))
+        self.now = timezone.now()
+        self.job = RecurringTransfer.objects.create(
+            owner=self.parent, receiver=self.child, amount=Decimal('50.00'),
+            schedule='0 9 * * 5', next_run_at=self.now - timedelta(minutes=1)
+        )
+
+    def test_due_transfer_runs_once_per_occurrence(self):
+        scheduler = RecurringTransferScheduler()
+        self.assertEqual(len(scheduler.run_batch(self.now)), 1)
+        self.assertEqual(scheduler.run_batch(self.now), [])
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.last_status, RecurringTransfer.RunStatus.SUCCESS)
+        self.assertEqual(self.job.next_run_at, CronSchedule('0 9 * * 5').next_after(self.now))
+        self.assertEqual(self.job.last_transaction.amount, Decimal('50.00'))
+        self.assertEqual(Wallet.objects.get(user=self.child).balance, Decimal('50.00'))
+
+    def test_failures_are_recorded_then_pause_the_transfer(self):
+        other = RecurringTransfer.objects.create(
+            owner=self.parent, receiver=self.child, amount=Decimal('500.00'),
+            schedule='@daily', next_run_at=self.now - timedelta(minutes=2)
+        )
+        scheduler = RecurringTransferScheduler(max_failures=2)
+        scheduler.run_batch(self.now)
+
+        other.refresh_from_db()
+        self.assertEqual(other.last_status, RecurringTransfer.RunStatus.FAILED)
+        self.assertIn("Insufficient balance", other.last_error)
+        # The failing transfer doesn't roll back the one after it
+        self.assertEqual(Transaction.objects.filter(status=Transaction.TransactionStatus.SUCCESS).count(), 1)
+
+        RecurringTransfer.objects.filter(pk=other.pk).update(next_run_at=self.now)
+        scheduler.run_batch(self.now)
+        other.refresh_from_db()
+        self.assertFalse(other.is_active)
+        self.assertEqual(other.failure_count, 2)
+
+    def test_claimed_jobs_are_leased_and_a_lost_claim_is_skipped(self):
+        stale = RecurringTransferScheduler(lease=60)
+        claims = stale.claim_batch(self.now)
+        self.assertEqual(len(claims), 1)
+        self.assertEqual(stale.claim_batch(self.now), [])
+
+        # The lease runs out and another scheduler takes the job over
+        later = self.now + timedelta(seconds=61)
+        self.assertEqual(len(RecurringTransferScheduler().run_batch(later)), 1)
+        self.assertIsNone(stale.run_job(claims[0], later))
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_api_create(self):
+        client = APIClient()
+        client.force_authenticate(user=self.parent)
+        response = client.post("/api/recurring-transfers/", {
+            "receiver_phone": "+201000000002", "amount": "25.00", "schedule": "0 9 * * 5",
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        job = RecurringTransfer.objects.get(pk=response.data["id"])
+        self.assertEqual((job.owner, job.receiver), (self.parent, self.child))
+        self.assertGreater(job.next_run_at, timezone.now())
+
+        response = client.post("/api/recurring-transfers/", {
+            "receiver_phone": "+201000000002", "amount": "25.00", "schedule": "every friday",
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecurringTransferIsolationTest(TransactionTestCase):
+    def setUp(self):
+        SystemLimit.objects.all().delete()
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('1000.00'), daily_limit=Decimal('5000.00'),
+            monthly_limit=Decimal('20000.00'), is_active=True
+        )
+        now = timezone.now()
+        self.jobs = []
+        for i in range(3):
+            payer = User.objects.create_user(
+                phone_number=f"+20100000001{i}", first_name="Payer", last_name=str(i), password="Pa@1234567"
+            )
+            receiver = User.objects.create_user(
+                phone_number=f"+20100000002{i}", first_name="Receiver", last_name=str(i), password="Re@1234567"
+            )
+            Wallet.objects.filter(user=payer).update(balance=Decimal('100.00'))
+            self.jobs.append(RecurringTransfer.objects.create(
+                owner=payer, receiver=receiver, amount=Decimal('10.00'),
+                schedule='@daily', next_run_at=now - timedelta(minutes=3 - i)
+            ))
+
+    def test_each_job_commits_and_releases_its_wallets_before_the_next(self):
+        failing_wallet = self.jobs[1].owner.wallet.pk
+        execute = SendRecievePayment.execute
+        seen = []
+
+        def checked_execute(payment):
+            # Only this job's transaction is open: earlier jobs have committed
+            # (their after-commit callbacks already ran), so their wallet locks are gone
+            seen.append((len(connection.atomic_blocks), len(connection.run_on_commit)))
+            if payment.from_wallet.pk == failing_wallet:
+                raise RuntimeError("gateway down")
+            return execute(payment)
+
+        with mock.patch.object(SendRecievePayment, 'execute', checked_execute):
+            jobs = RecurringTransferScheduler().run_batch()
+
+        self.assertEqual(seen, [(1, 0), (1, 0), (1, 0)])
+        self.assertEqual([job.last_status for job in jobs], [
+            RecurringTransfer.RunStatus.SUCCESS, RecurringTransfer.RunStatus.FAILED, RecurringTransfer.RunStatus.SUCCESS,
+        ])
+        self.assertEqual(Transaction.objects.filter(status=Transaction.TransactionStatus.SUCCESS).count(), 2)
@@ -1,20 +1,30 @@
 from django.shortcuts import render
 from rest_framework import viewsets, permissions, generics
-from .models import Transaction, CollectionRequest
-from .serializers import TransactionSerializer, CollectMoneySerializer
+from .models import Transaction, CollectionRequest, RecurringTransfer, Organization, Bill
+from .serializers import (
+    TransactionSerializer, CollectMoneySerializer, BulkCollectionActionSerializer, RecurringTransferSerializer,
+    OrganizationSerializer, BillSerializer,
+)
+from .archive import TransactionArchive
+from .services import BulkCollectionSettlement, CollectionRequestApproval
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
-from django.db import models
+from django.db import models, transaction as db_transaction
+from django.shortcuts import get_object_or_404
+from cashbee_project.db_routing import ReplicaReadMixin
+from notifications.live import publish_collection_request
+from notifications.models import OutboxEvent
+from notifications.outbox import collection_request_event, record_event
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]  
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['transaction_type', 'status', 'date']
+    filterset_fields = {'transaction_type': ['exact'], 'status': ['exact'], 'date': ['exact', 'gte', 'lte']}
     
     def get_queryset(self):
         user = self.request.user
@@ -25,6 +35,30 @@ class TransactionViewSet(viewsets.ModelViewSet):
             models.Q(from_wallet__user=user) | 
             models.Q(to_wallet__user=user)
         ).order_by('-date')
+
+    def list(self, request, *args, **kwargs):
+        """History, with ?include_archived=true adding the transactions moved to cold storage"""
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('include_archived', '').lower() not in ('1', 'true', 'yes'):
+            return response
+
+        user = request.user
+        # Same parsing as the live filters (list() already rejected invalid values)
+        filterset = DjangoFilterBackend().get_filterset(request, self.get_queryset(), self)
+        filterset.is_valid()
+        filters = filterset.form.cleaned_data
+        lower = [d for d in (filters.get('date'), filters.get('date__gte')) if d]
+        upper = [d for d in (filters.get('date'), filters.get('date__lte')) if d]
+        archived = TransactionArchive().read(
+            user_id=None if user.is_superuser else user.pk,
+            transaction_type=filters.get('transaction_type'),
+            status=filters.get('status'),
+            date_from=max(lower, default=None),
+            date_to=min(upper, default=None),
+        )
+        # Both sides use the serializer's date format, so the strings sort chronologically
+        response.data = sorted(list(response.data) + archived, key=lambda tx: tx['date'], reverse=True)
+        return response
     
     def create(self, request, *args, **kwargs):
         try:
@@ -40,8 +74,9 @@ class TransactionViewSet(viewsets.ModelViewSet):
         serializer.save(from_user=self.request.user)
 
 
-class CollectionRequestViewSet(viewsets.ModelViewSet):
+class CollectionRequestViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = CollectMoneySerializer
+    replica_actions = ('list', 'retrieve', 'received_requests', 'sent_requests')
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["from_user", "created_at", "status"]
@@ -81,70 +116,124 @@ class CollectionRequestViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['patch'], url_path='approve')
     def approve_request(self, request, pk=None):
-        collection_req = self.get_object()
-        
-        # Only recipient can approve
-        if collection_req.to_user != request.user:
-            return Response(
-                {"error": "❌ Only the recipient can approve this request"},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Check if already processed
-        if collection_req.status != CollectionRequest.Status.PENDING:
-            return Response(
-                {"error": "❌ Request already processed"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Create transaction
-        from .services import TransactionOperation
-        operation = TransactionOperation(
-            from_user=collection_req.to_user,
-            to_phone=collection_req.from_user.phone_number,
-            payment_type=Transaction.TransactionType.SEND,
-            amount=collection_req.amount
-        )
-        
-        try:
-            transaction = operation.execute_transaction()
-            collection_req.status = CollectionRequest.Status.APPROVED
-            collection_req.transaction = transaction    
-            collection_req.save()
-            
-            return Response({
-                "message": "✅ Request approved and money transferred",
-                "transaction_id": transaction.id,
-                "amount": str(transaction.amount)
-            }, status=status.HTTP_200_OK)
-        except DjangoValidationError as e:
-            return Response(
-                {"error": f"❌ {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST
+        with db_transaction.atomic():
+            # Lock the request row: a double tap waits here, then sees it approved
+            queryset = (
+                self.get_queryset()
+                .select_for_update(of=('self',))
+                .select_related('from_user__wallet', 'to_user__wallet')
             )
+            collection_req = get_object_or_404(queryset, pk=pk)
+
+            # Only recipient can approve
+            if collection_req.to_user != request.user:
+                return Response(
+                    {"error": "❌ Only the recipient can approve this request"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            # Check if already processed
+            if collection_req.status != CollectionRequest.Status.PENDING:
+                return Response(
+                    {"error": "❌ Request already processed"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            try:
+                transaction = CollectionRequestApproval(collection_req).execute()
+            except DjangoValidationError as e:
+                return Response(
+                    {"error": f"❌ {str(e)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response({
+            "message": "✅ Request approved and money transferred",
+            "transaction_id": transaction.id,
+            "amount": str(transaction.amount)
+        }, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['patch'], url_path='reject')
     def reject_request(self, request, pk=None):
-        collection_req = self.get_object()
-        
-        if collection_req.to_user != request.user:
-            return Response(
-                {"error": "❌ Only the recipient can reject this request"},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        if collection_req.status != CollectionRequest.Status.PENDING:
-            return Response(
-                {"error": "❌ Request already processed"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        collection_req.status = CollectionRequest.Status.REJECTED
-        collection_req.save()
-        
+        with db_transaction.atomic():
+            # Same lock as approve_request: a concurrent approval either
+            # finished first (and the request is no longer pending) or waits
+            queryset = self.get_queryset().select_for_update(of=('self',))
+            collection_req = get_object_or_404(queryset, pk=pk)
+
+            if collection_req.to_user != request.user:
+                return Response(
+                    {"error": "❌ Only the recipient can reject this request"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            if collection_req.status != CollectionRequest.Status.PENDING:
+                return Response(
+                    {"error": "❌ Request already processed"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            collection_req.status = CollectionRequest.Status.REJECTED
+            collection_req.save(update_fields=['status', 'updated_at'])
+            record_event(*collection_request_event(OutboxEvent.EventType.COLLECTION_REQUEST_REJECTED, collection_req))
+            publish_collection_request(collection_req, collection_req.from_user_id)
+
         return Response({
             "message": "✅ Request rejected"
         }, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_process(self, request):
+        """Approve or reject several received requests at once, with one result per id"""
+        serializer = BulkCollectionActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        settlement = BulkCollectionSettlement(request.user, serializer.validated_data["ids"])
+        try:
+            if serializer.validated_data["action"] == "approve":
+                results = settlement.approve()
+            else:
+                results = settlement.reject()
+        except DjangoValidationError as e:
+            return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+        succeeded = sum(1 for result in results if result["status"] != "error")
+        return Response({
+            "message": f"✅ {succeeded} of {len(results)} requests processed",
+            "results": results
+        }, status=status.HTTP_200_OK)
+
+    def perform_create(self, serializer):
+        serializer.save(from_user=self.request.user)
+
+
+class RecurringTransferViewSet(viewsets.ModelViewSet):
+    """Scheduled transfers paid by the current user"""
+    serializer_class = RecurringTransferSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return RecurringTransfer.objects.filter(owner=self.request.user).select_related('receiver')
+
     def perform_create(self, serializer):
-        serializer.save(from_user=self.request.user)
\ No newline at end of file
+        serializer.save(owner=self.request.user)
+
+
+class OrganizationViewSet(viewsets.ReadOnlyModelViewSet):
+    """Charities and billers accepting payments"""
+    serializer_class = OrganizationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['org_type', 'category']
+    queryset = Organization.objects.filter(is_active=True)
+
+
+class BillViewSet(viewsets.ReadOnlyModelViewSet):
+    """Bills of the current user, paid with POST /api/transactions/ (transaction_type "Bill Pay")"""
+    serializer_class = BillSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'organization']
+
+    def get_queryset(self):
+        return Bill.objects.filter(customer=self.request.user).select_related('organization')
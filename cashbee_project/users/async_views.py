@@ -0,0 +1,37 @@
+"""
+Async read endpoints served under /api/async/ by the ASGI deployment
+(gunicorn_asgi.conf.py).
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from .authentication import async_token_required
+from .models import User, UsersRole, Family
+from .serializers import UserSerializer, ChildSerializer
+
+
+@require_GET
+@async_token_required
+async def family_members(request, pk):
+    """Async version of FamilyViewSet.family_members, one query for all members"""
+    user = request.user
+    if not user.is_superuser and user.family_id != pk:
+        return JsonResponse({"detail": "No Family matches the given query."}, status=404)
+
+    try:
+        family = await Family.objects.aget(pk=pk)
+    except Family.DoesNotExist:
+        return JsonResponse({"detail": "No Family matches the given query."}, status=404)
+
+    members = [m async for m in User.objects.filter(family=family).select_related('wallet', 'family')]
+    parents = [m for m in members if m.role == UsersRole.PARENT]
+    children = [m for m in members if m.role == UsersRole.CHILD]
+
+    return JsonResponse({
+        "family": {
+            "id": family.id,
+            "name": family.name
+        },
+        "total_members": len(members),
+        "parents": UserSerializer(parents, many=True).data,
+        "children": ChildSerializer(children, many=True).data,
+    })
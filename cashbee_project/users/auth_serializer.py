@@ -1,8 +1,13 @@
 from .models import User, UsersRole
-from rest_framework import serializers
+from rest_framework import serializers, exceptions
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from datetime import timedelta
 from .validations import *  
+from .hashing import hash_password, verify_password
+from .throttling import get_throttle_settings, get_client_ip, ip_attempts, normalize_phone, phone_failures
 
 class SignupSerializer(serializers.ModelSerializer):
     class Meta:
@@ -47,10 +52,10 @@ class SignupSerializer(serializers.ModelSerializer):
         return value
     
     def create(self, validated_data):
-        # Use create_user to properly hash password
+        # Hash in the hashing pool (or inline when disabled), then create the user
         user = User.objects.create_user(
             username=None,  # Will be auto-generated
-            password=validated_data.pop('password'),
+            encoded_password=hash_password(validated_data.pop('password')),
             **validated_data
         )
         return user
@@ -62,21 +67,60 @@ class LoginSerializer(serializers.Serializer):
 
     def validate(self, data):
         """Validate login credentials"""
-        phone = data.get("phone_number")
+        phone = normalize_phone(data.get("phone_number"))
         password = data.get("password")
+        conf = get_throttle_settings()
+
+        # Cheap in-memory checks first: no DB hit, no password hashing
+        ip = get_client_ip(self.context.get("request"))
+        if ip:
+            wait = ip_attempts.retry_after(ip, conf['IP_LIMIT'], conf['IP_WINDOW'])
+            if wait:
+                raise exceptions.Throttled(wait, detail="❌ Too many login attempts from this address")
+            ip_attempts.hit(ip, conf['IP_WINDOW'])
+
+        wait = phone_failures.retry_after(phone, conf['PHONE_LIMIT'], conf['PHONE_WINDOW'])
+        if wait:
+            raise exceptions.Throttled(wait, detail="❌ Too many failed login attempts")
 
         try:
             user = User.objects.get(phone_number=phone)
         except User.DoesNotExist:
+            phone_failures.hit(phone, conf['PHONE_WINDOW'])
             raise serializers.ValidationError({"error": "❌ Phone number not found"})
 
-        if not user.check_password(password):
+        # Persisted lockout, shared by all workers
+        now = timezone.now()
+        if user.lock_time and user.lock_time > now:
+            wait = int((user.lock_time - now).total_seconds()) + 1
+            raise exceptions.Throttled(wait, detail="❌ Account is temporarily locked")
+
+        if not verify_password(user, password):
+            self.register_failure(user, phone, conf, now)
             raise serializers.ValidationError({"error": "❌ Incorrect password"})
     
         if not user.is_active:
             raise serializers.ValidationError({"error": "❌ Account isn't active"})
 
+        if user.failed_attempts or user.lock_time:
+            User.objects.filter(pk=user.pk).update(failed_attempts=0, lock_time=None)
+        phone_failures.reset(phone)
+
         token, _ = Token.objects.get_or_create(user=user)
         data["token"] = token.key
         data["user"] = user
-        return data
\ No newline at end of file
+        return data
+
+    @staticmethod
+    def register_failure(user, phone, conf, now):
+        """Count a failed password and lock the account after too many in a row"""
+        phone_failures.hit(phone, conf['PHONE_WINDOW'])
+        with db_transaction.atomic():
+            # Counted from the locked row, not the user read earlier: concurrent
+            # wrong passwords are all counted
+            users = User.objects.select_for_update().filter(pk=user.pk)
+            failed_attempts = users.values_list('failed_attempts', flat=True).get() + 1
+            if failed_attempts >= conf['MAX_FAILED_ATTEMPTS']:
+                users.update(failed_attempts=0, lock_time=now + timedelta(seconds=conf['LOCKOUT']))
+            else:
+                users.update(failed_attempts=failed_attempts)
@@ -0,0 +1,266 @@
+"""
+Token authentication with a per-worker token -> user cache.
+
+DRF's TokenAuthentication joins Token and User on every API call. Here the
+user is kept in a bounded LRU with a TTL so most requests never hit the
+database. With TOKEN_AUTH_CACHE['SHARED_CACHE'] set to a Django cache alias,
+workers also share cached users and invalidations.
+``aauthenticate`` / ``async_token_required`` do the same for the plain async
+views served under ASGI.
+"""
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+DEFAULTS = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'SHARED_CACHE': None,
+}
+
+
+def get_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_AUTH_CACHE', {})}
+
+
+class TokenUserCache:
+    """Bounded LRU of token key -> user, entries expire after ``ttl`` seconds"""
+
+    def __init__(self, max_size=DEFAULTS['MAX_SIZE'], ttl=DEFAULTS['TTL']):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (user, expires_at, generation)
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, user, generation=0):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (user, time.monotonic() + self.ttl, generation)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key):
+        user, _, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(user.pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user.pk]
+
+
+_local_cache = None
+_local_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _local_cache
+    if _local_cache is None:
+        with _local_cache_lock:
+            if _local_cache is None:
+                conf = get_cache_settings()
+                _local_cache = TokenUserCache(conf['MAX_SIZE'], conf['TTL'])
+    return _local_cache
+
+
+def get_shared_cache():
+    alias = get_cache_settings()['SHARED_CACHE']
+    return caches[alias] if alias else None
+
+
+def _token_key(key):
+    return f"auth:token:{key}"
+
+
+def _generation_key(user_id):
+    return f"auth:user-gen:{user_id}"
+
+
+def invalidate_user_tokens(user_id):
+    """
+    Drop cached authentication for a user (deactivation, password change).
+    Other workers see it through the shared generation counter, or after TTL
+    when no shared cache is configured.
+    """
+    get_token_cache().invalidate_user(user_id)
+    shared = get_shared_cache()
+    if shared is not None:
+        gen_key = _generation_key(user_id)
+        shared.add(gen_key, 0, timeout=None)
+        try:
+            shared.incr(gen_key)
+        except ValueError:
+            shared.set(gen_key, 1, timeout=None)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in replacement for TokenAuthentication backed by TokenUserCache"""
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        shared = get_shared_cache()
+        conf = get_cache_settings()
+
+        entry = cache.get(key)
+        if entry is not None and shared is not None:
+            user, _, generation = entry
+            if shared.get(_generation_key(user.pk), 0) != generation:
+                cache.invalidate_user(user.pk)
+                entry = None
+
+        if entry is None:
+            user, generation = self._load(key, shared, conf['TTL'])
+            cache.set(key, user, generation)
+        else:
+            user = entry[0]
+
+        return self._checked_copy(key, user)
+
+    async def aauthenticate(self, request):
+        """Async counterpart of authenticate() for plain Django async views"""
+        key = self._get_key(request)
+        if key is None:
+            return None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cache = get_token_cache()
+        shared = get_shared_cache()
+        conf = get_cache_settings()
+
+        entry = cache.get(key)
+        if entry is not None and shared is not None:
+            user, _, generation = entry
+            if await shared.aget(_generation_key(user.pk), 0) != generation:
+                cache.invalidate_user(user.pk)
+                entry = None
+
+        if entry is None:
+            user, generation = await self._aload(key, shared, conf['TTL'])
+            cache.set(key, user, generation)
+        else:
+            user = entry[0]
+
+        return self._checked_copy(key, user)
+
+    def _get_key(self, request):
+        # Same header parsing as TokenAuthentication.authenticate()
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain invalid characters.')
+
+    def _checked_copy(self, key, user):
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+        # Every request gets its own copy, so related objects cached on it
+        # (wallet, family...) never leak into the next request
+        user = copy.copy(user)
+        return (user, Token(key=key, user=user))
+
+    def _load(self, key, shared, ttl):
+        if shared is not None:
+            cached = shared.get(_token_key(key))
+            if cached is not None:
+                user, generation = cached
+                if shared.get(_generation_key(user.pk), 0) == generation:
+                    return user, generation
+
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        user = token.user
+        user._state.fields_cache = {}
+        generation = 0
+        if shared is not None:
+            generation = shared.get(_generation_key(user.pk), 0)
+            shared.set(_token_key(key), (user, generation), timeout=ttl)
+        return user, generation
+
+    async def _aload(self, key, shared, ttl):
+        if shared is not None:
+            cached = await shared.aget(_token_key(key))
+            if cached is not None:
+                user, generation = cached
+                if await shared.aget(_generation_key(user.pk), 0) == generation:
+                    return user, generation
+
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        user = token.user
+        user._state.fields_cache = {}
+        generation = 0
+        if shared is not None:
+            generation = await shared.aget(_generation_key(user.pk), 0)
+            await shared.aset(_token_key(key), (user, generation), timeout=ttl)
+        return user, generation
+
+
+def async_token_required(view):
+    """
+    Authenticate an async view with CachedTokenAuthentication and set
+    request.user. Errors use DRF's {"detail": ...} body and status codes.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        authenticator = CachedTokenAuthentication()
+        try:
+            result = await authenticator.aauthenticate(request)
+        except exceptions.AuthenticationFailed as e:
+            result, error = None, e.detail
+        else:
+            error = exceptions.NotAuthenticated.default_detail
+        if result is None:
+            response = JsonResponse({"detail": str(error)}, status=401)
+            response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+            return response
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+    return wrapper
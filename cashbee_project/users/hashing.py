@@ -0,0 +1,143 @@
+"""
+Bounded worker pool for password hashing.
+
+PBKDF2 in the request thread pins a gunicorn worker for the whole hash.
+With PASSWORD_HASHING['ENABLED'] the hashing runs in a process pool instead;
+at most MAX_PENDING hashes are queued per worker and further requests get a
+503 with Retry-After rather than piling up. When disabled (the default for
+development and tests) everything runs inline.
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, check_password, get_hasher, identify_hasher, make_password,
+)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DEFAULTS = {
+    'ENABLED': False,
+    'WORKERS': 2,        # hashing processes per gunicorn worker
+    'MAX_PENDING': 16,   # queued + running hashes before answering 503
+    'TIMEOUT': 5,        # seconds to wait for a hash result
+    'RETRY_AFTER': 1,
+}
+
+
+def get_hashing_settings():
+    return {**DEFAULTS, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+class FastArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id tuned for login throughput (OWASP minimum: 19 MiB, t=2, p=1)
+    instead of Django's 100 MiB / p=8 defaults. Needs argon2-cffi.
+    Hashes keep the "argon2" algorithm name, so they stay verifiable with
+    the stock hasher and are rehashed if the parameters change.
+    """
+    time_cost = 2
+    memory_cost = 19456
+    parallelism = 1
+
+
+class HashingPoolBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "❌ Server is busy, please try again shortly"
+    default_code = 'hashing_pool_busy'
+
+    def __init__(self, wait=None, detail=None):
+        super().__init__(detail)
+        # DRF's exception handler turns `wait` into a Retry-After header
+        self.wait = wait
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _verify(raw_password, encoded):
+    """Runs in the pool: check the password and tell if it needs a rehash"""
+    if not check_password(raw_password, encoded):
+        return False, None
+    hasher = identify_hasher(encoded)
+    preferred = get_hasher('default')
+    if hasher.algorithm != preferred.algorithm or hasher.must_update(encoded):
+        return True, make_password(raw_password)
+    return True, None
+
+
+def _hash(raw_password):
+    return make_password(raw_password)
+
+
+class PasswordHashingPool:
+    def __init__(self, workers, max_pending, timeout, retry_after):
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy(wait=self.retry_after)
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingPoolBusy(wait=self.retry_after)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool for this process, None when hashing runs inline"""
+    global _pool
+    conf = get_hashing_settings()
+    if not conf['ENABLED']:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHashingPool(conf['WORKERS'], conf['MAX_PENDING'], conf['TIMEOUT'], conf['RETRY_AFTER'])
+    return _pool
+
+
+def hash_password(raw_password):
+    """make_password() through the pool"""
+    pool = get_pool()
+    if pool is None:
+        return make_password(raw_password)
+    return pool.submit(_hash, raw_password)
+
+
+def verify_password(user, raw_password):
+    """
+    user.check_password() through the pool. Like Django, a valid password
+    stored with an outdated hasher (e.g. PBKDF2 once Argon2 is preferred)
+    is transparently rehashed.
+    """
+    pool = get_pool()
+    if pool is None:
+        return user.check_password(raw_password)
+
+    valid, new_encoded = pool.submit(_verify, raw_password, user.password)
+    if valid and new_encoded:
+        user.password = new_encoded
+        user._password = None
+        user.save(update_fields=['password'])
+    return valid
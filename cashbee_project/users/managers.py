@@ -48,12 +48,18 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault('is_superuser', False)
         extra_fields.setdefault('is_active', True)
         
+        # Password already hashed elsewhere (e.g. in the hashing pool)
+        encoded_password = extra_fields.pop('encoded_password', None)
+        
         user = self.model(
             username=username,
             phone_number=phone_number,
             **extra_fields
         )
-        user.set_password(password)
+        if encoded_password:
+            user.password = encoded_password
+        else:
+            user.set_password(password)
         user.save(using=self._db, skip_validation=True)
         return user
     
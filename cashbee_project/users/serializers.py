@@ -107,6 +107,9 @@ class FamilySerializer(serializers.ModelSerializer):
     
     def get_members_count(self, obj):
         """Get number of family members"""
+        # Annotated by FamilyViewSet.get_queryset, no query per family
+        if hasattr(obj, 'members_total'):
+            return obj.members_total
         return obj.get_members_count()
     
     def validate_name(self, value):
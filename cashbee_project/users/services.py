@@ -1,4 +1,5 @@
 from django.db import IntegrityError
+from django.db.models import Q
 from .models import User, Family, UsersRole
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
@@ -41,9 +42,10 @@ class RoleManager:
 
 class FamilyFacade:
 
-    def __init__(self, user: User):
+    def __init__(self, user: User = None, family: Family = None):
         self.user = user
-        self.family = user.family
+        self.family = family if family is not None else user.family
+        self._members = None
 
     def create_family(self, fname):
         family = Family.objects.create(name=fname)
@@ -76,27 +78,130 @@ class FamilyFacade:
         
         return child
     
+    def get_members(self):
+        """
+        Every member with its wallet in one query, split by role in Python.
+        Returns (members, parents, children).
+        """
+        if self._members is None:
+            members = list(User.objects.filter(family=self.family).select_related('wallet').order_by('id'))
+            for member in members:
+                member.family = self.family
+            self._members = (
+                members,
+                [m for m in members if m.role == UsersRole.PARENT],
+                [m for m in members if m.role == UsersRole.CHILD],
+            )
+        return self._members
+
     def get_family_details(self):
         """Get formatted family details"""
         if not self.family:
             return "User is not part of any family"
-        
-        members = User.objects.filter(family=self.family)
-        result = f"Family: {self.family.name}\n"
-        result += f"Total Members: {members.count()}\n\n"
-        
-        # List parents
-        parents = members.filter(role=UsersRole.PARENT)
-        if parents.exists():
-            result += "Parents:\n"
-            for parent in parents:
-                result += f"  - {parent.name} ({parent.phone_number})\n"
-        
-        # List children
-        children = members.filter(role=UsersRole.CHILD)
-        if children.exists():
-            result += "\nChildren:\n"
-            for child in children:
-                result += f"  - {child.name} ({child.phone_number})\n"
-        
-        return result
\ No newline at end of file
+
+        members, parents, children = self.get_members()
+        lines = [f"Family: {self.family.name}", f"Total Members: {len(members)}", ""]
+        if parents:
+            lines.append("Parents:")
+            lines.extend(f"  - {parent.name} ({parent.phone_number})" for parent in parents)
+        if children:
+            lines.extend(["", "Children:"])
+            lines.extend(f"  - {child.name} ({child.phone_number})" for child in children)
+        return "\n".join(lines) + "\n"
+
+
+class FamilyDashboard:
+    """
+    Balances, spend against limits and recent activity for every member of a
+    family. Spend comes from the wallet rollups (wallet.rollups), so the whole
+    dashboard takes the same few queries however large the family is.
+    """
+    RECENT_ACTIVITY = 10
+    LIMIT_FIELDS = (
+        ('per_transaction', 'per_transaction_limit'),
+        ('daily', 'daily_limit'),
+        ('monthly', 'monthly_limit'),
+    )
+
+    def __init__(self, family: Family, today=None):
+        self.family = family
+        self.today = today
+
+    def effective_limits(self, member, system_limit):
+        """Most restrictive of the System, Family and Personal limits, or None when there are none"""
+        sources = [system_limit]
+        if member.role == UsersRole.CHILD:
+            sources.append(getattr(member, 'family_limit', None))
+        sources.append(getattr(member, 'personal_limit', None))
+        sources = [limit for limit in sources if limit is not None and limit.is_active]
+        if not sources:
+            return None
+        return {
+            key: min(getattr(limit, field) for limit in sources)
+            for key, field in self.LIMIT_FIELDS
+        }
+
+    def recent_activity(self, wallet_ids):
+        from transactions.models import Transaction
+
+        rows = Transaction.objects.filter(
+            Q(from_wallet_id__in=wallet_ids) | Q(to_wallet_id__in=wallet_ids)
+        ).order_by('-date').values(
+            'id', 'amount', 'transaction_type', 'status', 'date',
+            'from_wallet__user_id', 'to_wallet__user_id',
+        )[:self.RECENT_ACTIVITY]
+        return [{
+            'id': row['id'],
+            'amount': str(row['amount']),
+            'transaction_type': row['transaction_type'],
+            'status': row['status'],
+            'date': row['date'].isoformat(),
+            'from_user_id': row['from_wallet__user_id'],
+            'to_user_id': row['to_wallet__user_id'],
+        } for row in rows]
+
+    def build(self):
+        from wallet.models import SystemLimit
+        from wallet.rollups import ZERO, spend_summary
+
+        members = list(
+            User.objects.filter(family=self.family)
+            .select_related('wallet', 'family_limit', 'personal_limit')
+            .order_by('role', 'id')
+        )
+        wallets = {member.pk: getattr(member, 'wallet', None) for member in members}
+        wallet_ids = [wallet.pk for wallet in wallets.values() if wallet is not None]
+        system_limit = SystemLimit.objects.filter(is_active=True).first()
+        spend = spend_summary(wallet_ids, today=self.today)
+
+        totals = {'balance': ZERO, 'spent_today': ZERO, 'spent_this_month': ZERO}
+        rows = []
+        for member in members:
+            wallet = wallets[member.pk]
+            balance = wallet.balance if wallet else ZERO
+            spent = spend[wallet.pk] if wallet else {'today': ZERO, 'month': ZERO}
+            limits = self.effective_limits(member, system_limit)
+
+            totals['balance'] += balance
+            totals['spent_today'] += spent['today']
+            totals['spent_this_month'] += spent['month']
+            rows.append({
+                'id': member.pk,
+                'name': member.name,
+                'phone_number': str(member.phone_number),
+                'role': member.role,
+                'balance': str(balance),
+                'spent_today': str(spent['today']),
+                'spent_this_month': str(spent['month']),
+                'limits': {key: str(value) for key, value in limits.items()} if limits else None,
+                'remaining_today': str(max(limits['daily'] - spent['today'], ZERO)) if limits else None,
+                'remaining_this_month': str(max(limits['monthly'] - spent['month'], ZERO)) if limits else None,
+            })
+
+        return {
+            'family': {'id': self.family.id, 'name': self.family.name},
+            'total_members': len(members),
+            'totals': {key: str(value) for key, value in totals.items()},
+            'members': rows,
+            'recent_activity': self.recent_activity(wallet_ids),
+        }
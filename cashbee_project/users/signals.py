@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from functools import partial
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import User
 from rest_framework.authtoken.models import Token
+from .authentication import invalidate_user_tokens
 
 @receiver(post_save, sender=User)
 def create_user_dependencies(sender, instance, created, **kwargs):
@@ -16,3 +19,17 @@ def create_user_dependencies(sender, instance, created, **kwargs):
             Wallet.objects.get_or_create(user=instance, defaults={'balance': 0})  # ✅ FIXED
         except ImportError:
             pass  # Wallet app not installed
+
+@receiver(post_save, sender=User)
+def refresh_cached_authentication(sender, instance, created, **kwargs):
+    """Cached token -> user entries must not outlive deactivation or a password change"""
+    if not created:
+        # After commit: a request racing the open transaction would otherwise
+        # cache the old state again for the whole TTL
+        db_transaction.on_commit(partial(invalidate_user_tokens, instance.pk))
+
+
+@receiver(post_delete, sender=Token)
+def revoke_cached_token(sender, instance, **kwargs):
+    """A deleted token (logout, admin revocation) is rejected right away, not after TTL"""
+    db_transaction.on_commit(partial(invalidate_user_tokens, instance.user_id))
@@ -0,0 +1,150 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.authentication import CachedTokenAuthentication, TokenUserCache, get_token_cache
+from users.models import User
+
+
+class TokenUserCacheTest(TestCase):
+    def setUp(self):
+        self.user1 = User(pk=1, username='one')
+        self.user2 = User(pk=2, username='two')
+
+    def test_lru_eviction(self):
+        cache = TokenUserCache(max_size=2, ttl=60)
+        cache.set('a', self.user1)
+        cache.set('b', self.user2)
+        cache.get('a')
+        cache.set('c', self.user2)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl_expiry(self):
+        cache = TokenUserCache(max_size=10, ttl=-1)
+        cache.set('a', self.user1)
+        self.assertIsNone(cache.get('a'))
+
+    def test_invalidate_user(self):
+        cache = TokenUserCache()
+        cache.set('a', self.user1)
+        cache.set('b', self.user1)
+        cache.set('c', self.user2)
+        cache.invalidate_user(1)
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.admin = User.objects.create_superuser(
+            phone_number="+201000000010",
+            first_name="Admin",
+            last_name="User",
+            password="Ad@1234567"
+        )
+        self.user = User.objects.create_user(
+            phone_number="+201000000011",
+            first_name="Sondos",
+            last_name="Ali",
+            password="So@1234567"
+        )
+        self.token = Token.objects.get(user=self.user).key
+        self.auth = CachedTokenAuthentication()
+
+    def test_cached_authentication_skips_database(self):
+        with self.assertNumQueries(1):
+            user, _ = self.auth.authenticate_credentials(self.token)
+        with self.assertNumQueries(0):
+            cached_user, token = self.auth.authenticate_credentials(self.token)
+        self.assertEqual(cached_user.pk, self.user.pk)
+        self.assertEqual(token.key, self.token)
+        self.assertIsNot(cached_user, user)
+
+    def test_invalid_token(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials('not-a-token')
+
+    def test_admin_deactivation_invalidates_cache(self):
+        self.auth.authenticate_credentials(self.token)
+
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.delete(f"/api/users/{self.user.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token)
+
+    def test_password_change_invalidates_cache(self):
+        self.auth.authenticate_credentials(self.token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password("New@1234567")
+            self.user.save(update_fields=['password'])
+
+        with self.assertNumQueries(1):
+            user, _ = self.auth.authenticate_credentials(self.token)
+        self.assertTrue(user.check_password("New@1234567"))
+
+    def test_deleted_token_is_rejected_immediately(self):
+        self.auth.authenticate_credentials(self.token)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Token.objects.filter(key=self.token).delete()
+        # Not before the delete commits, a concurrent request could cache it again
+        self.assertEqual(len(get_token_cache()), 1)
+        for callback in callbacks:
+            callback()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token)
+
+    def test_token_header_authenticates_requests(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        response = client.get("/api/users/profile/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.user.pk)
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auth-tests'},
+    },
+    TOKEN_AUTH_CACHE={'SHARED_CACHE': 'auth'},
+)
+class SharedCacheAuthenticationTest(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        caches['auth'].clear()
+        self.user = User.objects.create_user(
+            phone_number="+201000000012",
+            first_name="Nada",
+            last_name="Hassan",
+            password="Na@1234567"
+        )
+        self.token = Token.objects.get(user=self.user).key
+        self.auth = CachedTokenAuthentication()
+
+    def test_other_worker_uses_shared_cache(self):
+        self.auth.authenticate_credentials(self.token)
+        get_token_cache().clear()  # a worker with a cold local cache
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate_credentials(self.token)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_invalidation_reaches_other_workers(self):
+        self.auth.authenticate_credentials(self.token)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        from users.authentication import invalidate_user_tokens
+        invalidate_user_tokens(self.user.pk)
+        # The local entry of another worker is still there, its generation is stale
+        get_token_cache().set(self.token, self.user, 0)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token)
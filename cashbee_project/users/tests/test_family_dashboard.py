@@ -0,0 +1,110 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from transactions.models import Transaction
+from users.models import Family, User, UsersRole
+from wallet.models import DailySpend, FamilyLimit, SystemLimit, Wallet
+from wallet.rollups import refresh_spend_rollups, spend_summary
+
+
+def start_of_today():
+    return datetime.combine(timezone.localdate(), time(0, 0, 1), tzinfo=timezone.get_current_timezone())
+
+
+class FamilyDashboardTest(TestCase):
+    def setUp(self):
+        self.family = Family.objects.create(name="Mansour")
+        self.parent = self.member("+201000000001", "Sondos", UsersRole.PARENT)
+        self.son = self.member("+201000000002", "Omar", UsersRole.CHILD)
+        self.shop = User.objects.create_user(
+            phone_number="+201000000099", first_name="Corner", last_name="Shop", password="Sh@1234567"
+        )
+        SystemLimit.objects.create(
+            per_transaction_limit=Decimal('5000.00'), daily_limit=Decimal('10000.00'), monthly_limit=Decimal('50000.00')
+        )
+        FamilyLimit.objects.create(
+            parent=self.parent, child=self.son, per_transaction_limit=Decimal('100.00'),
+            daily_limit=Decimal('200.00'), monthly_limit=Decimal('1000.00'),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.parent)
+
+    def member(self, phone, first_name, role):
+        user = User.objects.create_user(
+            phone_number=phone, first_name=first_name, last_name="Mansour", password="Pa@1234567",
+            role=role, family=self.family,
+        )
+        Wallet.objects.filter(user=user).update(balance=Decimal('500.00'))
+        return user
+
+    def spend(self, user, amount, date=None):
+        tx = Transaction.objects.create(
+            from_wallet=user.wallet, to_wallet=self.shop.wallet, amount=amount,
+            transaction_type=Transaction.TransactionType.SEND, status=Transaction.TransactionStatus.SUCCESS,
+            from_wallet_balance_before=Decimal('500.00'), to_wallet_balance_before=Decimal('0.00'),
+        )
+        Transaction.objects.filter(pk=tx.pk).update(date=date or start_of_today())
+        return tx
+
+    def test_rollups_plus_tail_give_exact_spend(self):
+        wallet_id = self.son.wallet.pk
+        self.spend(self.son, Decimal('30.00'))
+        self.spend(self.son, Decimal('20.00'))
+        self.spend(self.son, Decimal('70.00'), date=start_of_today() - timedelta(days=40))
+
+        self.assertEqual(refresh_spend_rollups(lag=timedelta(0)), 3)
+        self.assertEqual(DailySpend.objects.get(wallet_id=wallet_id, day=timezone.localdate()).amount, Decimal('50.00'))
+
+        # Not rolled up yet, still counted
+        self.spend(self.son, Decimal('5.00'))
+        with self.assertNumQueries(1):
+            summary = spend_summary([wallet_id])
+        self.assertEqual(summary[wallet_id], {'today': Decimal('55.00'), 'month': Decimal('55.00')})
+
+        refresh_spend_rollups(lag=timedelta(0))
+        today = DailySpend.objects.get(wallet_id=wallet_id, day=timezone.localdate())
+        self.assertEqual((today.amount, today.transactions_count), (Decimal('55.00'), 3))
+        self.assertEqual(spend_summary([wallet_id])[wallet_id]['today'], Decimal('55.00'))
+        self.assertEqual(refresh_spend_rollups(lag=timedelta(0)), 0)
+
+    def test_dashboard_reports_spend_against_family_limit(self):
+        self.spend(self.son, Decimal('150.00'))
+        refresh_spend_rollups(lag=timedelta(0))
+        self.spend(self.parent, Decimal('40.00'))
+
+        response = self.client.get(f"/api/families/{self.family.pk}/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        members = {m['id']: m for m in response.data['members']}
+        son = members[self.son.pk]
+        self.assertEqual((son['spent_today'], son['remaining_today']), ('150.00', '50.00'))
+        self.assertEqual(son['limits']['daily'], '200.00')
+        self.assertEqual(members[self.parent.pk]['limits']['daily'], '10000.00')
+        self.assertEqual(response.data['totals']['spent_today'], '190.00')
+        self.assertEqual(len(response.data['recent_activity']), 2)
+
+    def test_children_cannot_view_dashboard(self):
+        self.client.force_authenticate(user=self.son)
+        response = self.client.get(f"/api/families/{self.family.pk}/dashboard/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_query_count_does_not_grow_with_family_size(self):
+        url = f"/api/families/{self.family.pk}/dashboard/"
+        self.spend(self.son, Decimal('10.00'))
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+
+        for i in range(5):
+            child = self.member(f"+20100000010{i}", f"Kid{i}", UsersRole.CHILD)
+            self.spend(child, Decimal('10.00'))
+        refresh_spend_rollups(lag=timedelta(0))
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+
+        self.assertEqual(response.data['total_members'], 7)
+        self.assertEqual(len(large), len(small))
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.hashing import HashingPoolBusy, PasswordHashingPool, _verify
+from users.models import User
+from users.throttling import ip_attempts, phone_failures
+
+
+class BusyPool:
+    def submit(self, fn, *args):
+        raise HashingPoolBusy(wait=3)
+
+
+class PasswordHashingTest(TestCase):
+    def setUp(self):
+        ip_attempts.clear()
+        phone_failures.clear()
+        self.client = APIClient()
+
+    def test_create_user_with_encoded_password(self):
+        encoded = make_password("So@1234567")
+        user = User.objects.create_user(
+            phone_number="+201000000002",
+            first_name="Sondos",
+            last_name="Ali",
+            encoded_password=encoded,
+        )
+        self.assertEqual(user.password, encoded)
+        self.assertTrue(user.check_password("So@1234567"))
+
+    def test_verify_flags_outdated_hashes(self):
+        valid, new_encoded = _verify("So@1234567", make_password("So@1234567", hasher='pbkdf2_sha1'))
+        self.assertTrue(valid)
+        self.assertTrue(new_encoded.startswith('pbkdf2_sha256$'))
+
+        self.assertEqual(_verify("wrong", make_password("So@1234567")), (False, None))
+
+    def test_saturated_pool_returns_503(self):
+        User.objects.create_user(
+            phone_number="+201000000001",
+            first_name="Sondos",
+            last_name="Ali",
+            password="So@1234567"
+        )
+        with patch('users.hashing.get_pool', return_value=BusyPool()):
+            response = self.client.post(
+                "/api/login/", {"phone_number": "+201000000001", "password": "So@1234567"}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "3")
+
+    def test_pool_rejects_beyond_max_pending(self):
+        pool = PasswordHashingPool(workers=1, max_pending=1, timeout=5, retry_after=1)
+        try:
+            pool._slots.acquire()
+            with self.assertRaises(HashingPoolBusy):
+                pool.submit(_verify, "x", "y")
+        finally:
+            pool.shutdown()
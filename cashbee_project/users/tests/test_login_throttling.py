@@ -0,0 +1,116 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from users.auth_serializer import LoginSerializer
+from users.throttling import SlidingWindowCounter, get_throttle_settings, ip_attempts, phone_failures
+
+THROTTLE = {
+    'IP_LIMIT': 10,
+    'IP_WINDOW': 60,
+    'PHONE_LIMIT': 3,
+    'PHONE_WINDOW': 300,
+    'MAX_FAILED_ATTEMPTS': 3,
+    'LOCKOUT': 900,
+}
+
+
+@override_settings(LOGIN_THROTTLE=THROTTLE)
+class LoginThrottlingTest(TestCase):
+    def setUp(self):
+        ip_attempts.clear()
+        phone_failures.clear()
+        self.user = User.objects.create_user(
+            phone_number="+201000000001",
+            first_name="Sondos",
+            last_name="Ali",
+            password="So@1234567"
+        )
+        self.client = APIClient()
+        self.url = "/api/login/"
+
+    def login(self, password, phone="+201000000001"):
+        return self.client.post(self.url, {"phone_number": phone, "password": password}, format="json")
+
+    def test_successful_login_resets_failures(self):
+        self.login("wrong")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_attempts, 1)
+
+        response = self.login("So@1234567")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_attempts, 0)
+
+    def test_account_locked_after_max_failures(self):
+        for _ in range(3):
+            self.assertEqual(self.login("wrong").status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.lock_time)
+        self.assertGreater(self.user.lock_time, timezone.now())
+
+        response = self.login("So@1234567")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+
+    def test_persisted_lock_skips_password_check(self):
+        # Lock set by another worker: no in-memory state here
+        User.objects.filter(pk=self.user.pk).update(lock_time=timezone.now() + timedelta(minutes=5))
+
+        with patch.object(User, "check_password") as check_password:
+            response = self.login("So@1234567")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        check_password.assert_not_called()
+
+    def test_expired_lock_allows_login(self):
+        User.objects.filter(pk=self.user.pk).update(lock_time=timezone.now() - timedelta(minutes=1))
+        response = self.login("So@1234567")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.lock_time)
+
+    def test_phone_window_rejects_before_database(self):
+        for _ in range(3):
+            self.login("wrong", phone="+201099999999")
+
+        with self.assertNumQueries(0):
+            response = self.login("wrong", phone="+201099999999")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_ip_window_rejects_before_database(self):
+        for i in range(10):
+            self.login("wrong", phone=f"+20109999990{i}")
+
+        with self.assertNumQueries(0):
+            response = self.login("So@1234567")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_failures_are_counted_from_the_database(self):
+        # Another worker counted two failures since this user was read
+        stale = User.objects.get(pk=self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(failed_attempts=2)
+
+        LoginSerializer.register_failure(stale, "+201000000001", get_throttle_settings(), timezone.now())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_attempts, 0)
+        self.assertIsNotNone(self.user.lock_time)
+
+    def test_reformatted_phone_shares_the_window(self):
+        for phone in ("+201099999999", "+20 109 999 9999", "+20-109-999-9999"):
+            self.login("wrong", phone=phone)
+
+        response = self.login("wrong", phone="+20 1099999999")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(LOGIN_THROTTLE={**THROTTLE, 'MAX_KEYS': 2})
+    def test_max_keys_setting_bounds_the_counters(self):
+        counter = SlidingWindowCounter()
+        for key in ("a", "b", "c"):
+            counter.hit(key, 60)
+        self.assertEqual(counter.retry_after("a", 1, 60), 0)
+        self.assertGreater(counter.retry_after("c", 1, 60), 0)
+        self.assertEqual(len(counter._events), 2)
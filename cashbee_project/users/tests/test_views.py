@@ -174,4 +174,43 @@ class AuthViewTests(TestCase):
         }
         response = self.client.post(self.login_url, login_data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("Account isn't active", str(response.data))
\ No newline at end of file
+        self.assertIn("Account isn't active", str(response.data))
+
+class FamilyViewSetQueryTest(TestCase):
+    def setUp(self):
+        self.family = Family.objects.create(name="Mansour")
+        self.parent = self.add_member("+201000000001", "Sondos", UsersRole.PARENT)
+        self.add_member("+201000000002", "Omar", UsersRole.CHILD)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.parent)
+
+    def add_member(self, phone, first_name, role):
+        return User.objects.create_user(
+            phone_number=phone, first_name=first_name, last_name="Mansour",
+            password="Pa@1234567", role=role, family=self.family,
+        )
+
+    def test_query_count_does_not_grow_with_family_size(self):
+        members_url = f"/api/families/{self.family.pk}/members/"
+        details_url = f"/api/families/{self.family.pk}/details/"
+        with self.assertNumQueries(2):
+            self.client.get(members_url)
+        with self.assertNumQueries(2):
+            self.client.get(details_url)
+
+        for i in range(5):
+            self.add_member(f"+20100000010{i}", f"Kid{i}", UsersRole.CHILD)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(members_url)
+        self.assertEqual(response.data["total_members"], 7)
+        self.assertEqual(len(response.data["children"]), 6)
+        self.assertEqual(response.data["children"][0]["wallet_balance"], "0.00")
+
+        with self.assertNumQueries(2):
+            response = self.client.get(details_url)
+        self.assertIn("Total Members: 7\n\nParents:\n  - Sondos Mansour", response.data["details"])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/families/{self.family.pk}/")
+        self.assertEqual(response.data["members_count"], 7)
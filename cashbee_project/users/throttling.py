@@ -0,0 +1,102 @@
+"""
+In-memory sliding window counters used to throttle login attempts.
+
+Checked before the user lookup and before check_password, so abusive traffic
+is rejected without a database hit or a PBKDF2 computation. Lockouts are also
+persisted on User.failed_attempts / User.lock_time so they survive restarts
+and apply across workers.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from phonenumber_field.phonenumber import to_python
+
+DEFAULTS = {
+    'IP_LIMIT': 20,              # login attempts per IP...
+    'IP_WINDOW': 60,             # ...per this many seconds
+    'PHONE_LIMIT': 5,            # failed attempts per phone number...
+    'PHONE_WINDOW': 300,         # ...per this many seconds
+    'MAX_FAILED_ATTEMPTS': 5,    # consecutive failures before the account is locked
+    'LOCKOUT': 900,              # lock duration in seconds
+    'MAX_KEYS': 100000,          # bound on tracked IPs / phone numbers per worker
+}
+
+
+def get_throttle_settings():
+    return {**DEFAULTS, **getattr(settings, 'LOGIN_THROTTLE', {})}
+
+
+def normalize_phone(value):
+    """E.164 form of a phone number, so reformatting it does not start a new window"""
+    number = to_python(value)
+    if number and number.is_valid():
+        return number.as_e164
+    return str(value or '').strip()
+
+
+class SlidingWindowCounter:
+    """
+    Timestamps of recent events per key, oldest keys are evicted past
+    ``max_keys`` (LOGIN_THROTTLE['MAX_KEYS'] when None)
+    """
+
+    def __init__(self, max_keys=None):
+        self._max_keys = max_keys
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_keys(self):
+        if self._max_keys is not None:
+            return self._max_keys
+        return get_throttle_settings()['MAX_KEYS']
+
+    def _prune(self, events, window, now):
+        while events and events[0] <= now - window:
+            events.popleft()
+
+    def retry_after(self, key, limit, window):
+        """Seconds until ``key`` may try again, 0 if it is under the limit"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return 0
+            self._prune(events, window, now)
+            if len(events) < limit:
+                return 0
+            return max(1, int(events[-limit] + window - now) + 1)
+
+    def hit(self, key, window):
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None:
+                events = self._events[key] = deque()
+                while len(self._events) > self.max_keys:
+                    self._events.popitem(last=False)
+            else:
+                self._events.move_to_end(key)
+            self._prune(events, window, now)
+            events.append(now)
+            return len(events)
+
+    def reset(self, key):
+        with self._lock:
+            self._events.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+
+ip_attempts = SlidingWindowCounter()
+phone_failures = SlidingWindowCounter()
+
+
+def get_client_ip(request):
+    if request is None:
+        return None
+    return request.META.get('REMOTE_ADDR')
@@ -7,12 +7,14 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import viewsets, permissions,generics
 from rest_framework import status
-from .services import RoleManager, FamilyFacade
+from .services import RoleManager, FamilyFacade, FamilyDashboard
+from .authentication import invalidate_user_tokens
 from django.core.exceptions import ValidationError
 from wallet.serializers import WalletSerializer
-from django.db.models import Q
+from django.db.models import Count, Q
+from cashbee_project.db_routing import ReplicaReadMixin
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet for managing user accounts and family operations"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -105,6 +107,9 @@ class UserViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
+            # update() skips post_save, drop cached token authentication explicitly
+            invalidate_user_tokens(user.pk)
+            
             # 6. Refresh and return
             user.refresh_from_db()
             
@@ -155,6 +160,7 @@ class UserViewSet(viewsets.ModelViewSet):
             if 'is_active' in request.data and len(request.data) == 1:
                 is_active = request.data['is_active']
                 User.objects.filter(pk=instance.pk).update(is_active=is_active)
+                invalidate_user_tokens(instance.pk)
                 instance.refresh_from_db()
                 
                 action = "reactivated" if is_active else "deactivated"
@@ -612,12 +618,13 @@ class ChildViewSet(viewsets.ModelViewSet):
             "message": "✅ Password changed successfully"
         })
 
-class FamilyViewSet(viewsets.ReadOnlyModelViewSet):
+class FamilyViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing families.
     Only authenticated users can view.
     """
     serializer_class = FamilySerializer
+    replica_actions = ('list', 'retrieve', 'family_members', 'family_details', 'dashboard')
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -628,11 +635,12 @@ class FamilyViewSet(viewsets.ReadOnlyModelViewSet):
         """
         user = self.request.user
         
+        families = Family.objects.annotate(members_total=Count('members'))
         if user.is_superuser:
-            return Family.objects.all()
+            return families
         
-        if user.family:
-            return Family.objects.filter(id=user.family.id)
+        if user.family_id:
+            return families.filter(id=user.family_id)
         
         return Family.objects.none()
     
@@ -640,18 +648,14 @@ class FamilyViewSet(viewsets.ReadOnlyModelViewSet):
     def family_members(self, request, pk=None):
         """Get all members of a family"""
         family = self.get_object()
-        members = User.objects.filter(family=family)
-        
-        # Group by role
-        parents = members.filter(role=UsersRole.PARENT)
-        children = members.filter(role=UsersRole.CHILD)
+        members, parents, children = FamilyFacade(family=family).get_members()
         
         return Response({
             "family": {
                 "id": family.id,
                 "name": family.name
             },
-            "total_members": members.count(),
+            "total_members": len(members),
             "parents": UserSerializer(parents, many=True).data,
             "children": ChildSerializer(children, many=True).data,
         })
@@ -660,18 +664,25 @@ class FamilyViewSet(viewsets.ReadOnlyModelViewSet):
     def family_details(self, request, pk=None):
         """Get detailed family information using FamilyFacade"""
         family = self.get_object()
+        family_facade = FamilyFacade(family=family)
+        members, _, _ = family_facade.get_members()
         
-        # Get any family member to create facade
-        family_member = User.objects.filter(family=family).first()
-        
-        if not family_member:
+        if not members:
             return Response({
                 "error": "❌ No members found in this family"
             }, status=status.HTTP_404_NOT_FOUND)
         
-        family_facade = FamilyFacade(family_member)
-        details = family_facade.get_family_details()
-        
         return Response({
-            "details": details
+            "details": family_facade.get_family_details()
         })
+
+    @action(detail=True, methods=['get'], url_path='dashboard')
+    def dashboard(self, request, pk=None):
+        """Per-member balances, spend against limits and recent activity (parents only)"""
+        if request.user.role != UsersRole.PARENT and not request.user.is_superuser:
+            return Response(
+                {"error": "❌ Only parents can view the family dashboard"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        family = self.get_object()
+        return Response(FamilyDashboard(family).build())
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Wallet, SystemLimit, PersonalLimit, FamilyLimit
+from .models import Wallet, SystemLimit, PersonalLimit, FamilyLimit, ReconciliationRun, DailySpend
 
 @admin.register(Wallet)
 class WalletAdmin(admin.ModelAdmin):
@@ -24,3 +24,13 @@ class FamilyLimitAdmin(admin.ModelAdmin):
     search_fields = ('parent__username', 'child__username', 'parent__phone_number', 'child__phone_number')
     list_filter = ('is_active',)
 
+@admin.register(ReconciliationRun)
+class ReconciliationRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'finished_at', 'wallets_checked', 'mismatch_count', 'last_transaction_id')
+    readonly_fields = ('started_at', 'finished_at', 'wallets_checked', 'mismatch_count', 'last_transaction_id', 'mismatches')
+
+@admin.register(DailySpend)
+class DailySpendAdmin(admin.ModelAdmin):
+    list_display = ('wallet', 'day', 'amount', 'transactions_count', 'updated_at')
+    list_filter = ('day',)
+    readonly_fields = ('wallet', 'day', 'amount', 'transactions_count', 'updated_at')
@@ -0,0 +1,20 @@
+"""
+Async read endpoints served under /api/async/ by the ASGI deployment
+(gunicorn_asgi.conf.py). A slow client only holds a coroutine, not a worker.
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from users.authentication import async_token_required
+from .models import Wallet
+from .serializers import WalletSerializer
+
+
+@require_GET
+@async_token_required
+async def wallet_detail(request):
+    """Async version of WalletViewSet"""
+    try:
+        wallet = await Wallet.objects.select_related('user').aget(user_id=request.user.pk)
+    except Wallet.DoesNotExist:
+        return JsonResponse({"detail": "No Wallet matches the given query."}, status=404)
+    return JsonResponse(WalletSerializer(wallet).data)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_transaction_id', models.BigIntegerField(default=0, help_text='Checkpoints include every transaction up to this id.')),
+                ('wallets_checked', models.PositiveIntegerField(default=0)),
+                ('mismatch_count', models.PositiveIntegerField(default=0)),
+                ('mismatches', models.JSONField(blank=True, default=list, help_text='First mismatches found: wallet id, balance, expected balance.')),
+            ],
+            options={
+                'verbose_name': 'Reconciliation Run',
+                'verbose_name_plural': 'Reconciliation Runs',
+                'db_table': 'reconciliation_runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WalletCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('wallet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoint', to='wallet.wallet')),
+            ],
+            options={
+                'verbose_name': 'Wallet Checkpoint',
+                'verbose_name_plural': 'Wallet Checkpoints',
+                'db_table': 'wallet_checkpoints',
+            },
+        ),
+    ]
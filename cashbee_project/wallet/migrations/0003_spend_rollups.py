@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:01
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0002_reconciliation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'spend_rollup_state',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('transactions_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_spend', to='wallet.wallet')),
+            ],
+            options={
+                'verbose_name': 'Daily Spend',
+                'verbose_name_plural': 'Daily Spend',
+                'db_table': 'daily_spend',
+                'constraints': [models.UniqueConstraint(fields=('wallet', 'day'), name='daily_spend_wallet_day_uniq')],
+            },
+        ),
+    ]
@@ -191,4 +191,84 @@ class FamilyLimit(BaseLimit):
         if self.monthly_limit > system_limit.monthly_limit:
             raise ValidationError(
                 f"Monthly limit cannot exceed the system limit of {system_limit.monthly_limit}."
-            )
\ No newline at end of file
+            )
+
+class ReconciliationRun(models.Model):
+    """One run of the reconcile_wallets command (see wallet.reconciliation)."""
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_transaction_id = models.BigIntegerField(
+        default=0,
+        help_text="Checkpoints include every transaction up to this id."
+    )
+    wallets_checked = models.PositiveIntegerField(default=0)
+    mismatch_count = models.PositiveIntegerField(default=0)
+    mismatches = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="First mismatches found: wallet id, balance, expected balance."
+    )
+
+    class Meta:
+        db_table = 'reconciliation_runs'
+        ordering = ['-started_at']
+        verbose_name = 'Reconciliation Run'
+        verbose_name_plural = 'Reconciliation Runs'
+
+    def __str__(self):
+        return f"Reconciliation {self.started_at:%Y-%m-%d %H:%M} | {self.mismatch_count} mismatches"
+
+
+class WalletCheckpoint(models.Model):
+    """Balance a wallet should have according to the transactions up to ReconciliationRun.last_transaction_id."""
+    wallet = models.OneToOneField(
+        Wallet,
+        on_delete=models.CASCADE,
+        related_name='checkpoint'
+    )
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'wallet_checkpoints'
+        verbose_name = 'Wallet Checkpoint'
+        verbose_name_plural = 'Wallet Checkpoints'
+
+    def __str__(self):
+        return f"Checkpoint for wallet {self.wallet_id}: {self.balance} EGP"
+
+
+class SpendRollupState(models.Model):
+    """Single row: DailySpend includes every transaction up to last_transaction_id."""
+    last_transaction_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'spend_rollup_state'
+
+    def __str__(self):
+        return f"Spend rollups up to transaction {self.last_transaction_id}"
+
+
+class DailySpend(models.Model):
+    """Successful outgoing transfers of a wallet for one day (see wallet.rollups)."""
+    wallet = models.ForeignKey(
+        Wallet,
+        on_delete=models.CASCADE,
+        related_name='daily_spend'
+    )
+    day = models.DateField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    transactions_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_spend'
+        verbose_name = 'Daily Spend'
+        verbose_name_plural = 'Daily Spend'
+        constraints = [
+            models.UniqueConstraint(fields=['wallet', 'day'], name='daily_spend_wallet_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Wallet {self.wallet_id} spent {self.amount} EGP on {self.day}"
@@ -0,0 +1,109 @@
+"""
+Per-wallet daily spend rollups.
+
+DailySpend holds the successful outgoing transfers of each wallet per day, up
+to SpendRollupState.last_transaction_id. ``refresh_spend_rollups`` (run it
+every few minutes) folds in the transactions after that watermark with one
+GROUP BY over the new rows only. Like the reconciler, it only advances to
+transactions older than ``lag``: ids are allocated before commit, so a
+transfer still in flight must not be skipped.
+
+``spend_summary`` reads today's and this month's spend for any number of
+wallets in one query: the rollups, plus the few transactions newer than the
+watermark, so the figures are exact without waiting for the next refresh.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Max, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from transactions.models import Transaction
+from .models import DailySpend, SpendRollupState
+
+ZERO = Decimal('0.00')
+
+
+def _spending(queryset):
+    return queryset.filter(status=Transaction.TransactionStatus.SUCCESS, from_wallet__isnull=False)
+
+
+def refresh_spend_rollups(lag=timedelta(minutes=5), batch_size=100000):
+    """Fold transactions past the watermark into DailySpend, return how many were read"""
+    cutoff = timezone.now() - lag
+    with db_transaction.atomic():
+        state, _ = SpendRollupState.objects.select_for_update().get_or_create(pk=1)
+        since_id = state.last_transaction_id
+        window = Transaction.objects.filter(id__gt=since_id, date__lt=cutoff).order_by('id')
+        upto = window[batch_size - 1:batch_size].values_list('id', flat=True).first()
+        if upto is None:
+            upto = window.aggregate(last=Max('id'))['last']
+        if upto is None:
+            return 0
+
+        rows = list(
+            _spending(Transaction.objects.filter(id__gt=since_id, id__lte=upto))
+            .annotate(day=TruncDate('date'))
+            .order_by()
+            .values('from_wallet_id', 'day')
+            .annotate(amount=Sum('amount'), count=Count('id'))
+        )
+        if rows:
+            existing = {
+                (spend.wallet_id, spend.day): spend
+                for spend in DailySpend.objects.filter(
+                    wallet_id__in={row['from_wallet_id'] for row in rows},
+                    day__in={row['day'] for row in rows},
+                )
+            }
+            spends = []
+            for row in rows:
+                spend = existing.get((row['from_wallet_id'], row['day']))
+                if spend is None:
+                    spend = DailySpend(wallet_id=row['from_wallet_id'], day=row['day'])
+                spend.amount += row['amount']
+                spend.transactions_count += row['count']
+                spends.append(spend)
+            DailySpend.objects.bulk_create(
+                spends,
+                update_conflicts=True,
+                unique_fields=['wallet', 'day'],
+                update_fields=['amount', 'transactions_count', 'updated_at'],
+            )
+
+        state.last_transaction_id = upto
+        state.save(update_fields=['last_transaction_id', 'updated_at'])
+        return Transaction.objects.filter(id__gt=since_id, id__lte=upto).count()
+
+
+def spend_summary(wallet_ids, today=None):
+    """wallet id -> {'today': Decimal, 'month': Decimal}, in one query"""
+    today = today or timezone.localdate()
+    month_start = today.replace(day=1)
+    summary = {wallet_id: {'today': ZERO, 'month': ZERO} for wallet_id in wallet_ids}
+    if not summary:
+        return summary
+
+    watermark = Coalesce(Subquery(SpendRollupState.objects.filter(pk=1).values('last_transaction_id')), 0)
+    rollups = (
+        DailySpend.objects.filter(wallet_id__in=summary, day__gte=month_start)
+        .order_by()
+        .values('wallet_id')
+        .annotate(month=Sum('amount'), today=Sum('amount', filter=Q(day=today)))
+    )
+    # Plus the transactions the rollups do not include yet. A single statement
+    # reads both sides with the same watermark, even while a refresh commits.
+    tail = (
+        _spending(Transaction.objects.filter(from_wallet_id__in=summary, id__gt=watermark))
+        .annotate(day=TruncDate('date'))
+        .filter(day__gte=month_start)
+        .order_by()
+        .values('from_wallet_id')
+        .annotate(month=Sum('amount'), today=Sum('amount', filter=Q(day=today)))
+    )
+    for row in rollups.union(tail, all=True):
+        summary[row['wallet_id']]['month'] += row['month'] or ZERO
+        summary[row['wallet_id']]['today'] += row['today'] or ZERO
+    return summary
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase
+from django.utils import timezone
+from users.models import User
+from transactions.models import Transaction
+from wallet.models import Wallet, WalletCheckpoint
+from wallet.reconciliation import WalletReconciler
+
+
+class WalletReconcilerTest(TestCase):
+    def setUp(self):
+        self.sender = User.objects.create_user(
+            phone_number="+201000000001", first_name="Sondos", last_name="Ali", password="So@1234567"
+        ).wallet
+        self.receiver = User.objects.create_user(
+            phone_number="+201000000002", first_name="Nada", last_name="Hassan", password="Na@1234567"
+        ).wallet
+        Wallet.objects.filter(pk=self.sender.pk).update(balance=Decimal('500.00'))
+        Wallet.objects.filter(pk=self.receiver.pk).update(balance=Decimal('100.00'))
+
+    def transfer(self, amount, minutes_ago=60):
+        """Record a transfer the way SendRecievePayment does"""
+        sender = Wallet.objects.get(pk=self.sender.pk)
+        receiver = Wallet.objects.get(pk=self.receiver.pk)
+        tx = Transaction.objects.create(
+            from_wallet=sender,
+            to_wallet=receiver,
+            amount=amount,
+            transaction_type=Transaction.TransactionType.SEND,
+            status=Transaction.TransactionStatus.SUCCESS,
+            from_wallet_balance_before=sender.balance,
+            to_wallet_balance_before=receiver.balance,
+        )
+        Transaction.objects.filter(pk=tx.pk).update(date=timezone.now() - timedelta(minutes=minutes_ago))
+        Wallet.objects.filter(pk=sender.pk).update(balance=sender.balance - amount)
+        Wallet.objects.filter(pk=receiver.pk).update(balance=receiver.balance + amount)
+        return tx
+
+    def test_consistent_ledger_has_no_mismatch(self):
+        self.transfer(Decimal('100.00'))
+        self.transfer(Decimal('50.00'))
+
+        run = WalletReconciler().run()
+        self.assertEqual(run.wallets_checked, 2)
+        self.assertEqual(run.mismatch_count, 0)
+        self.assertEqual(WalletCheckpoint.objects.get(wallet=self.sender).balance, Decimal('350.00'))
+
+    def test_incremental_run_detects_tampering(self):
+        first = self.transfer(Decimal('100.00'))
+        WalletReconciler().run()
+
+        second = self.transfer(Decimal('25.00'))
+        Wallet.objects.filter(pk=self.receiver.pk).update(balance=Decimal('999.00'))
+
+        with self.assertNumQueries(13):
+            run = WalletReconciler().run()
+        self.assertEqual(run.last_transaction_id, second.id)
+        self.assertGreater(run.last_transaction_id, first.id)
+        self.assertEqual(run.mismatch_count, 1)
+        self.assertEqual(run.mismatches[0]['wallet_id'], self.receiver.pk)
+        self.assertEqual(run.mismatches[0]['expected'], '225.00')
+
+    def test_recent_transfers_are_checked_but_not_checkpointed(self):
+        WalletReconciler().run()
+        recent = self.transfer(Decimal('100.00'), minutes_ago=0)
+
+        run = WalletReconciler().run()
+        self.assertEqual(run.mismatch_count, 0)
+        self.assertLess(run.last_transaction_id, recent.id)
+        self.assertEqual(WalletCheckpoint.objects.get(wallet=self.sender).balance, Decimal('500.00'))
+
+        # The next run still counts it
+        Transaction.objects.filter(pk=recent.pk).update(date=timezone.now() - timedelta(hours=1))
+        WalletReconciler().run()
+        self.assertEqual(WalletCheckpoint.objects.get(wallet=self.sender).balance, Decimal('400.00'))